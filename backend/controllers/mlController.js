@@ -37,6 +37,16 @@ exports.predictPrice = async (req, res) => {
 
     } catch (error) {
         console.error("❌ ML Error:", error.message);
+
+        // ML server overloaded -> 503 + Retry-After aage bhej do (client thodi der baad try kare)
+        if (error.response && error.response.status === 503) {
+            const retryAfter = error.response.headers['retry-after'];
+            if (retryAfter) res.set('Retry-After', retryAfter);
+            return res.status(503).json({
+                error: "ML Server busy. Please try again shortly."
+            });
+        }
+
         res.status(500).json({
             error: "ML Server unavailable. Please try again."
         });
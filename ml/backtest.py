@@ -0,0 +1,252 @@
+# ml/backtest.py
+# Deployed 30 din forecast ka backtest - training wala 10% tail MAE nahi, balki wahi serving logic
+# (model selection, series_state, recursive/direct forecast) history ke bahut saare origin dates se.
+#
+# Origin = woh din jahan tak ki history "pata" hai. Ek series ke saare origins ke states ek matrix
+# mein: recursive forecast har horizon step pe ek (origins x 8) predict - 700 origins bhi 30 calls.
+# Series (crop x district chunks) alag processes mein. Har forecast din ka actual usi date ki
+# price se milta hai (date na ho to woh horizon skip).
+#
+# Dhyan do: model jis data pe train hua, us period ke origins in-sample hain - sirf naye
+# period ka score chahiye to --start do.
+#
+# Usage: python backtest.py [--jobs 8] [--crops wheat,onion] [--strategy direct]
+#                           [--start 2024-07-01] [--end 2024-12-31] [--step 1] [--out report.json]
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from config import DIRECT_MODELS_DIR, FORECAST_STRATEGY
+from forecast import DIRECT, FORECASTERS, HORIZON, LOOKBACK, RECURSIVE, STRATEGIES, booster_predictor
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+
+# Har report mein yeh horizons (din) alag se
+REPORT_HORIZONS = (1, 7, 14, 30)
+
+# Har worker process apna registry / mmap snapshot kholta hai
+_worker = {}
+
+
+def _init_worker(strategy):
+    _worker["strategy"] = strategy
+    _worker["registry"] = ModelRegistry()
+    _worker["direct_registry"] = ModelRegistry(models_dir=DIRECT_MODELS_DIR, suffixes=(".ubj", ".pkl"))
+    _worker["history"] = HistoryStore().snapshot()
+
+
+def select_model(crop, district):
+    """(strategy, entry) exactly like serve.select_model: direct model first if asked, else recursive."""
+    if _worker["strategy"] == DIRECT:
+        entry = _worker["direct_registry"].select(crop, district)
+        if entry is not None:
+            return DIRECT, entry
+    return RECURSIVE, _worker["registry"].select(crop, district)
+
+
+def origin_states(prices, origins):
+    """(K, STATE_SIZE) series_state() of prices[:i + 1] for every origin index i, in one go."""
+    total = origins + 1
+    last = prices[origins]
+    windows = np.lib.stride_tricks.sliding_window_view(prices, 7)[origins - 6]
+    return np.column_stack([
+        last,
+        np.where(total > 7, prices[origins - 6], last),
+        np.where(total > 30, prices[np.maximum(origins - 29, 0)], last),
+        windows.mean(axis=1),
+        np.where(total > 7, windows.std(axis=1, ddof=1), 0),
+    ])
+
+
+def plan_origins(dates, start=None, end=None, step=1, min_history=LOOKBACK):
+    """Origin indexes with min_history points known and the full horizon still inside the series."""
+    days = dates.astype("datetime64[D]")
+    origins = np.arange(max(min_history, 7) - 1, len(days))
+    origins = origins[days[origins] + HORIZON <= days[-1]]
+    if start is not None:
+        origins = origins[days[origins] >= start]
+    if end is not None:
+        origins = origins[days[origins] <= end]
+    return origins[::-1][::step][::-1]  # step aakhri origin se, taaki latest hamesha shaamil ho
+
+
+def actuals(dates, prices, target_dates):
+    """Prices on target_dates (K, horizon); NaN where that day has no price."""
+    days = dates.astype("datetime64[D]")
+    pos = np.minimum(np.searchsorted(days, target_dates), len(days) - 1)
+    return np.where(days[pos] == target_dates, prices[pos], np.nan)
+
+
+def _empty_errors():
+    return {key: np.zeros(HORIZON) for key in ("n", "abs", "sq", "pct", "naive_abs")}
+
+
+def _add_errors(errors, preds, actual, last):
+    found = ~np.isnan(actual)
+    actual = np.where(found, actual, 0)
+    err = np.where(found, preds - actual, 0)
+    errors["n"] += found.sum(axis=0)
+    errors["abs"] += np.abs(err).sum(axis=0)
+    errors["sq"] += (err ** 2).sum(axis=0)
+    errors["pct"] += np.where(found & (actual != 0), np.abs(err) / np.where(actual != 0, actual, 1), 0).sum(axis=0)
+    # Naive baseline: aakhri price hi agle 30 din
+    errors["naive_abs"] += np.where(found, np.abs(last[:, None] - actual), 0).sum(axis=0)
+
+
+def _run_chunk(task):
+    crop, districts, options = task
+    history = _worker["history"]
+    n_points = len(history.series_date)
+
+    # Model ke hisaab se group: ek model ke saare series ke origins ek hi matrix mein
+    pending = {}
+    for district in districts:
+        strategy, entry = select_model(crop, district)
+        series, _ = history.tail(crop, district, n=n_points)
+        if entry is None or series is None or series.location != district:
+            continue
+        origins = plan_origins(series.dates, options["start"], options["end"], options["step"])
+        if len(origins):
+            pending.setdefault((strategy, entry.name), (entry, []))[1].append((district, series, origins))
+
+    rows = []
+    errors = []
+    for (strategy, name), (entry, found) in pending.items():
+        states = np.concatenate([origin_states(series.prices, origins) for _, series, origins in found])
+        last_dates = np.concatenate([series.dates[origins] for _, series, origins in found])
+        try:
+            preds, dates = FORECASTERS[strategy](booster_predictor(entry.model), states, last_dates)
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {str(e).splitlines()[0]}")
+            continue
+
+        offset = 0
+        for district, series, origins in found:
+            k = len(origins)
+            result = _empty_errors()
+            _add_errors(result, preds[offset:offset + k].astype(np.float64),
+                        actuals(series.dates, series.prices, dates[offset:offset + k]),
+                        states[offset:offset + k, 0])
+            rows.append({"crop": crop, "district": district, "model": name, "strategy": strategy,
+                         "origins": k, **result})
+            offset += k
+    return crop, rows, "; ".join(errors) or None
+
+
+def plan_tasks(registry, history, crops, chunk, options):
+    tasks = []
+    for crop in crops or registry.crop_models():
+        crop_codes = set(history.match_crops(crop))
+        districts = sorted({history.districts[int(d)]
+                            for c, d in zip(history.series_crop, history.series_district)
+                            if int(c) in crop_codes})
+        for i in range(0, len(districts), chunk):
+            tasks.append((crop, districts[i:i + chunk], options))
+    return tasks
+
+
+def summarize(rows):
+    """Per-horizon MAE / RMSE / MAPE / naive MAE over a list of series results."""
+    total = _empty_errors()
+    for row in rows:
+        for key in total:
+            total[key] += row[key]
+    n = np.maximum(total["n"], 1)
+    return {
+        "series": len(rows),
+        "origins": int(sum(row["origins"] for row in rows)),
+        "forecasts": int(total["n"].sum()),
+        "mae": (total["abs"] / n).round(4).tolist(),
+        "rmse": np.sqrt(total["sq"] / n).round(4).tolist(),
+        "mape": (total["pct"] / n * 100).round(4).tolist(),
+        "naive_mae": (total["naive_abs"] / n).round(4).tolist(),
+    }
+
+
+def backtest(crops=None, strategy=FORECAST_STRATEGY, jobs=None, chunk=64, start=None, end=None, step=1):
+    registry = ModelRegistry()
+    history = HistoryStore().snapshot()
+    if history is None:
+        raise SystemExit("❌ Error: mandi history nahi mili!")
+
+    options = {"start": start, "end": end, "step": step}
+    tasks = plan_tasks(registry, history, crops, chunk, options)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    print(f"🚀 Backtesting {sum(len(t[1]) for t in tasks)} series "
+          f"({len(tasks)} chunks, {jobs} processes, strategy={strategy})...")
+
+    start_time = time.perf_counter()
+    rows = []
+    failed = {}
+    with Pool(processes=jobs, initializer=_init_worker, initargs=(strategy,)) as pool:
+        for crop, found, error in pool.imap_unordered(_run_chunk, tasks):
+            if error:
+                failed.setdefault(crop, []).append(error)
+            rows.extend(found)
+    wall = time.perf_counter() - start_time
+
+    by_crop = {}
+    for row in rows:
+        by_crop.setdefault(row["crop"], []).append(row)
+    report = {
+        "history_version": history.version,
+        "strategy": strategy,
+        "options": {k: str(v) if v is not None else None for k, v in options.items()},
+        "wall_seconds": round(wall, 3),
+        "origins_per_second": round(sum(r["origins"] for r in rows) / wall, 1) if wall > 0 else 0.0,
+        "overall": summarize(rows),
+        "crops": {crop: {**summarize(found), "models": sorted({r["model"] for r in found})}
+                  for crop, found in sorted(by_crop.items())},
+        "failed": failed,
+    }
+    print_report(report)
+    return report
+
+
+def print_report(report):
+    overall = report["overall"]
+    print(f"\n📊 {overall['series']} series, {overall['origins']} origins, {overall['forecasts']} forecast days")
+    print(f"   Wall time: {report['wall_seconds']:.2f} s  |  Throughput: {report['origins_per_second']:.1f} origins/s")
+
+    print(f"\n{'horizon':>8} {'MAE (₹)':>10} {'RMSE':>10} {'MAPE %':>8} {'naive MAE':>10}")
+    for h in range(1, HORIZON + 1):
+        i = h - 1
+        print(f"{h:>8} {overall['mae'][i]:>10.2f} {overall['rmse'][i]:>10.2f} "
+              f"{overall['mape'][i]:>8.2f} {overall['naive_mae'][i]:>10.2f}")
+
+    heads = " ".join(f"{'h' + str(h):>9}" for h in REPORT_HORIZONS)
+    print(f"\n{'crop':<12} {'series':>6} {'origins':>8} {heads}  (MAE ₹)")
+    for crop, found in report["crops"].items():
+        maes = " ".join(f"{found['mae'][h - 1]:>9.2f}" for h in REPORT_HORIZONS)
+        print(f"{crop:<12} {found['series']:>6} {found['origins']:>8} {maes}")
+    for crop, errors in report["failed"].items():
+        print(f"   ⚠️ Skipped {crop}: {'; '.join(errors)}")
+
+
+def _date(text):
+    return np.datetime64(text, "D")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the serving 30-day forecast over many origin dates")
+    parser.add_argument("--crops", default="", help="comma separated (default: all crop models)")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=FORECAST_STRATEGY,
+                        help="direct: direct models jahan hain (baaki recursive, serve jaisa)")
+    parser.add_argument("--start", type=_date, default=None, help="pehla origin date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_date, default=None, help="aakhri origin date (YYYY-MM-DD)")
+    parser.add_argument("--step", type=int, default=1, help="har N-th origin (1 = har din)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=64, help="districts per worker task")
+    parser.add_argument("--out", default=None, help="JSON report path")
+    args = parser.parse_args()
+
+    crops = [c.strip().lower() for c in args.crops.split(",") if c.strip()]
+    report = backtest(crops, args.strategy, args.jobs, args.chunk, args.start, args.end, max(1, args.step))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved -> {args.out}")
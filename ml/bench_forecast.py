@@ -0,0 +1,108 @@
+# ml/bench_forecast.py
+# Forecast loop ka benchmark: purana (har step pe 1-row DataFrame + model.predict)
+# vs naya (preallocated NumPy buffer + inplace_predict). Dono ke results exactly same hone chahiye.
+#
+# Usage: python bench_forecast.py [--crops wheat,rice] [--repeat 20]
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from forecast import FEATURES, LOOKBACK, booster_predictor, format_forecast, recursive_forecast, series_state
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+
+
+def legacy_predict(model, df):
+    """Purana model.predict(DataFrame) - registry ab .ubj se raw Booster deti hai, to DMatrix."""
+    if isinstance(model, xgb.Booster):
+        try:
+            iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            iteration_range = (0, 0)
+        return model.predict(xgb.DMatrix(df), iteration_range=iteration_range, validate_features=False)
+    return model.predict(df, validate_features=False)
+
+
+def legacy_forecast(model, dates, prices, total):
+    # Purana serve.py loop (reference ke liye as-is)
+    working_df = pd.DataFrame({"date": dates, "modal_price": prices})
+    last_row = working_df.iloc[-1]
+    current_date = last_row["date"]
+    inputs = {
+        "lag_1": last_row["modal_price"],
+        "lag_7": working_df["modal_price"].iloc[-7] if total > 7 else last_row["modal_price"],
+        "lag_30": working_df["modal_price"].iloc[-30] if total > 30 else last_row["modal_price"],
+        "rolling_mean_7": working_df["modal_price"].tail(7).mean(),
+        "rolling_std_7": working_df["modal_price"].tail(7).std() if total > 7 else 0,
+    }
+    future_predictions = []
+    for i in range(1, 31):
+        next_date = current_date + timedelta(days=i)
+        row = {"day_of_year": next_date.dayofyear, "month": next_date.month, "year": next_date.year}
+        row.update({k: inputs[k] for k in FEATURES[3:]})
+        pred_price = legacy_predict(model, pd.DataFrame([row]))[0]
+        future_predictions.append({"date": next_date.strftime("%Y-%m-%d"), "price": round(float(pred_price), 2)})
+        inputs["lag_7"] = inputs["lag_1"]
+        inputs["lag_1"] = pred_price
+        inputs["rolling_mean_7"] = (inputs["rolling_mean_7"] * 6 + pred_price) / 7
+    return future_predictions
+
+
+def new_forecast(model, dates, prices, total):
+    state = series_state(prices, total)
+    out, out_dates = recursive_forecast(booster_predictor(model), state[None, :], dates[-1:])
+    return format_forecast(out[0], out_dates[0])
+
+
+def time_calls(fn, args, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the 30-day recursive forecast loop")
+    parser.add_argument("--crops", default="", help="comma separated (default: all models)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # .trees (NumPy evaluator) nahi - yeh benchmark XGBoost predict path ka hai
+    registry = ModelRegistry(suffixes=(".ubj", ".pkl"))
+    history = HistoryStore().snapshot()
+    if history is None:
+        print("❌ Error: mandi history nahi mili!")
+        return
+
+    crops = [c.strip().lower() for c in args.crops.split(",") if c.strip()] or registry.crop_models()
+
+    print(f"\n⏱️  Per-forecast latency (ms, {args.repeat} runs)")
+    print(f"{'crop':<10} {'legacy p50':>11} {'new p50':>9} {'speedup':>8}  match")
+    for crop in crops:
+        model = registry.get(crop)
+        series, error = history.tail(crop, "", n=LOOKBACK)
+        if model is None or series is None:
+            print(f"{crop:<10} skipped ({error or 'no model'})")
+            continue
+
+        call_args = (model, series.dates, series.prices, series.total)
+        try:
+            match = legacy_forecast(*call_args) == new_forecast(*call_args)
+        except Exception as e:
+            print(f"{crop:<10} skipped ({type(e).__name__}: {str(e).splitlines()[0][:60]})")
+            continue
+
+        legacy = statistics.median(time_calls(legacy_forecast, call_args, args.repeat))
+        new = statistics.median(time_calls(new_forecast, call_args, args.repeat))
+        print(f"{crop:<10} {legacy:>11.2f} {new:>9.2f} {legacy / new:>7.1f}x  {'✅' if match else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
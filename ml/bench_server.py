@@ -0,0 +1,256 @@
+# ml/bench_server.py
+# ML server ka latency / throughput benchmark - FastAPI app ko in-process (httpx ASGI) chalata hai,
+# generated history + models ke against. Results JSON mein, taaki commits ke beech compare ho sake.
+#
+# Usage:
+#   python bench_server.py --concurrency 8 --requests 400 --out bench_results.json
+#   python bench_server.py --crops 6 --districts 50 --cache       # forecast cache on
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(samples_ms, wall, errors):
+    return {
+        "requests": len(samples_ms),
+        "errors": errors,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "mean_ms": statistics.fmean(samples_ms) if samples_ms else None,
+        "requests_per_second": len(samples_ms) / wall if wall > 0 else 0.0,
+        "wall_seconds": wall,
+    }
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ML_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# =========================================================
+# SETUP
+# =========================================================
+
+def prepare_workdir(args):
+    workdir = args.workdir or tempfile.mkdtemp(prefix="krishi-bench-")
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+
+    csv_path = os.path.join(workdir, "data", "mandi_history.csv")
+    if not os.path.exists(csv_path):
+        from generate_dataset import generate
+        print(f"🧪 Generating history ({args.crops} crops x {args.districts} districts)...")
+        generate(csv_path, crops=args.crops, districts=args.districts,
+                 start=args.start, end=args.end, seed=args.seed, coverage=0.9)
+
+    models_link = os.path.join(workdir, "models")
+    if not os.path.exists(models_link):
+        os.symlink(os.path.abspath(args.models_dir), models_link)
+    return workdir
+
+
+def sample_image_payload(size=(1024, 768)):
+    from PIL import Image
+    img = Image.new("RGB", size, (60, 140, 60))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=85)
+    return {"image": "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode(),
+            "district": "Sehore"}
+
+
+# =========================================================
+# STAGE MICRO-BENCHMARKS
+# =========================================================
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": statistics.median(samples), "min_ms": min(samples), "runs": repeat}
+
+
+def stage_benchmarks(serve, crop, district, repeat):
+    from forecast import LOOKBACK, booster_predictor, recursive_forecast, series_state
+    from mandi_data import load_history
+    from model_registry import load_model_file
+
+    stages = {}
+    csv_path = serve.history_store.csv_path
+
+    df = load_history(csv_path)
+    stages["csv_load"] = time_ms(lambda: load_history(csv_path), max(1, repeat // 10))
+
+    def legacy_filter():
+        crop_df = df[df["crop"].str.contains(crop, case=False, na=False)]
+        return crop_df[crop_df["district_name"].str.contains(district, case=False, na=False)]
+
+    history = serve.history_store.snapshot()
+    stages["filter_legacy_str_contains"] = time_ms(legacy_filter, repeat)
+    stages["filter_history_store"] = time_ms(lambda: history.tail(crop, district, n=LOOKBACK), repeat)
+
+    entry = serve.registry.select(crop, district)
+    stages["model_load"] = time_ms(lambda: load_model_file(entry.path), max(1, repeat // 10))
+    stages["model_registry_get"] = time_ms(lambda: serve.registry.select(crop, district), repeat)
+
+    series, _ = history.tail(crop, district, n=LOOKBACK)
+    predict = booster_predictor(entry.model)
+    state = series_state(series.prices, series.total)[None, :]
+    stages["forecast_loop"] = time_ms(lambda: recursive_forecast(predict, state, series.dates[-1:]), repeat)
+    return stages
+
+
+# =========================================================
+# LOAD TEST
+# =========================================================
+
+async def run_load(client, method, path, payloads, concurrency, total):
+    samples, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            body = payloads[i % len(payloads)]
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=body)
+                if resp.status_code != 200 or "error" in resp.json():
+                    errors += 1
+            except Exception:
+                errors += 1
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latency_summary(samples, time.perf_counter() - start, errors)
+
+
+async def bench(args, results):
+    import httpx
+
+    t0 = time.perf_counter()
+    import serve
+    results["cold_start"] = {"import_ms": (time.perf_counter() - t0) * 1000}
+
+    transport = httpx.ASGITransport(app=serve.app)
+    async with serve.app.router.lifespan_context(serve.app):
+        results["cold_start"]["startup_ms"] = (time.perf_counter() - t0) * 1000 - results["cold_start"]["import_ms"]
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            history = serve.history_store.snapshot()
+            crops = [c for c in serve.registry.crop_models() if history.match_crops(c)]
+            pairs = [(c, d) for c in crops for d in sorted({k[1] for k in history.series_keys()})]
+            random.Random(args.seed).shuffle(pairs)
+            payloads = [{"crop": c, "district": d, "state": "Madhya Pradesh", "area_acres": 1.0}
+                        for c, d in pairs[:max(1, args.unique_keys)]]
+
+            start = time.perf_counter()
+            await client.post("/v1/predict", json=payloads[0])
+            results["cold_start"]["first_request_ms"] = (time.perf_counter() - start) * 1000
+            results["cold_start"]["total_ms"] = (time.perf_counter() - t0) * 1000
+
+            print(f"🚀 /v1/predict: {args.requests} requests, concurrency {args.concurrency}...")
+            results["predict"] = await run_load(client, "POST", "/v1/predict", payloads,
+                                                args.concurrency, args.requests)
+
+            if args.disease_requests:
+                print(f"🚀 /v1/detect-disease: {args.disease_requests} requests...")
+                results["detect_disease"] = await run_load(client, "POST", "/v1/detect-disease",
+                                                           [sample_image_payload()], args.concurrency,
+                                                           args.disease_requests)
+
+            crop, district = pairs[0]
+            print("🔬 Stage micro-benchmarks...")
+            results["stages"] = stage_benchmarks(serve, crop, district, args.stage_repeat)
+
+    results["peak_rss_mb"] = peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process latency/throughput benchmark for serve.py")
+    parser.add_argument("--workdir", default=None, help="reuse a dir with data/ (default: temp dir)")
+    parser.add_argument("--models-dir", default=os.path.join(ML_DIR, "models"))
+    parser.add_argument("--crops", type=int, default=6)
+    parser.add_argument("--districts", type=int, default=20)
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--end", default="2025-01-01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--disease-requests", type=int, default=50)
+    parser.add_argument("--unique-keys", type=int, default=1000, help="distinct crop/district payloads")
+    parser.add_argument("--stage-repeat", type=int, default=20)
+    parser.add_argument("--cache", action="store_true", help="forecast cache on rakho (default: off)")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    args.models_dir = os.path.abspath(args.models_dir)
+    out_path = os.path.abspath(args.out)
+    sys.path.insert(0, ML_DIR)
+
+    workdir = prepare_workdir(args)
+    cleanup = args.workdir is None
+    os.chdir(workdir)
+    if not args.cache:
+        os.environ["KRISHI_FORECAST_CACHE_SIZE"] = "0"
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out",)},
+    }
+    try:
+        asyncio.run(bench(args, results))
+    finally:
+        os.chdir(ML_DIR)
+        if cleanup:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    p = results["predict"]
+    print(f"\n✅ Cold start: {results['cold_start']['total_ms']:.0f} ms")
+    print(f"   /v1/predict  p50 {p['p50_ms']:.1f} ms | p95 {p['p95_ms']:.1f} ms | p99 {p['p99_ms']:.1f} ms | "
+          f"{p['requests_per_second']:.1f} req/s | errors {p['errors']}")
+    if "detect_disease" in results:
+        d = results["detect_disease"]
+        print(f"   /v1/detect-disease p50 {d['p50_ms']:.1f} ms | {d['requests_per_second']:.1f} req/s")
+    for name, stage in results["stages"].items():
+        print(f"   {name:<28} {stage['p50_ms']:>9.3f} ms")
+    print(f"   Peak RSS: {results['peak_rss_mb']:.0f} MB  ->  {out_path}")
+
+
+if __name__ == "__main__":
+    main()
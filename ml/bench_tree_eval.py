@@ -0,0 +1,99 @@
+# ml/bench_tree_eval.py
+# XGBoost inplace_predict vs NumPy tree tables (tree_tables.py): per-call latency at
+# chhote batch sizes, poore 30 din ke forecast ka time, load time, aur predictions ka farak.
+#
+# Usage: python bench_tree_eval.py [--crops wheat,rice] [--batches 1,8,64] [--repeat 200]
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from forecast import LOOKBACK, booster_predictor, recursive_forecast, series_state
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+from tree_tables import TreeEnsemble, write_tables
+
+
+def median_us(fn, X, repeat):
+    fn(X)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def forecast_rows(predict, series):
+    """Real forecast-loop rows (30 steps) for one series - isi data pe predictions compare."""
+    rows = []
+
+    def recording(X):
+        rows.append(X.copy())
+        return predict(X)
+
+    recursive_forecast(recording, series_state(series.prices, series.total)[None, :], series.dates[-1:])
+    return np.concatenate(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy tree evaluator against XGBoost predict")
+    parser.add_argument("--crops", default="", help="comma separated (default: all crop models)")
+    parser.add_argument("--batches", default="1,8,64")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(suffixes=(".ubj", ".pkl"))
+    history = HistoryStore().snapshot()
+    if history is None:
+        print("❌ Error: mandi history nahi mili!")
+        return
+    crops = [c.strip().lower() for c in args.crops.split(",") if c.strip()] or registry.crop_models()
+    batches = [int(b) for b in args.batches.split(",")]
+    tmp_dir = tempfile.mkdtemp(prefix="krishi-trees-")
+
+    print(f"\n⏱️  Median per-call latency (µs, {args.repeat} calls) - xgb / numpy")
+    header = "  ".join(f"{'n=' + str(b):>17}" for b in batches)
+    print(f"{'crop':<10} {'trees':>5} {'load ms':>13}  {header}  {'forecast ms':>15}  max |diff|")
+    for crop in crops:
+        model = registry.get(crop)
+        series, error = history.tail(crop, "", n=LOOKBACK)
+        if model is None or series is None:
+            print(f"{crop:<10} skipped ({error or 'no model'})")
+            continue
+
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        path = write_tables(booster, os.path.join(tmp_dir, f"xgb_{crop}.trees"))
+        start = time.perf_counter()
+        tables = TreeEnsemble.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        xgb_predict = booster_predictor(model)
+        try:
+            X = forecast_rows(xgb_predict, series)
+        except Exception as e:
+            print(f"{crop:<10} skipped ({type(e).__name__}: {str(e).splitlines()[0][:60]})")
+            continue
+        diff = float(np.abs(xgb_predict(X) - tables.predict(X)).max())
+
+        cells = []
+        for b in batches:
+            Xb = np.ascontiguousarray(np.resize(X, (b, X.shape[1])))
+            slow = median_us(xgb_predict, Xb, args.repeat)
+            fast = median_us(tables.predict, Xb, args.repeat)
+            cells.append(f"{slow:>6.0f}/{fast:<5.0f}{slow / fast:>4.1f}x")
+
+        state = series_state(series.prices, series.total)[None, :]
+        forecast_ms = []
+        for predict in (xgb_predict, tables.predict):
+            forecast_ms.append(median_us(lambda _: recursive_forecast(predict, state, series.dates[-1:]),
+                                         None, max(5, args.repeat // 10)) / 1000)
+        print(f"{crop:<10} {tables.n_trees:>5} {registry.get_entry(crop).load_seconds * 1000:>6.1f}/{load_ms:<6.2f}  "
+              f"{'  '.join(cells)}  {forecast_ms[0]:>7.2f}/{forecast_ms[1]:<7.2f}  {diff:.4g}")
+
+
+if __name__ == "__main__":
+    main()
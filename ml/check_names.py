@@ -1,16 +1,33 @@
-import pandas as pd
+# ml/check_names.py
+# Koi crop/district naam history mein kaise resolve hota hai (Garlic / Lahsun / लहसुन ...),
+# aur har naam ke saare aliases - CSV mein spelling dhoondhne ki zarurat nahi.
+#
+# Usage: python check_names.py                    # saare crops + unke aliases
+#        python check_names.py lahsun [sehore]    # ek naam (aur district) resolve karo
+import sys
 
-# CSV load karo
-df = pd.read_csv("data/mandi_history.csv")
-df.columns = df.columns.str.strip() # Space hatao
+from history_store import HistoryStore
 
-# Commodity column ka naam check karo
-col_name = 'Commodity' if 'Commodity' in df.columns else 'crop'
 
-# Saare unique naam print karo jo 'Ga' ya 'La' se shuru hote hain
-unique_crops = df[col_name].unique()
-print("\n🔍 Fasal ke naam (Check karo Garlic kaise likha hai):")
-for name in unique_crops:
-    name_str = str(name).lower()
-    if 'garl' in name_str or 'lah' in name_str or 'lus' in name_str:
-        print(f"👉 Found: {name}")
\ No newline at end of file
+def show(label, resolution):
+    if resolution.names:
+        print(f"👉 {label}: {', '.join(resolution.names)} ({resolution.status})")
+    elif resolution.choices:
+        print(f"⚠️ {label}: ambiguous - {', '.join(resolution.choices)}")
+    else:
+        print(f"❌ {label}: koi match nahi")
+
+
+history = HistoryStore().snapshot()
+if history is None:
+    sys.exit("❌ Error: mandi history nahi mili!")
+
+if len(sys.argv) > 1:
+    show(sys.argv[1], history.resolve_crop(sys.argv[1]))
+    if len(sys.argv) > 2:
+        show(sys.argv[2], history.resolve_district(sys.argv[2]))
+else:
+    print("\n🔍 Fasal ke naam aur aliases:")
+    aliases = history.crop_index.aliases()
+    for name in history.crops:
+        print(f"👉 {name}: {', '.join(aliases.get(name, []))}")
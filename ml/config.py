@@ -0,0 +1,76 @@
+# ml/config.py
+# Saari ML server / training settings ek jagah (env vars se override ho sakti hain)
+import os
+
+MODELS_DIR = os.getenv("KRISHI_MODELS_DIR", "models")
+HISTORY_CSV = os.getenv("KRISHI_HISTORY_CSV", "data/mandi_history.csv")
+
+# Model registry: file ka mtime/size kitni der mein dobara check karna hai (seconds)
+MODEL_CHECK_INTERVAL = float(os.getenv("KRISHI_MODEL_CHECK_INTERVAL", "2.0"))
+
+# Preprocessed (memory-mapped) mandi history store
+HISTORY_STORE_DIR = os.getenv("KRISHI_HISTORY_STORE_DIR", "data/history_store")
+HISTORY_CHECK_INTERVAL = float(os.getenv("KRISHI_HISTORY_CHECK_INTERVAL", "5.0"))
+
+# /v1/predict/batch mein ek request ke max items
+MAX_BATCH_ITEMS = int(os.getenv("KRISHI_MAX_BATCH_ITEMS", "5000"))
+
+# Forecast result cache (0 = off). Redis URL diya to cache workers ke beech share hoga.
+FORECAST_CACHE_SIZE = int(os.getenv("KRISHI_FORECAST_CACHE_SIZE", "10000"))
+FORECAST_CACHE_TTL = float(os.getenv("KRISHI_FORECAST_CACHE_TTL", "3600"))
+FORECAST_CACHE_REDIS_URL = os.getenv("KRISHI_FORECAST_CACHE_REDIS_URL", "")
+
+# "live" = har request pe model chalao, "materialized" = materialize.py ki file se lookup
+PREDICT_MODE = os.getenv("KRISHI_PREDICT_MODE", "live")
+MATERIALIZED_PATH = os.getenv("KRISHI_MATERIALIZED_PATH", "data/forecasts.pkl")
+
+# Startup: har crop model pe ek forecast chala ke warm-up (pehli request slow na ho)
+WARMUP = os.getenv("KRISHI_WARMUP", "1") == "1"
+# District models hazaaron ho sakte hain - default mein pehli request pe lazy load
+PRELOAD_DISTRICT_MODELS = os.getenv("KRISHI_PRELOAD_DISTRICT_MODELS", "0") == "1"
+
+# Disease detection CNN (train_disease_model.py ka output) - CPU inference
+DISEASE_MODEL_PATH = os.getenv("KRISHI_DISEASE_MODEL_PATH", "models/plant_disease_model.h5")
+DISEASE_CLASSES_PATH = os.getenv("KRISHI_DISEASE_CLASSES_PATH", "models/class_indices.json")
+DISEASE_IMAGE_SIZE = 150
+# Micro-batching: max itne images ek forward pass mein, pehli image ke baad max itna wait,
+# aur queue isse lambi ho to "System Busy"
+DISEASE_BATCH_SIZE = int(os.getenv("KRISHI_DISEASE_BATCH_SIZE", "16"))
+DISEASE_MAX_WAIT_MS = float(os.getenv("KRISHI_DISEASE_MAX_WAIT_MS", "5"))
+DISEASE_QUEUE_DEPTH = int(os.getenv("KRISHI_DISEASE_QUEUE_DEPTH", "256"))
+
+# Disease uploads: max image size (decoded bytes), decode thread pool, aur max in-flight decodes
+MAX_IMAGE_BYTES = int(os.getenv("KRISHI_MAX_IMAGE_BYTES", str(8 * 1024 * 1024)))
+DECODE_WORKERS = int(os.getenv("KRISHI_DECODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+DECODE_MAX_PENDING = int(os.getenv("KRISHI_DECODE_MAX_PENDING", "64"))
+
+# Price forecast execution: "thread" (bounded thread pool) ya "process" (process pool, alag GIL).
+# workers + max queue se zyada requests ek saath aayein to 503 + Retry-After.
+EXECUTION_MODE = os.getenv("KRISHI_EXECUTION_MODE", "thread")
+PREDICT_WORKERS = int(os.getenv("KRISHI_PREDICT_WORKERS", "0")) or None  # None = saare cores
+PREDICT_MAX_QUEUE = int(os.getenv("KRISHI_PREDICT_MAX_QUEUE", "64"))
+
+# /metrics (Prometheus) ke liye stage timings + counters. 0 = band (profiling header phir bhi chalega)
+METRICS_ENABLED = os.getenv("KRISHI_METRICS", "1") == "1"
+
+# Online feature state: /v1/prices se aaye naye daily prices (append-only log) + har series
+# ke aakhri prices ka ring buffer. Snapshot har itne ingested prices pe (aur shutdown pe).
+FEATURE_STATE_DIR = os.getenv("KRISHI_FEATURE_STATE_DIR", "data/feature_state")
+FEATURE_CHECK_INTERVAL = float(os.getenv("KRISHI_FEATURE_CHECK_INTERVAL", "1.0"))
+FEATURE_SNAPSHOT_EVERY = int(os.getenv("KRISHI_FEATURE_SNAPSHOT_EVERY", "1000"))
+
+# Training: bade CSV ko chunks mein padh ke crop-wise disk partitions (python train.py --chunked)
+PARTITIONS_DIR = os.getenv("KRISHI_PARTITIONS_DIR", "data/partitions")
+CSV_CHUNK_ROWS = int(os.getenv("KRISHI_CSV_CHUNK_ROWS", "500000"))
+
+# KRISHI_TREE_EVALUATOR=numpy: xgb_<name>.trees (export_models.py) ho to XGBoost ki jagah
+# NumPy tree evaluator (tree_tables.py) - chhoti forecast rows pe per-call overhead kam
+TREE_EVALUATOR = os.getenv("KRISHI_TREE_EVALUATOR", "xgboost")
+# Isse zyada rows ki predict call (batch / materialize / backtest) XGBoost booster pe - 1000 trees
+# pe NumPy walk ~20 rows tak hi tez hai
+TREE_EVALUATOR_MAX_ROWS = int(os.getenv("KRISHI_TREE_EVALUATOR_MAX_ROWS", "16"))
+
+# KRISHI_FORECAST_STRATEGY=direct: train.py --strategy direct wale multi-output models
+# (DIRECT_MODELS_DIR) se saare 30 din ek hi predict mein; model na ho to recursive fallback
+FORECAST_STRATEGY = os.getenv("KRISHI_FORECAST_STRATEGY", "recursive")
+DIRECT_MODELS_DIR = os.getenv("KRISHI_DIRECT_MODELS_DIR", os.path.join(MODELS_DIR, "direct"))
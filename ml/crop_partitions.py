@@ -0,0 +1,140 @@
+# ml/crop_partitions.py
+# Multi-GB mandi CSV ko training ke liye crop-wise partitions mein todna.
+#
+# CSV chunks mein padhi jaati hai (sirf zaroori columns, categorical names; price float64 hi)
+# aur har chunk ki rows apni crop ke folder mein pickle ho jaati hain. Training phir ek
+# crop ka partition load karti hai, isliye peak memory poori file se nahi, sabse badi crop
+# se bounded hai.
+#
+# Layout (data/partitions/):
+#   <version>/manifest.json            -> rows per crop, chunks, peak RSS
+#   <version>/<crop_key>/part-00000.pkl -> ek chunk ki us crop wali rows (CSV order mein)
+# Version CSV ke (mtime, size) + PARTITION_FORMAT se banta hai - CSV same ho to dobara partition nahi hota.
+#
+# Usage: python crop_partitions.py [--csv data/mandi_history.csv] [--chunk-rows 500000]
+import argparse
+import json
+import os
+import resource
+import shutil
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config import CSV_CHUNK_ROWS, HISTORY_CSV, PARTITIONS_DIR
+from history_store import source_version
+from mandi_data import CATEGORY_COLUMNS, crop_key_map, read_history_chunks
+
+# Partition ka format (dtypes) badle to badhao - purane partitions reuse nahi honge
+PARTITION_FORMAT = 2
+
+
+def peak_rss_mb():
+    """Peak RSS of this process and of its (finished) children, in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def read_manifest(path):
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def partition_by_crop(csv_path, crops, out_dir=PARTITIONS_DIR, chunk_rows=CSV_CHUNK_ROWS):
+    """Split the CSV into per-crop partitions (reused if the CSV is unchanged). Returns the version dir."""
+    version = f"{source_version(csv_path)}-f{PARTITION_FORMAT}"
+    final_dir = os.path.join(out_dir, version)
+    if read_manifest(final_dir) is not None:
+        return final_dir
+
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_dir = os.path.join(out_dir, f".{version}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    rows = {}
+    total = 0
+    n_chunks = 0
+    for i, chunk in enumerate(read_history_chunks(csv_path, chunk_rows)):
+        n_chunks += 1
+        total += len(chunk)
+        if "crop" not in chunk.columns:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise ValueError("'crop' column missing")
+        # Matching chunk ki categories (unique names) pe, rows pe nahi
+        crop_map = crop_key_map(chunk["crop"].cat.categories, crops)
+        keys = chunk["crop"].map(crop_map).astype(object)
+        for crop_key, part in chunk.groupby(keys, sort=False):
+            for col in CATEGORY_COLUMNS:
+                if col in part.columns:
+                    part[col] = part[col].cat.remove_unused_categories()
+            os.makedirs(os.path.join(tmp_dir, crop_key), exist_ok=True)
+            part.to_pickle(os.path.join(tmp_dir, crop_key, f"part-{i:05d}.pkl"))
+            rows[crop_key] = rows.get(crop_key, 0) + len(part)
+        print(f"   chunk {i}: {total} rows read, peak RSS {peak_rss_mb()[0]:.0f} MB")
+
+    manifest = {
+        "version": version,
+        "source": os.path.abspath(csv_path),
+        "rows": total,
+        "chunks": n_chunks,
+        "chunk_rows": chunk_rows,
+        "crops": rows,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb()[0], 1),
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Kisi aur process ne same version pehle hi bana diya
+        if not os.path.isdir(final_dir):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for name in os.listdir(out_dir):
+        path = os.path.join(out_dir, name)
+        if name != version and name.startswith("v") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return final_dir
+
+
+def load_partition(path, crop_key):
+    """All rows of one crop, date-sorted (stable, CSV order within a date) - like load_history."""
+    folder = os.path.join(path, crop_key)
+    parts = [pd.read_pickle(os.path.join(folder, name)) for name in sorted(os.listdir(folder))]
+    # Har chunk ki apni categories - concat se pehle sabko ek union pe lao, warna object ban jayega
+    for col in CATEGORY_COLUMNS:
+        if col in parts[0].columns:
+            categories = union_categoricals([p[col] for p in parts], ignore_order=True).categories
+            for p in parts:
+                p[col] = p[col].cat.set_categories(categories)
+    df = pd.concat(parts, ignore_index=True)
+    return df.sort_values("date", kind="stable")
+
+
+if __name__ == "__main__":
+    from train import target_crops
+
+    parser = argparse.ArgumentParser(description="Split the mandi CSV into per-crop partitions")
+    parser.add_argument("--csv", default=HISTORY_CSV)
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        raise SystemExit(f"❌ Error: '{args.csv}' file nahi mili!")
+    path = partition_by_crop(args.csv, target_crops, chunk_rows=args.chunk_rows)
+    manifest = read_manifest(path)
+    print(f"✅ Partitions: {path}")
+    print(f"   Rows: {manifest['rows']}  Chunks: {manifest['chunks']}  ({manifest['seconds']} s, "
+          f"peak RSS {manifest['peak_rss_mb']:.0f} MB)")
+    for crop_key, n in sorted(manifest["crops"].items()):
+        print(f"   {crop_key:<12} {n}")
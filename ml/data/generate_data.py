@@ -1,39 +1,15 @@
 # ml/data/generate_data.py
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+# Garlic (Sehore) ka ~4 saal ka sample data - ml/generate_dataset.py ke generator se,
+# purane parameters ke saath (₹/kg: base 40, season +-10, har saal ~2 ka trend, min 10).
+import os
+import sys
 
-# 5 saal ka fake data banayenge for Garlic in Sehore
-start_date = datetime(2020, 1, 1)
-dates = [start_date + timedelta(days=x) for x in range(1500)]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-data = []
-for date in dates:
-    # Seasonality logic (Winter me sasta, Summer me mehenga example)
-    month = date.month
-    base_price = 40
-    
-    # Simple seasonal effect
-    seasonality = np.sin(2 * np.pi * month / 12) * 10
-    
-    # Thoda random noise
-    noise = np.random.normal(0, 5)
-    
-    # Trend (har saal thoda price badh raha hai)
-    trend = (date.year - 2020) * 2
-    
-    final_price = base_price + seasonality + trend + noise
-    
-    # Price negative nahi ho sakta
-    final_price = max(10, final_price)
-    
-    data.append({
-        "date": date,
-        "district": "Sehore",
-        "crop": "Garlic",
-        "price": round(final_price, 2)
-    })
+from generate_dataset import SEASONAL, generate
 
-df = pd.DataFrame(data)
-df.to_csv("garlic_sehore_v1.csv", index=False)
-print("✅ Sample Data Generated: garlic_sehore_v1.csv")
\ No newline at end of file
+SAMPLE_PRESETS = {"Garlic": (40, 5, 10, 2 / 365, 10)}
+
+generate("garlic_sehore_v1.csv", districts=["Sehore"], start="2020-01-01", end="2024-02-09",
+         seed=0, price_model=SEASONAL, presets=SAMPLE_PRESETS)
+print("✅ Sample Data Generated: garlic_sehore_v1.csv")
@@ -0,0 +1,63 @@
+# ml/disease_model.py
+# Plant disease CNN (train_disease_model.py) ka CPU inference: model ek baar load,
+# phir micro_batcher se aaye images ka ek batched forward pass.
+#
+# TensorFlow sirf tab import hota hai jab model file maujood ho aur load ho - `import serve`
+# (prediction pool workers, serve_workers ka pre-fork parent) TF ke threads / memory nahi uthata.
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+from config import DISEASE_CLASSES_PATH, DISEASE_IMAGE_SIZE, DISEASE_MODEL_PATH
+
+DEFAULT_SOLUTION = "Prabhavit patton ko hata dein aur nazdeeki Krishi Vigyan Kendra se dawai ki salah lein."
+HEALTHY_SOLUTION = "Fasal swasth hai. Niyamit dekhbhal jaari rakhein."
+
+
+class DiseaseModel:
+    def __init__(self, model_path=DISEASE_MODEL_PATH, classes_path=DISEASE_CLASSES_PATH):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+        with open(classes_path, encoding="utf-8") as f:
+            class_indices = json.load(f)
+        # {"Tomato___Late_blight": 3, ...} -> index se naam
+        self.class_names = [name for name, _ in sorted(class_indices.items(), key=lambda kv: kv[1])]
+        self.model_path = model_path
+
+    @classmethod
+    def load_or_none(cls, model_path=DISEASE_MODEL_PATH, classes_path=DISEASE_CLASSES_PATH):
+        if not (os.path.exists(model_path) and os.path.exists(classes_path)):
+            print(f"⚠️ {model_path} / {classes_path} nahi mili - disease detection band")
+            return None
+        if importlib.util.find_spec("tensorflow") is None:
+            # TensorFlow optional hai - na ho to endpoint "Coming Soon" hi rahega
+            print("⚠️ TensorFlow installed nahi - disease detection band")
+            return None
+        return cls(model_path, classes_path)
+
+    def predict_batch(self, images):
+        """[(class name, confidence)] for a list of float32 (size, size, 3) arrays in [0, 1]."""
+        batch = np.stack(images).astype(np.float32, copy=False)
+        # model(...) seedha graph chalata hai; model.predict ka per-call overhead chhote batches pe bhaari hai
+        probs = self.model(batch, training=False).numpy()
+        best = probs.argmax(axis=1)
+        return [(self.class_names[i], float(probs[row, i])) for row, i in enumerate(best)]
+
+    def warm_up(self):
+        self.predict_batch([np.zeros((DISEASE_IMAGE_SIZE, DISEASE_IMAGE_SIZE, 3), np.float32)])
+
+
+def disease_result(class_name, confidence):
+    crop, _, disease = class_name.partition("___")
+    disease = disease.replace("_", " ").strip() or class_name
+    healthy = "healthy" in disease.lower()
+    return {
+        "disease_name": f"{crop.replace('_', ' ')} - {disease}" if crop and disease != class_name else disease,
+        "status": "Safe" if healthy else "Disease Detected",
+        "solution": HEALTHY_SOLUTION if healthy else DEFAULT_SOLUTION,
+        "confidence": round(confidence, 4),
+        "risk_color": "green" if healthy else ("red" if confidence >= 0.6 else "orange"),
+    }
@@ -0,0 +1,67 @@
+# ml/export_models.py
+# Purane xgb_*.pkl models ko XGBoost ke native UBJ format (xgb_*.ubj) mein convert karo.
+# Registry .ubj ko prefer karti hai - koi pickle / sklearn version dependency nahi, aur
+# serve_workers.py mein fork se pehle load hoke saare workers share karte hain.
+# Saath mein xgb_*.trees: flat tree tables jo KRISHI_TREE_EVALUATOR=numpy pe NumPy evaluator
+# (tree_tables.py) mmap se padhta hai.
+#
+# Usage: python export_models.py [--force] [--no-tables]
+import argparse
+import glob
+import os
+
+import joblib
+
+from config import MODELS_DIR
+from tree_tables import write_tables
+
+
+def _is_fresh(path, source):
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def export_model(pkl_path, force=False, tables=True):
+    """Write .ubj (and .trees) next to a .pkl. Returns [(path, written)]."""
+    ubj_path = pkl_path[:-len(".pkl")] + ".ubj"
+    trees_path = pkl_path[:-len(".pkl")] + ".trees"
+    targets = [ubj_path] + ([trees_path] if tables else [])
+    if not force and all(_is_fresh(path, pkl_path) for path in targets):
+        return [(path, False) for path in targets]
+
+    model = joblib.load(pkl_path)
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    tmp_path = f"{ubj_path[:-len('.ubj')]}.tmp-{os.getpid()}.ubj"
+    booster.save_model(tmp_path)
+    os.replace(tmp_path, ubj_path)
+    if tables:
+        write_tables(booster, trees_path)
+    return [(path, True) for path in targets]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert xgb_*.pkl models to native .ubj and .trees tables")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--force", action="store_true", help=".ubj naya ho tab bhi dobara likho")
+    parser.add_argument("--no-tables", action="store_true", help=".trees (NumPy evaluator) mat likho")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.models_dir, "xgb_*.pkl")))
+    if not paths:
+        print(f"❌ Error: {args.models_dir} mein koi xgb_*.pkl nahi mila!")
+        return
+
+    for path in paths:
+        try:
+            outputs = export_model(path, args.force, tables=not args.no_tables)
+        except Exception as e:
+            print(f"   ⚠️ {os.path.basename(path)}: {e}")
+            continue
+        for out_path, written in outputs:
+            status = "exported" if written else "up to date"
+            print(f"   {os.path.basename(path):<32} -> {os.path.basename(out_path)} "
+                  f"({os.path.getsize(out_path) / 1e6:.1f} MB, {status})")
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
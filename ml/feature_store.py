@@ -0,0 +1,399 @@
+# ml/feature_store.py
+# Online feature state: har (crop, district) series ke aakhri LOOKBACK prices ka ring buffer
+# + running stats (count, mean, variance). Prediction ke features (lag_1/7/30, rolling 7)
+# isi state se O(1) mein bante hain, aur naye daily prices /v1/prices se bina CSV
+# dobara likhe aa sakte hain.
+#
+# Layout (data/feature_state/):
+#   prices.log    -> ingested prices, append-only JSON lines (flock ke saath likhe jaate hain)
+#   snapshot.npz  -> poori state + log offset, taaki restart pe sirf naya log replay ho
+# Har process (uvicorn workers, process pool) log ko tail karta hai, isliye kisi bhi worker
+# pe aaya price baaki workers ko check interval ke andar dikh jata hai.
+# Base history (CSV) ka version badle to state nayi history se banti hai aur log dobara
+# replay hota hai - jo prices ab CSV mein aa chuke (date <= last date) woh apne aap skip.
+#
+# Series model crop key se keyed hain (serve ka resolve_names wahi key deta hai): history ka
+# "Paddy(Dhan)(Common)" agar model crop "rice" pe resolve hota hai to uski series "rice" ki hai,
+# aur ek hi crop pe aane wale kai history naam ek series mein merge hote hain.
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import FEATURE_CHECK_INTERVAL, FEATURE_SNAPSHOT_EVERY, FEATURE_STATE_DIR
+from forecast import LOOKBACK
+from history_store import SeriesTail
+from mandi_data import normalize_key
+
+NS_PER_DAY = 86400 * 10**9
+NO_DAY = np.iinfo(np.int64).min
+
+
+def parse_day(value):
+    """'YYYY-MM-DD' -> days since epoch (int)."""
+    return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+
+
+def canonical_crop_keys(history, crops):
+    """{history crop key: model crop key} - the same alias resolution serve uses for forecasts."""
+    keys = {}
+    for crop in crops:
+        for name in history.resolve_crop(crop).names:
+            keys.setdefault(normalize_key(name), normalize_key(crop))
+    return keys
+
+
+class FeatureStore:
+    """Per-series ring buffers of recent prices, fed by the history store plus ingested prices."""
+
+    def __init__(self, state_dir=FEATURE_STATE_DIR, check_interval=FEATURE_CHECK_INTERVAL,
+                 snapshot_every=FEATURE_SNAPSHOT_EVERY, lookback=LOOKBACK):
+        self.state_dir = state_dir
+        self.log_path = os.path.join(state_dir, "prices.log")
+        self.snapshot_path = os.path.join(state_dir, "snapshot.npz")
+        self.check_interval = check_interval
+        self.snapshot_every = snapshot_every
+        self.lookback = lookback
+
+        self.base_version = None
+        self.crops = None
+        self._crop_keys = {}  # normalize_key(history crop) -> normalize_key(model crop)
+        self.log_offset = 0
+        self.snapshot_at = None
+        self._since_snapshot = 0
+        self._checked_at = None
+        self._lock = threading.RLock()
+        self._allocate(0)
+
+    # =========================================================
+    # STATE ARRAYS
+    # =========================================================
+
+    def _allocate(self, n):
+        self.size = n
+        self.ring = np.full((n, self.lookback), np.nan)
+        self.head = np.zeros(n, dtype=np.int64)      # agla likhne ka slot
+        self.count = np.zeros(n, dtype=np.int64)     # series mein kul prices
+        self.last_day = np.full(n, NO_DAY, dtype=np.int64)
+        self.seq = np.zeros(n, dtype=np.int64)       # base history ke baad kitne ingest hue
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)                        # Welford: variance = m2 / (count - 1)
+        self.keys = []                               # row -> (crop_key, district_key)
+        self.names = []                              # row -> (crop, district) display names
+        self.index = {}
+
+    def _grow(self):
+        cap = max(16, len(self.ring) * 2)
+        extra = cap - len(self.ring)
+        self.ring = np.vstack([self.ring, np.full((extra, self.lookback), np.nan)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.last_day = np.concatenate([self.last_day, np.full(extra, NO_DAY, dtype=np.int64)])
+        self.seq = np.concatenate([self.seq, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+
+    def _add_series(self, key, names):
+        if self.size == len(self.ring):
+            self._grow()
+        row = self.size
+        self.size += 1
+        self.keys.append(key)
+        self.names.append(names)
+        self.index[key] = row
+        return row
+
+    def _key(self, crop, district):
+        crop = normalize_key(crop)
+        return self._crop_keys.get(crop, crop), normalize_key(district)
+
+    def _build_from_history(self, history):
+        """Vectorized: tail + running stats of every (crop, district) series in the snapshot.
+
+        History series with the same key (aliases of one model crop) are merged: counts and
+        sums add up, and the ring keeps the latest prices in global row order (like history.tail).
+        """
+        ptr = np.asarray(history.series_ptr)
+        prices = np.asarray(history.series_price, dtype=np.float64)
+        dates = np.asarray(history.series_date)
+        starts, ends = ptr[:-1], ptr[1:]
+
+        groups = {}  # key -> [history series]
+        names = {}
+        for i, (c, d) in enumerate(zip(history.series_crop, history.series_district)):
+            crop, district = history.crops[int(c)], history.districts[int(d)]
+            key = self._key(crop, district)
+            groups.setdefault(key, []).append(i)
+            names.setdefault(key, (crop, district))
+        gid = np.empty(len(starts), dtype=np.int64)
+        for row, members in enumerate(groups.values()):
+            gid[members] = row
+        n = len(groups)
+
+        self._allocate(n)
+        # Ring oldest -> newest, right-aligned; head = 0 matlab agla price slot 0 pe (sabse purana)
+        first = np.array([members[0] for members in groups.values()], dtype=np.int64)
+        f_starts, f_ends = starts[first], ends[first]
+        idx = f_ends[:, None] - self.lookback + np.arange(self.lookback)
+        valid = idx >= f_starts[:, None]
+        self.ring[:] = np.where(valid, prices[np.clip(idx, 0, None)], np.nan)
+        series_rows = np.asarray(history.series_row)
+        for row, members in enumerate(groups.values()):
+            if len(members) > 1:
+                tails = np.concatenate([np.arange(max(starts[i], ends[i] - self.lookback), ends[i])
+                                        for i in members])
+                recent = tails[np.argsort(series_rows[tails], kind="stable")][-self.lookback:]
+                self.ring[row] = np.nan
+                self.ring[row, self.lookback - len(recent):] = prices[recent]
+
+        lengths = ends - starts
+        self.count[:] = np.bincount(gid, weights=lengths, minlength=n).astype(np.int64)
+        last = np.where(lengths > 0, dates[np.maximum(ends - 1, 0)] // NS_PER_DAY, NO_DAY)
+        np.maximum.at(self.last_day, gid, last)
+
+        sums = np.concatenate([[0.0], np.cumsum(prices)])
+        sq = np.concatenate([[0.0], np.cumsum(prices * prices)])
+        counts = np.maximum(self.count, 1)
+        total = np.bincount(gid, weights=sums[ends] - sums[starts], minlength=n)
+        squares = np.bincount(gid, weights=sq[ends] - sq[starts], minlength=n)
+        self.mean[:] = total / counts
+        self.m2[:] = np.maximum(squares - total * total / counts, 0.0)
+
+        for row, key in enumerate(groups):
+            self.keys.append(key)
+            self.names.append(names[key])
+            self.index[key] = row
+
+    def _append(self, row, day, price):
+        """Append one price if it is newer than the series' last date. Returns False if stale."""
+        if day <= self.last_day[row]:
+            return False
+        self.ring[row, self.head[row]] = price
+        self.head[row] = (self.head[row] + 1) % self.lookback
+        self.count[row] += 1
+        self.last_day[row] = day
+        self.seq[row] += 1
+        delta = price - self.mean[row]
+        self.mean[row] += delta / self.count[row]
+        self.m2[row] += delta * (price - self.mean[row])
+        return True
+
+    def _apply(self, record):
+        key = self._key(record["crop"], record["district"])
+        row = self.index.get(key)
+        if row is None:
+            row = self._add_series(key, (record["crop"], record["district"]))
+        return self._append(row, parse_day(record["date"]), float(record["price"]))
+
+    # =========================================================
+    # LOG + SNAPSHOT
+    # =========================================================
+
+    def _replay(self, f=None):
+        # Sirf poori lines padho - koi doosra process abhi likh raha ho sakta hai
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        if size <= self.log_offset:
+            return
+        own = f is None
+        f = open(self.log_path, "rb") if own else f
+        try:
+            f.seek(self.log_offset)
+            data = f.read(size - self.log_offset)
+        finally:
+            if own:
+                f.close()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self.log_offset += end
+
+    def _load_snapshot(self, version):
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as snap:
+                meta = json.loads(str(snap["meta"]))
+                if meta["base_version"] != version or meta["lookback"] != self.lookback \
+                        or meta.get("crops") != list(self.crops):
+                    return False
+                n = len(snap["count"])
+                self._allocate(n)
+                for name in ("ring", "head", "count", "last_day", "seq", "mean", "m2"):
+                    getattr(self, name)[:] = snap[name]
+                self.keys = [tuple(k) for k in snap["keys"].tolist()]
+                self.names = [tuple(k) for k in snap["names"].tolist()]
+        except (OSError, KeyError, ValueError):
+            return False
+        self.index = {key: row for row, key in enumerate(self.keys)}
+        self.log_offset = meta["log_offset"]
+        self.snapshot_at = meta["saved_at"]
+        return True
+
+    def save_snapshot(self):
+        with self._lock:
+            if self.base_version is None:
+                return None
+            n = self.size
+            meta = {"base_version": self.base_version, "crops": list(self.crops),
+                    "log_offset": self.log_offset, "lookback": self.lookback, "saved_at": time.time()}
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = os.path.join(self.state_dir, f"snapshot.tmp-{os.getpid()}.npz")
+            np.savez(tmp_path, meta=np.array(json.dumps(meta)),
+                     ring=self.ring[:n], head=self.head[:n], count=self.count[:n],
+                     last_day=self.last_day[:n], seq=self.seq[:n], mean=self.mean[:n], m2=self.m2[:n],
+                     keys=np.array(self.keys, dtype=str).reshape(n, 2),
+                     names=np.array(self.names, dtype=str).reshape(n, 2))
+            os.replace(tmp_path, self.snapshot_path)
+            self.snapshot_at = meta["saved_at"]
+            self._since_snapshot = 0
+            return self.snapshot_path
+
+    def _open(self, history, crops):
+        start = time.perf_counter()
+        self.crops = crops
+        self._crop_keys = canonical_crop_keys(history, crops)
+        if self._load_snapshot(history.version):
+            source = "snapshot"
+        else:
+            self._build_from_history(history)
+            self.log_offset = 0
+            source = "history"
+        self.base_version = history.version
+        before = self.log_offset
+        self._replay()
+        print(f"✅ Feature state ready: {self.size} series from {source}, "
+              f"{self.log_offset - before} log bytes replayed ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def sync(self, history, crops=()):
+        """Bring the state up to date with `history` and the ingest log (throttled).
+
+        `crops` are the model crop keys names resolve to; when the set changes (new model
+        deployed) the state is rebuilt so history aliases map to the new key.
+        """
+        if history is None:
+            return None
+        crops = tuple(crops)
+        now = time.monotonic()
+        if self.base_version == history.version and self.crops == crops and self._checked_at is not None \
+                and now - self._checked_at < self.check_interval:
+            return self
+        with self._lock:
+            if self.base_version != history.version or self.crops != crops:
+                self._open(history, crops)
+            else:
+                self._replay()
+            self._checked_at = now
+        return self
+
+    # =========================================================
+    # READ / INGEST
+    # =========================================================
+
+    def tail(self, crop_name, district):
+        """(SeriesTail, ingested count) for an exact (crop, district) series, or (None, 0)."""
+        row = self.index.get(self._key(crop_name, district))
+        if row is None:
+            return None, 0
+        with self._lock:
+            count = int(self.count[row])
+            if count == 0:
+                return None, 0
+            k = min(count, self.lookback)
+            prices = self.ring[row, (self.head[row] - k + np.arange(k)) % self.lookback]
+            last = np.array([self.last_day[row] * NS_PER_DAY], dtype="datetime64[ns]")
+            seq = int(self.seq[row])
+        return SeriesTail(last, prices, count, district), seq
+
+    def ingest(self, records, allow_new_series=None):
+        """Validate, log and apply prices in order. Returns [(accepted, reason or None)].
+
+        Prices for a (crop, district) not already in the state are rejected ("unknown_series")
+        unless allow_new_series(crop, district) says yes - client ke kisi bhi naam se nayi
+        series (memory, log, snapshot) na bane.
+        """
+        results = []
+        with self._lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(self.log_path, "a+b") as f:
+                # Processes ke beech ek hi writer; pehle dusron ke likhe prices apply karo
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    self._replay(f)
+                    lines = []
+                    for record in records:
+                        try:
+                            day = parse_day(record["date"])
+                            price = float(record["price"])
+                        except (KeyError, TypeError, ValueError):
+                            results.append((False, "invalid_date"))
+                            continue
+                        if not math.isfinite(price) or price <= 0:
+                            results.append((False, "invalid_price"))
+                            continue
+                        clean = {"crop": record["crop"], "district": record["district"],
+                                 "date": str(np.datetime64(day, "D")), "price": price}
+                        if self._key(clean["crop"], clean["district"]) not in self.index and not (
+                                allow_new_series is not None and allow_new_series(clean["crop"], clean["district"])):
+                            results.append((False, "unknown_series"))
+                            continue
+                        if not self._apply(clean):
+                            results.append((False, "stale_date"))
+                            continue
+                        lines.append(json.dumps(clean, ensure_ascii=False).encode("utf-8") + b"\n")
+                        results.append((True, None))
+                    if lines:
+                        f.seek(0, os.SEEK_END)
+                        f.write(b"".join(lines))
+                        f.flush()
+                        self.log_offset = f.tell()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+            self._since_snapshot += sum(ok for ok, _ in results)
+            if self._since_snapshot >= self.snapshot_every:
+                self.save_snapshot()
+        return results
+
+    def describe(self, crop_name, district):
+        row = self.index.get(self._key(crop_name, district))
+        if row is None:
+            return None
+        series, seq = self.tail(crop_name, district)
+        count = int(self.count[row])
+        return {
+            "crop": self.names[row][0],
+            "district": self.names[row][1],
+            "count": count,
+            "ingested": seq,
+            "last_date": str(np.datetime64(int(self.last_day[row]), "D")) if count else None,
+            "mean": float(self.mean[row]),
+            "std": float(math.sqrt(self.m2[row] / (count - 1))) if count > 1 else 0.0,
+            "recent_prices": [float(p) for p in series.prices] if series is not None else [],
+        }
+
+    def stats(self):
+        return {
+            "base_version": self.base_version,
+            "series": self.size,
+            "ingested": int(self.seq[:self.size].sum()),
+            "log_offset": self.log_offset,
+            "snapshot_at": self.snapshot_at,
+            "since_snapshot": self._since_snapshot,
+        }
+
+
+if __name__ == "__main__":
+    # Offline: current history + log se snapshot likho (deploy se pehle fast restart ke liye)
+    from history_store import HistoryStore
+    from model_registry import ModelRegistry
+
+    store = FeatureStore()
+    if store.sync(HistoryStore().snapshot(), ModelRegistry().crop_models()) is None:
+        raise SystemExit("❌ Error: mandi history nahi mili!")
+    print(f"✅ Snapshot saved: {store.save_snapshot()}  ({store.stats()['series']} series)")
@@ -0,0 +1,178 @@
+# ml/forecast.py
+# 30 din ka price forecast - serve.py aur offline jobs dono yahi use karte hain.
+#
+# recursive: har step pe pichla prediction wapas lag_1 / rolling_mean_7 mein jaata hai (30 predicts).
+# direct:    train.py --strategy direct ka multi-output model pehle din ki feature row se
+#            saare 30 din ek hi predict mein deta hai - koi step dusre pe depend nahi.
+# Pehle har step pe ek naya 1-row DataFrame banta tha aur model.predict() chalta tha;
+# ab ek preallocated float32 matrix (N series x 8 features) pe booster.inplace_predict
+# chalta hai, to N series ek saath bhi forecast ho sakti hain.
+import numpy as np
+
+from tree_tables import TreeEnsemble
+
+FEATURES = ['day_of_year', 'month', 'year', 'lag_1', 'lag_7', 'lag_30', 'rolling_mean_7', 'rolling_std_7']
+HORIZON = 30
+# Features banane ke liye series ki kitni aakhri values chahiye
+LOOKBACK = 30
+
+RECURSIVE = "recursive"
+DIRECT = "direct"
+STRATEGIES = (RECURSIVE, DIRECT)
+
+# State columns (float64): lag_1, lag_7, lag_30, rolling_mean_7, rolling_std_7
+STATE_SIZE = 5
+
+
+def series_state(prices, total=None):
+    """Starting lag/rolling inputs from the tail of a date-sorted price series."""
+    total = len(prices) if total is None else total
+    last = prices[-1]
+    tail7 = prices[-7:]
+    return np.array([
+        last,
+        prices[-7] if total > 7 else last,
+        prices[-30] if total > 30 else last,
+        tail7.mean(),
+        tail7.std(ddof=1) if total > 7 else 0,
+    ], dtype=np.float64)
+
+
+def horizon_dates(last_dates, horizon=HORIZON):
+    """(N, horizon) datetime64[D] array of the days after each series' last date."""
+    last_dates = np.asarray(last_dates).astype("datetime64[D]")
+    return last_dates[:, None] + np.arange(1, horizon + 1)
+
+
+def calendar_features(dates):
+    """day_of_year, month, year for a datetime64[D] array (shape (..., 3))."""
+    years = dates.astype("datetime64[Y]")
+    out = np.empty(dates.shape + (3,), dtype=np.float32)
+    out[..., 0] = (dates - years).astype(np.int64) + 1
+    out[..., 1] = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    out[..., 2] = years.astype(np.int64) + 1970
+    return out
+
+
+def booster_predictor(model):
+    """Array-in/array-out predict for an XGBRegressor, Booster or TreeEnsemble (same trees as model.predict)."""
+    if isinstance(model, TreeEnsemble):
+        return model.predict
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    try:
+        iteration_range = (0, booster.best_iteration + 1)
+    except AttributeError:
+        iteration_range = (0, 0)
+
+    def predict(X):
+        return booster.inplace_predict(X, iteration_range=iteration_range, validate_features=False)
+
+    return predict
+
+
+def recursive_forecast(predict, state, last_dates, horizon=HORIZON):
+    """Run the recursive forecast for N series at once.
+
+    state: (N, STATE_SIZE) float64 from series_state(); last_dates: (N,) datetime64.
+    Returns (prices (N, horizon) float32, dates (N, horizon) datetime64[D]).
+    """
+    state = np.asarray(state, dtype=np.float64).reshape(-1, STATE_SIZE)
+    n = state.shape[0]
+
+    dates = horizon_dates(last_dates, horizon)
+    calendar = calendar_features(dates)
+
+    # Buffers ek baar allocate - loop ke andar koi DataFrame / naya array nahi
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    lag_1 = state[:, 0].copy()
+    lag_7 = state[:, 1].copy()
+    rolling_mean_7 = state[:, 3].copy()
+    X[:, 5] = state[:, 2]
+    X[:, 7] = state[:, 4]
+    preds = np.empty((n, horizon), dtype=np.float32)
+
+    for h in range(horizon):
+        X[:, 0:3] = calendar[:, h]
+        X[:, 3] = lag_1
+        X[:, 4] = lag_7
+        X[:, 6] = rolling_mean_7
+
+        pred = predict(X)
+        preds[:, h] = pred
+
+        # Same update order as the original loop (float64 state, float32 predictions)
+        np.copyto(lag_7, lag_1)
+        np.copyto(lag_1, pred)
+        rolling_mean_7 *= 6
+        rolling_mean_7 += lag_1
+        rolling_mean_7 /= 7
+
+    return preds, dates
+
+
+def direct_forecast(predict, state, last_dates, horizon=HORIZON):
+    """All horizons for N series from one (N, 8) feature matrix and a single multi-output predict.
+
+    Same inputs and outputs as recursive_forecast; predict must return (N, horizon).
+    """
+    state = np.asarray(state, dtype=np.float64).reshape(-1, STATE_SIZE)
+    dates = horizon_dates(last_dates, horizon)
+
+    # Wahi row jo recursive ka pehla step banata hai
+    X = np.empty((state.shape[0], len(FEATURES)), dtype=np.float32)
+    X[:, 0:3] = calendar_features(dates[:, 0])
+    X[:, 3:8] = state
+    preds = np.asarray(predict(X), dtype=np.float32).reshape(state.shape[0], -1)
+    if preds.shape[1] != horizon:
+        raise ValueError(f"Direct model {preds.shape[1]} horizons deta hai, chahiye {horizon}")
+    return preds, dates
+
+
+# strategy -> fn(predict, state, last_dates) -> (prices, dates)
+FORECASTERS = {RECURSIVE: recursive_forecast, DIRECT: direct_forecast}
+
+
+def forecast_tails(model, tails, strategy=RECURSIVE):
+    """Formatted 30-day forecasts for a list of history_store.SeriesTail.
+
+    recursive: one matrix predict per step; direct: one predict for all series and days.
+    """
+    states = np.stack([series_state(t.prices, t.total) for t in tails])
+    last_dates = np.array([t.dates[-1] for t in tails])
+    prices, dates = FORECASTERS[strategy](booster_predictor(model), states, last_dates)
+    return [format_forecast(prices[row], dates[row]) for row in range(len(tails))]
+
+
+def format_forecast(prices, dates):
+    day_strings = np.datetime_as_string(dates, unit="D")
+    return [{"date": str(d), "price": round(float(p), 2)} for d, p in zip(day_strings, prices)]
+
+
+def forecast_summary(forecast):
+    """Current price, 30-day trend and farmer advice for a formatted forecast."""
+    current_price = forecast[0]["price"]
+    future_price = forecast[-1]["price"]
+
+    change_pct = ((future_price - current_price) / current_price) * 100
+
+    if change_pct > 5:
+        advice = f"AI: अगले 30 दिनों में भाव {int(change_pct)}% बढ़ने की उम्मीद है। होल्ड करें (Hold)।"
+        color = "green"
+        trend = "increasing"
+    elif change_pct < -5:
+        advice = f"AI: भाव {int(abs(change_pct))}% गिर सकता है। बेचें (Sell)।"
+        color = "red"
+        trend = "decreasing"
+    else:
+        advice = "AI: बाजार स्थिर रहेगा। आप अपनी सुविधानुसार निर्णय लें।"
+        color = "yellow"
+        trend = "stable"
+
+    return {
+        "current_price": current_price,
+        "forecast": forecast,
+        "advice": advice,
+        "risk_color": color,
+        "confidence": 0.94,
+        "trend": trend
+    }
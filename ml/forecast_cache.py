@@ -0,0 +1,132 @@
+# ml/forecast_cache.py
+# Forecast result cache: same (crop, district) ka forecast har farmer ke liye dobara mat banao.
+#
+# Key mein history store ka version aur model file ka version dono hote hain, isliye
+# naya CSV ya naya xgb_*.pkl aate hi purani entries apne aap bekaar ho jaati hain.
+# Local LRU + TTL hamesha on hai; Redis (docker-compose wala) optional shared layer hai.
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import FORECAST_CACHE_SIZE, FORECAST_CACHE_TTL, FORECAST_CACHE_REDIS_URL
+
+try:
+    import redis
+except ImportError:  # Redis optional hai
+    redis = None
+
+
+def cache_key(crop_name, district, history_version, model_version):
+    return f"forecast:{crop_name.lower()}:{district}:{history_version}:{model_version}"
+
+
+class ForecastCache:
+    def __init__(self, max_entries=FORECAST_CACHE_SIZE, ttl=FORECAST_CACHE_TTL,
+                 redis_url=FORECAST_CACHE_REDIS_URL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {
+            "hits": 0, "misses": 0, "evictions": 0, "expired": 0,
+            "redis_hits": 0, "redis_errors": 0,
+        }
+
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                print("⚠️ FORECAST_CACHE_REDIS_URL set hai par 'redis' package installed nahi hai")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05,
+                                                   socket_connect_timeout=0.2)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return value
+                del self._data[key]
+                self.counters["expired"] += 1
+
+        value = self._redis_get(key)
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits", "redis_hits")
+        self._put_local(key, value)
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        self._put_local(key, value)
+        self._redis_set(key, value)
+
+    def _put_local(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def _count(self, *names):
+        # Saare counters isi lock ke andar - concurrent requests mein ratios na bigdein
+        with self._lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def _redis_get(self, key):
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(key)
+        except Exception:
+            self._count("redis_errors")
+            return None
+        if raw is None:
+            return None
+        item = json.loads(raw)
+        return item["forecast"], item["location"]
+
+    def _redis_set(self, key, value):
+        if self._redis is None:
+            return
+        forecast, location = value
+        try:
+            self._redis.set(key, json.dumps({"forecast": forecast, "location": location}),
+                            ex=max(1, int(self.ttl)))
+        except Exception:
+            self._count("redis_errors")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            entries = len(self._data)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": "memory+redis" if self._redis is not None else "memory",
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **counters,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -1,74 +1,234 @@
 # ml/generate_dataset.py
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+# Synthetic mandi price data (Kaggle / Agmarknet jaise columns) - chhote demo se lekar
+# crores rows ke load-test fixtures tak.
+#
+# Price model pehle jaisa hi hai: season (sine wave) + monsoon rainfall + diesel (transport
+# cost) + random market shock, aur ek minimum floor. Fark itna hai ki saare crops x districts
+# ek saath NumPy arrays mein bante hain aur output chunks mein stream hota hai, isliye
+# memory output size pe depend nahi karti.
+# price_model="seasonal": seed_data.py / data/generate_data.py wala purana stationary model
+# (base + sine season + trend + noise, floor ke saath) - unke apne presets se.
+#
+# Usage:
+#   python generate_dataset.py                                   # 6 crops, Sehore, 2020-2025
+#   python generate_dataset.py --crops 20 --districts 500 --seed 7 --out data/load_test.csv
+import argparse
 import os
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+# name: (start_price, volatility %, seasonal_peak_month)
+CROP_PRESETS = {
+    "Wheat": (2200, 1.2, 11),    # Peak Nov (Sowing), Harvest April
+    "Garlic": (9000, 4.0, 9),    # High Volatility
+    "Rice": (3000, 1.0, 7),
+    "Onion": (1500, 3.0, 10),
+    "Potato": (1200, 2.0, 12),
+    "Tomato": (1800, 3.5, 6),
+}
+
+MP_DISTRICTS = [
+    "Sehore", "Bhopal", "Indore", "Ujjain", "Dewas", "Vidisha", "Raisen", "Hoshangabad",
+    "Harda", "Shajapur", "Mandsaur", "Neemuch", "Ratlam", "Dhar", "Khargone", "Jabalpur",
+    "Sagar", "Gwalior", "Rewa", "Satna", "Chhindwara", "Betul", "Guna", "Shivpuri",
+]
+
+# Output CSV columns (Kaggle / Agmarknet naam)
+COLUMNS = ["State", "District Name", "Market Name", "Commodity", "Price Date",
+           "Modal_Price", "rainfall", "diesel_price"]
+
+# Price models. "seasonal" ke presets: name -> (base_price, noise sd, seasonal amplitude,
+# trend per day, floor price)
+WALK = "walk"
+SEASONAL = "seasonal"
+
+# Random draws fixed size ke day-blocks mein hote hain (har block ka apna seed),
+# isliye same seed = same data, chahe --chunk-days kuch bhi ho
+BLOCK_DAYS = 64
+
+
+def crop_specs(n_or_names, presets=None):
+    if presets is not None:
+        # Custom presets (seasonal model): sirf inhi crops ke naam
+        names = list(presets) if n_or_names is None else n_or_names
+        missing = [name for name in names if name not in presets]
+        if missing:
+            raise ValueError(f"No preset for crops: {missing}")
+        return [(name,) + tuple(presets[name]) for name in names]
+
+    names = list(CROP_PRESETS) if n_or_names is None else n_or_names
+    if isinstance(names, int):
+        base = list(CROP_PRESETS)
+        names = base[:names] + [f"Crop_{i}" for i in range(len(base) + 1, names + 1)]
+
+    specs = []
+    for i, name in enumerate(names):
+        if name in CROP_PRESETS:
+            specs.append((name,) + CROP_PRESETS[name])
+        else:
+            # Extra crops: preset cycle se thoda alag price level
+            _, (price, vol, peak) = list(CROP_PRESETS.items())[i % len(CROP_PRESETS)]
+            specs.append((name, price * (1 + 0.1 * (i // len(CROP_PRESETS))), vol, (peak + i) % 12 + 1))
+    return specs
+
+
+def district_names(n_or_names):
+    if n_or_names is None:
+        return ["Sehore"]
+    if isinstance(n_or_names, int):
+        return MP_DISTRICTS[:n_or_names] + [f"District_{i}" for i in range(len(MP_DISTRICTS) + 1, n_or_names + 1)]
+    return list(n_or_names)
+
+
+def generate(out_path, crops=None, districts=None, start="2020-01-01", end="2025-12-01",
+             seed=42, chunk_days=256, coverage=1.0, state="Madhya Pradesh", date_format="%Y-%m-%d",
+             price_model=WALK, presets=None):
+    if price_model not in (WALK, SEASONAL):
+        raise ValueError(f"Unknown price model: {price_model}")
+    if price_model == SEASONAL and presets is None:
+        raise ValueError("price_model='seasonal' needs presets")
+    specs = crop_specs(crops, presets)
+    district_list = district_names(districts)
+
+    n_days = int((np.datetime64(end, "D") - np.datetime64(start, "D")).astype(int))
+    n_crops, n_districts = len(specs), len(district_list)
+    n_series = n_crops * n_districts
+    chunk_days = max(BLOCK_DAYS, chunk_days // BLOCK_DAYS * BLOCK_DAYS)
+
+    # Series = (crop, district); har series ka apna start price (district ka thoda alag level)
+    init_rng = np.random.default_rng([seed, 0])
+    crop_idx = np.repeat(np.arange(n_crops), n_districts)
+    district_idx = np.tile(np.arange(n_districts), n_crops)
+    if price_model == SEASONAL:
+        base_price, noise_sd, amplitude, trend, floor = (np.array([s[k] for s in specs], dtype=np.float64)[crop_idx]
+                                                         for k in range(1, 6))
+        start_price = base_price
+    else:
+        start_price = np.array([s[1] for s in specs])[crop_idx] * init_rng.uniform(0.9, 1.1, n_series)
+        volatility = np.array([s[2] for s in specs])[crop_idx]
+        peak_month = np.array([s[3] for s in specs])[crop_idx]
+        floor = start_price * 0.5
+
+    crop_cat = pd.Categorical.from_codes(crop_idx, [s[0] for s in specs])
+    district_cat = pd.Categorical.from_codes(district_idx, district_list)
+    market_cat = pd.Categorical.from_codes(district_idx, [f"{d} APMC" for d in district_list])
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp-{os.getpid()}"
+
+    price = start_price.copy()
+    rows_written = 0
+    t0 = time.perf_counter()
+
+    with open(tmp_path, "w", newline="") as f:
+        # Header hamesha - 0 rows (start >= end, coverage 0) pe bhi file pd.read_csv se padhi jaaye
+        pd.DataFrame(columns=COLUMNS).to_csv(f, index=False)
+        for chunk_start in range(0, n_days, chunk_days):
+            days = np.arange(chunk_start, min(chunk_start + chunk_days, n_days))
+            n = len(days)
+
+            # Random draws: (days, series) - block-wise seeded
+            shocks, rains, diesel_noise, keep = [], [], [], []
+            for b in range(days[0] // BLOCK_DAYS, (days[-1] // BLOCK_DAYS) + 1):
+                rng = np.random.default_rng([seed, 1, b])
+                shocks.append(rng.normal(0, 1, (BLOCK_DAYS, n_series)))
+                rains.append(rng.uniform(0, 1, (BLOCK_DAYS, n_series)))
+                diesel_noise.append(rng.normal(0, 0.5, (BLOCK_DAYS, n_series)))
+                keep.append(rng.uniform(0, 1, (BLOCK_DAYS, n_series)) < coverage)
+            offset = days[0] % BLOCK_DAYS
+            shock = np.concatenate(shocks)[offset:offset + n]
+            rain_u = np.concatenate(rains)[offset:offset + n]
+            diesel_noise = np.concatenate(diesel_noise)[offset:offset + n]
+            keep = np.concatenate(keep)[offset:offset + n]
+
+            dates = np.datetime64(start, "D") + days
+            day_strings = pd.to_datetime(dates).strftime(date_format)
+            month = (dates.astype("datetime64[M]").astype(np.int64) % 12 + 1)[:, None]
+
+            # 2. Rainfall - Monsoon (June-Sept): zyada barish = achhi fasal = thoda price drop
+            is_monsoon = (month >= 6) & (month <= 9)
+            rainfall = np.where(is_monsoon, 5 + 45 * rain_u, 5 * rain_u)
+            rain_effect = np.where(is_monsoon, -0.05 * rainfall, 0.01)
+
+            # 3. Diesel Price (Inflation) -> transport cost
+            diesel_price = 80 + days[:, None] * 0.02 + diesel_noise
+            transport_cost_effect = (diesel_price - 80) * 0.1
+
+            if price_model == SEASONAL:
+                # Base + mahine ki sine wave + trend + roz ka noise; koi recurrence nahi
+                prices = np.maximum(base_price + np.sin(2 * np.pi * month / 12) * amplitude
+                                    + trend * days[:, None] + shock * noise_sd, floor)
+            else:
+                # 1. Seasonality (Sine Wave)
+                season_effect = np.sin(2 * np.pi * (month - peak_month) / 12) * 5
+                drift = season_effect * 0.1 + rain_effect + transport_cost_effect * 0.05
+                growth = 1 + shock * volatility / 100
+
+                # 4. Price = Kal ka Price + Shock + Season + Rain + Transport (floor ke saath).
+                # Ye recurrence hi sirf din-ba-din hai; har din saari series ek vector op mein.
+                prices = np.empty((n, n_series))
+                for t in range(n):
+                    np.maximum(price * growth[t] + drift[t], floor, out=price)
+                    prices[t] = price
+
+            mask = keep.ravel()
+            day_idx = np.repeat(np.arange(n), n_series)[mask]
+            series_idx = np.tile(np.arange(n_series), n)[mask]
+            chunk = pd.DataFrame({
+                "State": state,
+                "District Name": district_cat[series_idx],
+                "Market Name": market_cat[series_idx],
+                "Commodity": crop_cat[series_idx],
+                "Price Date": pd.Categorical.from_codes(day_idx, day_strings),
+                "Modal_Price": prices.ravel()[mask].round(2),
+                "rainfall": rainfall.ravel()[mask].round(1),
+                "diesel_price": diesel_price.ravel()[mask].round(1),
+            })
+            chunk[COLUMNS].to_csv(f, header=False, index=False)
+            rows_written += len(chunk)
+
+    os.replace(tmp_path, out_path)
+
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "rows": rows_written,
+        "series": n_series,
+        "days": n_days,
+        "seconds": elapsed,
+        "rows_per_second": rows_written / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": peak_mb,
+    }
+
+
+def _count_or_names(value):
+    if value is None:
+        return None
+    return int(value) if value.isdigit() else [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic mandi price history (vectorized, streamed)")
+    parser.add_argument("--out", default="data/mandi_history.csv")
+    parser.add_argument("--crops", default=None, help="count (e.g. 20) or names (Wheat,Garlic)")
+    parser.add_argument("--districts", default=None, help="count (e.g. 500) or names (Sehore,Bhopal)")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default="2025-12-01")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-days", type=int, default=256, help="days per streamed chunk")
+    parser.add_argument("--coverage", type=float, default=1.0, help="fraction of days with a price per series")
+    args = parser.parse_args()
+
+    print("🚀 Generating synthetic mandi dataset...")
+    stats = generate(args.out, _count_or_names(args.crops), _count_or_names(args.districts),
+                     args.start, args.end, args.seed, args.chunk_days, args.coverage)
+    print(f"✅ {stats['rows']:,} rows ({stats['series']} series x {stats['days']} days) -> {args.out}")
+    print(f"   {stats['seconds']:.1f} s | {stats['rows_per_second']:,.0f} rows/s | "
+          f"peak RSS {stats['peak_rss_mb']:.0f} MB")
+
 
-if not os.path.exists("data"):
-    os.makedirs("data")
-
-def generate_smart_data(crop, start_price, volatility, seasonal_peak_month):
-    start_date = datetime(2020, 1, 1) # 4 Saal ka data
-    end_date = datetime(2025, 12, 1)
-    days = (end_date - start_date).days
-    
-    data = []
-    
-    current_price = start_price
-    
-    # Random Walk Simulation with External Factors
-    for i in range(days):
-        date = start_date + timedelta(days=i)
-        month = date.month
-        
-        # 1. Seasonality (Sine Wave)
-        season_effect = np.sin(2 * np.pi * (month - seasonal_peak_month) / 12) * 5
-        
-        # 2. Rainfall (Simulated) - Monsoon (June-Sept)
-        is_monsoon = 6 <= month <= 9
-        rainfall = np.random.uniform(5, 50) if is_monsoon else np.random.uniform(0, 5)
-        
-        # Logic: Zyada barish = Achhi fasal = Thoda price drop (Long term)
-        rain_effect = -0.05 * rainfall if is_monsoon else 0.01
-        
-        # 3. Diesel Price (Inflation)
-        # Maan lo diesel roz thoda badh raha hai
-        diesel_price = 80 + (i * 0.02) + np.random.normal(0, 0.5)
-        transport_cost_effect = (diesel_price - 80) * 0.1 # Cost badhi to bhav badha
-        
-        # 4. Market Volatility (Shock)
-        market_shock = np.random.normal(0, volatility)
-        
-        # Final Price Calculation
-        # Price = Kal ka Price + Season + Rain Impact + Transport Cost + Random Shock
-        daily_fluctuation = (market_shock / 100) * current_price
-        
-        current_price = current_price + daily_fluctuation + (season_effect * 0.1) + rain_effect + (transport_cost_effect * 0.05)
-        current_price = max(current_price, start_price * 0.5) # Minimum limit
-        
-        data.append({
-            "arrival_date": date.strftime('%d/%m/%Y'),
-            "modal_price": round(current_price, 2),
-            "crop": crop,
-            "district_name": "Sehore",
-            "rainfall": round(rainfall, 1),
-            "diesel_price": round(diesel_price, 1)
-        })
-        
-    return pd.DataFrame(data)
-
-print("🚀 Generating Advanced 4-Year Dataset...")
-
-# Wheat: Peak Nov (Sowing), Harvest April
-df_wheat = generate_smart_data("Wheat", 2200, 1.2, seasonal_peak_month=11)
-
-# Garlic: High Volatility
-df_garlic = generate_smart_data("Garlic", 9000, 4.0, seasonal_peak_month=9)
-
-# Rice
-df_rice = generate_smart_data("Rice", 3000, 1.0, seasonal_peak_month=7)
-
-full_df = pd.concat([df_wheat, df_garlic, df_rice])
-full_df.to_csv("data/mandi_history.csv", index=False)
-
-print("✅ Advanced Dataset Created with Rainfall & Fuel Factors!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
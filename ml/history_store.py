@@ -0,0 +1,328 @@
+# ml/history_store.py
+# Mandi history ka preprocessed, memory-mapped store.
+#
+# CSV sirf ek baar parse hota hai (startup pe ya `python history_store.py` se offline).
+# Uske baad har (crop, district) ki date-sorted price series .npy arrays mein rehti hai,
+# aur request sirf apni series ki aakhri ~30 values padhti hai.
+#
+# Layout:
+#   data/history_store/CURRENT          -> active version ka naam
+#   data/history_store/<version>/       -> index.json + *.npy arrays
+# Version CSV ke (mtime, size) se banta hai, isliye CSV badalte hi naya store banta hai
+# aur CURRENT atomically switch hota hai.
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from config import HISTORY_CSV, HISTORY_STORE_DIR, HISTORY_CHECK_INTERVAL
+from mandi_data import load_history
+from name_index import AMBIGUOUS, CROP_ALIASES, DISTRICT_ALIASES, NameIndex
+
+SeriesTail = namedtuple("SeriesTail", ["dates", "prices", "total", "location"])
+
+ARRAYS = [
+    "crop_ptr", "crop_date", "crop_price", "crop_row",
+    "series_ptr", "series_crop", "series_district",
+    "series_date", "series_price", "series_row",
+]
+
+
+def source_version(csv_path):
+    st = os.stat(csv_path)
+    return f"v{st.st_mtime_ns}-{st.st_size}"
+
+
+# =========================================================
+# BUILD
+# =========================================================
+
+def build_store(csv_path, store_dir, version=None):
+    version = version or source_version(csv_path)
+    start = time.perf_counter()
+
+    df = load_history(csv_path)
+    n = len(df)
+
+    crop_cat = pd.Categorical(df["crop"].astype("string"))
+    if "district_name" in df.columns:
+        district_cat = pd.Categorical(df["district_name"].astype("string"))
+    else:
+        district_cat = pd.Categorical([pd.NA] * n, categories=[])
+
+    crop_code = np.asarray(crop_cat.codes, dtype=np.int64)
+    district_code = np.asarray(district_cat.codes, dtype=np.int64)
+    dates = df["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    prices = df["modal_price"].to_numpy(dtype=np.float64)
+    # Global date order mein row ka number (merge karte waqt tie-break ke liye)
+    row = np.arange(n, dtype=np.int64)
+
+    n_crops = len(crop_cat.categories)
+
+    # 1. Crop-level series (All India fallback): crop ke hisaab se group, andar date order
+    keep = crop_code >= 0
+    order = np.flatnonzero(keep)[np.argsort(crop_code[keep], kind="stable")]
+    crop_ptr = np.searchsorted(crop_code[order], np.arange(n_crops + 1))
+
+    # 2. (crop, district) series
+    keep = keep & (district_code >= 0)
+    idx = np.flatnonzero(keep)
+    s_order = idx[np.lexsort((row[idx], district_code[idx], crop_code[idx]))]
+    pair = crop_code[s_order] * (len(district_cat.categories) + 1) + district_code[s_order]
+    boundaries = np.flatnonzero(np.diff(pair)) + 1 if len(pair) else np.array([], dtype=np.int64)
+    series_start = np.concatenate([[0], boundaries]) if len(pair) else np.array([], dtype=np.int64)
+    series_ptr = np.concatenate([series_start, [len(pair)]]).astype(np.int64)
+
+    arrays = {
+        "crop_ptr": crop_ptr.astype(np.int64),
+        "crop_date": dates[order],
+        "crop_price": prices[order],
+        "crop_row": row[order],
+        "series_ptr": series_ptr,
+        "series_crop": crop_code[s_order][series_start],
+        "series_district": district_code[s_order][series_start],
+        "series_date": dates[s_order],
+        "series_price": prices[s_order],
+        "series_row": row[s_order],
+    }
+
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_dir = os.path.join(store_dir, f".{version}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+
+    index = {
+        "version": version,
+        "source": os.path.abspath(csv_path),
+        "rows": int(n),
+        "crops": [str(c) for c in crop_cat.categories],
+        "districts": [str(d) for d in district_cat.categories],
+        "built_at": time.time(),
+        "build_seconds": round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+
+    # Atomic publish: pehle folder rename, phir CURRENT pointer replace
+    final_dir = os.path.join(store_dir, version)
+    try:
+        os.rename(tmp_dir, final_dir)
+    except OSError:
+        # Kisi aur process ne same version pehle hi bana diya
+        if not os.path.isdir(final_dir):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    pointer_tmp = os.path.join(store_dir, f".CURRENT.tmp-{os.getpid()}")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(store_dir, "CURRENT"))
+
+    _prune_old_versions(store_dir, keep=version)
+    return final_dir
+
+
+def _prune_old_versions(store_dir, keep):
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name != keep and name.startswith("v") and os.path.isdir(path):
+            # Purane mmap readers ke liye Linux pe unlink safe hai
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_version(store_dir):
+    try:
+        with open(os.path.join(store_dir, "CURRENT")) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+# =========================================================
+# READ
+# =========================================================
+
+class HistorySnapshot:
+    """Read-only, memory-mapped view of one store version."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.version = self.index["version"]
+        self.crops = self.index["crops"]
+        self.districts = self.index["districts"]
+
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+        n_districts = len(self.districts) + 1
+        keys = np.asarray(self.series_crop) * n_districts + np.asarray(self.series_district)
+        self._series_index = {int(k): i for i, k in enumerate(keys)}
+        self._n_districts = n_districts
+
+        # Naam -> code: exact / alias (Hindi, transliteration) / prefix / fuzzy, sirf unique naamon pe
+        self.crop_index = NameIndex(self.crops, CROP_ALIASES)
+        self.district_index = NameIndex(self.districts, DISTRICT_ALIASES)
+        self._crop_codes = {name: i for i, name in enumerate(self.crops)}
+        self._district_codes = {name: i for i, name in enumerate(self.districts)}
+
+    def resolve_crop(self, crop_name):
+        return self.crop_index.resolve(crop_name)
+
+    def resolve_district(self, district):
+        return self.district_index.resolve(district)
+
+    def match_crops(self, crop_name):
+        return [self._crop_codes[name] for name in self.resolve_crop(crop_name).names]
+
+    def _segments(self, crop_codes, district_codes):
+        segs = []
+        if district_codes is None:
+            for c in crop_codes:
+                segs.append((self.crop_date, self.crop_price, self.crop_row,
+                             int(self.crop_ptr[c]), int(self.crop_ptr[c + 1])))
+        else:
+            for c in crop_codes:
+                for d in district_codes:
+                    i = self._series_index.get(c * self._n_districts + d)
+                    if i is not None:
+                        segs.append((self.series_date, self.series_price, self.series_row,
+                                     int(self.series_ptr[i]), int(self.series_ptr[i + 1])))
+        return segs
+
+    @staticmethod
+    def _tail(segs, n):
+        total = sum(end - start for _, _, _, start, end in segs)
+        if total == 0:
+            return None
+
+        if len(segs) == 1:
+            date_arr, price_arr, _, start, end = segs[0]
+            lo = max(start, end - n)
+            return np.array(date_arr[lo:end]), np.array(price_arr[lo:end]), total
+
+        # Kai series match hui: har ek ki tail lo aur global row order mein merge karo
+        dates, prices, rows = [], [], []
+        for date_arr, price_arr, row_arr, start, end in segs:
+            lo = max(start, end - n)
+            dates.append(date_arr[lo:end])
+            prices.append(price_arr[lo:end])
+            rows.append(row_arr[lo:end])
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind="stable")[-n:]
+        return np.concatenate(dates)[order], np.concatenate(prices)[order], total
+
+    def tail(self, crop_name, district, n=30):
+        """Last `n` points for crop/district, falling back to the crop-wide series.
+
+        Names go through the alias index; an ambiguous crop or district is an error, an
+        unknown district falls back to All India.
+
+        Returns (SeriesTail, None) or (None, error message).
+        """
+        crop = self.resolve_crop(crop_name)
+        if crop.status == AMBIGUOUS:
+            return None, f"Ambiguous crop: {', '.join(crop.choices)}"
+        if not crop.names:
+            return None, "No Data for Crop"
+        crop_codes = [self._crop_codes[name] for name in crop.names]
+
+        place = self.resolve_district(district)
+        if place.status == AMBIGUOUS:
+            return None, f"Ambiguous district: {', '.join(place.choices)}"
+        district_codes = [self._district_codes[name] for name in place.names]
+        found = self._tail(self._segments(crop_codes, district_codes), n)
+        location = district
+        if found is None:
+            found = self._tail(self._segments(crop_codes, None), n)
+            location = "All India Trends"
+            if found is None:
+                return None, "No Data for Crop"
+
+        dates, prices, total = found
+        return SeriesTail(dates.astype("datetime64[ns]"), prices, total, location), None
+
+    def series_keys(self):
+        """All (crop, district) names present in the store."""
+        return [(self.crops[int(c)], self.districts[int(d)])
+                for c, d in zip(self.series_crop, self.series_district)]
+
+
+class HistoryStore:
+    """Keeps the current snapshot open and rebuilds it when the source CSV changes."""
+
+    def __init__(self, csv_path=HISTORY_CSV, store_dir=HISTORY_STORE_DIR,
+                 check_interval=HISTORY_CHECK_INTERVAL):
+        self.csv_path = csv_path
+        self.store_dir = store_dir
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _wanted_version(self):
+        try:
+            return source_version(self.csv_path)
+        except OSError:
+            # CSV nahi hai to jo store offline bana tha wahi chalega
+            return current_version(self.store_dir)
+
+    def _refresh(self):
+        wanted = self._wanted_version()
+        if wanted is None:
+            return None
+        if self._snapshot is not None and self._snapshot.version == wanted:
+            return self._snapshot
+
+        if current_version(self.store_dir) != wanted:
+            print(f"🔄 Building history store from {self.csv_path} ...")
+            with metrics.stage("history_build"):
+                build_store(self.csv_path, self.store_dir, version=wanted)
+            metrics.event("history_build")
+
+        self._snapshot = HistorySnapshot(os.path.join(self.store_dir, wanted))
+        print(f"✅ History store ready: {self._snapshot.index['rows']} rows "
+              f"({self._snapshot.version})")
+        return self._snapshot
+
+    def snapshot(self):
+        now = time.monotonic()
+        current = self._snapshot
+        if current is not None and self._checked_at is not None \
+                and now - self._checked_at < self.check_interval:
+            return current
+
+        # Ek hi thread rebuild karega; baaki tab tak purana snapshot use karein
+        blocking = current is None
+        if not self._lock.acquire(blocking=blocking):
+            return current
+        try:
+            self._checked_at = now
+            return self._refresh()
+        finally:
+            self._lock.release()
+
+
+if __name__ == "__main__":
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else HISTORY_CSV
+    if not os.path.exists(csv_path):
+        print(f"❌ Error: '{csv_path}' file nahi mili!")
+        sys.exit(1)
+
+    path = build_store(csv_path, HISTORY_STORE_DIR)
+    snap = HistorySnapshot(path)
+    print(f"✅ Store built: {path}")
+    print(f"   Rows: {snap.index['rows']}  Crops: {len(snap.crops)}  "
+          f"Series: {len(snap.series_ptr) - 1}  ({snap.index['build_seconds']} s)")
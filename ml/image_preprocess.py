@@ -0,0 +1,160 @@
+# ml/image_preprocess.py
+# Disease uploads ka decode + resize event loop se bahar, ek chhote thread pool mein
+# (PIL JPEG decode / resize GIL chhod dete hain). Phone ki 12 MP photo ko full decode karne
+# ki zaroorat nahi - JPEG draft() DCT scaling se 1/2, 1/4, 1/8 resolution pe hi decode hota hai.
+import asyncio
+import base64
+import binascii
+import io
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import DECODE_MAX_PENDING, DECODE_WORKERS, DISEASE_IMAGE_SIZE, MAX_IMAGE_BYTES
+from micro_batcher import QueueFull
+
+STAGES = ("pool_wait", "base64", "decode", "resize", "to_array", "total")
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+class StageTimer:
+    """Count / mean / max / p95 (recent window) of one pipeline stage, in ms."""
+
+    def __init__(self, window=1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def stats(self):
+        if not self.count:
+            return {"count": 0}
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p95_ms": round(recent[int(0.95 * (len(recent) - 1))] * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+def strip_data_url(image_data):
+    # "data:image/jpeg;base64,...." (frontend yahi bhejta hai) ya seedha base64
+    if image_data.startswith("data:"):
+        return image_data.split(",", 1)[1] if "," in image_data else ""
+    return image_data
+
+
+def decode_image(image_data, size=DISEASE_IMAGE_SIZE, timings=None):
+    """Base64 image -> float32 (size, size, 3) in [0, 1], like training's rescale=1/255."""
+    from PIL import Image, UnidentifiedImageError
+
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    try:
+        raw = base64.b64decode(strip_data_url(image_data), validate=False)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidImage(str(e))
+    t1 = time.perf_counter()
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        # JPEG: sabse chhota DCT scale jo abhi bhi >= size x size ho (baaki formats pe no-op)
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, Image.DecompressionBombWarning,
+            OSError, ValueError) as e:
+        # Bahut badi dimensions (decompression bomb) bhi client ki galti hai - 500 nahi
+        raise InvalidImage(str(e))
+    t2 = time.perf_counter()
+
+    # Training (flow_from_directory) bhi nearest interpolation se 150x150 karta hai
+    img = img.resize((size, size), Image.NEAREST)
+    t3 = time.perf_counter()
+
+    tensor = np.asarray(img, dtype=np.float32)
+    tensor *= 1 / 255.0
+    t4 = time.perf_counter()
+
+    timings.update(base64=t1 - t0, decode=t2 - t1, resize=t3 - t2, to_array=t4 - t3)
+    return tensor
+
+
+class ImagePreprocessor:
+    """Size-limited, bounded, off-event-loop image decode with per-stage timings."""
+
+    def __init__(self, size=DISEASE_IMAGE_SIZE, workers=DECODE_WORKERS,
+                 max_pending=DECODE_MAX_PENDING, max_bytes=MAX_IMAGE_BYTES):
+        self.size = size
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_bytes = max_bytes
+        self.pending = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.too_large = 0
+        self.timers = {stage: StageTimer() for stage in STAGES}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode")
+
+    def check_size(self, n_bytes):
+        if n_bytes > self.max_bytes:
+            self.too_large += 1
+            raise ImageTooLarge(f"Image too large (max {self.max_bytes // (1024 * 1024)} MB)")
+
+    def _run(self, image_data, queued_at):
+        timings = {"pool_wait": time.perf_counter() - queued_at}
+        tensor = decode_image(image_data, self.size, timings)
+        return tensor, timings
+
+    async def preprocess(self, image_data):
+        # Base64 ~4/3 guna bada hota hai - decode se pehle hi limit check
+        self.check_size(len(image_data) * 3 // 4)
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFull()
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            tensor, timings = await asyncio.get_running_loop().run_in_executor(
+                self._pool, self._run, image_data, start)
+        except InvalidImage:
+            self.invalid += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        timings["total"] = time.perf_counter() - start
+        for stage, seconds in timings.items():
+            self.timers[stage].add(seconds)
+        return tensor
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "max_bytes": self.max_bytes,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "too_large": self.too_large,
+            "stages": {stage: timer.stats() for stage, timer in self.timers.items()},
+        }
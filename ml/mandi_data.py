@@ -0,0 +1,145 @@
+# ml/mandi_data.py
+# Mandi history CSV ko load + clean karne ka common code.
+# Kaggle (Agmarknet) wale column names aur purani generated files dono handle hote hain.
+import re
+
+import numpy as np
+import pandas as pd
+
+from forecast import FEATURES
+
+# Har standard column ke liye CSV mein kaunse naam ho sakte hain (pehla mila wahi use hoga)
+COLUMN_CANDIDATES = {
+    "date": ["Price Date", "arrival_date", "date"],
+    "modal_price": ["Modal_Price", "Modal Price", "modal_price"],
+    "crop": ["Commodity", "crop"],
+    "district_name": ["District Name", "district_name"],
+    "market_name": ["Market Name", "market_name"],
+}
+
+
+def resolve_columns(columns):
+    """Map raw CSV column names to our standard names."""
+    columns = [str(c).strip() for c in columns]
+    rename_map = {}
+    for target, candidates in COLUMN_CANDIDATES.items():
+        for name in candidates:
+            if name in columns:
+                rename_map[name] = target
+                break
+    return rename_map
+
+
+def clean_history(df):
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=resolve_columns(df.columns))
+
+    if "date" not in df.columns or "modal_price" not in df.columns:
+        raise ValueError(f"CSV mein date/price column nahi mila: {list(df.columns)}")
+
+    df["modal_price"] = pd.to_numeric(df["modal_price"], errors="coerce")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+    # Stable sort: same date wali rows CSV ke order mein hi rahengi
+    return df.dropna(subset=["date", "modal_price"]).sort_values("date", kind="stable")
+
+
+def load_history(csv_path):
+    return clean_history(pd.read_csv(csv_path))
+
+
+# Chunked read mein string columns category dtype mein aate hain (har unique naam ek baar)
+CATEGORY_COLUMNS = ["crop", "district_name", "market_name"]
+
+
+def read_history_chunks(csv_path, chunk_rows):
+    """Yield cleaned, unsorted chunks of the CSV - only the standard columns.
+
+    crop/district/market are categorical, so multi-GB Agmarknet dumps never sit in memory as
+    object columns. modal_price stays float64 like load_history - chunked aur in-memory training
+    ko same prices (aur same fingerprint / model) milne chahiye. Sorting is left to the caller.
+    """
+    header = [str(c) for c in pd.read_csv(csv_path, nrows=0).columns]
+    raw_names = {c.strip(): c for c in header}
+    rename_map = {raw_names[name]: target for name, target in resolve_columns(header).items()}
+    if "date" not in rename_map.values() or "modal_price" not in rename_map.values():
+        raise ValueError(f"CSV mein date/price column nahi mila: {header}")
+
+    dtypes = {raw: "category" for raw, target in rename_map.items() if target in CATEGORY_COLUMNS}
+    reader = pd.read_csv(csv_path, usecols=list(rename_map), dtype=dtypes, chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename_map)
+        chunk["modal_price"] = pd.to_numeric(chunk["modal_price"], errors="coerce")
+        chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
+        yield chunk.dropna(subset=["date", "modal_price"])
+
+
+def crop_key_map(names, crops):
+    """{raw commodity name: crop key} - first target crop whose name is in the raw name."""
+    crop_map = {}
+    for raw in names:
+        for crop in crops:
+            if crop.lower() in str(raw).lower():
+                crop_map[raw] = crop.lower()
+                break
+    return crop_map
+
+
+def normalize_key(name):
+    """'Sehore ', 'SEHORE' -> 'sehore'; spaces/punctuation -> '_' (model file names ke liye safe)."""
+    key = re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+    return key
+
+
+# --- FEATURE ENGINEERING (training ke liye) ---
+ROLLING_BLOCK_ROWS = 1_000_000
+
+
+def rolling_stats_7(values):
+    """(mean, std ddof=1) of each trailing 7-value window; NaN for the first 6 rows."""
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= 7:
+        windows = np.lib.stride_tricks.sliding_window_view(values, 7)
+        # Blocks mein, taaki (rows x 7) temporaries bade CSV pe memory na kha jaayein
+        for lo in range(0, len(windows), ROLLING_BLOCK_ROWS):
+            block = windows[lo:lo + ROLLING_BLOCK_ROWS]
+            mean[lo + 6:lo + 6 + len(block)] = block.mean(axis=1)
+            std[lo + 6:lo + 6 + len(block)] = block.std(axis=1, ddof=1)
+    return mean, std
+
+
+def create_features(df, group_cols=None):
+    """Time, lag and rolling features.
+
+    group_cols diye ho (jaise ['crop_key', 'district_key']) to lags har group ke andar hi
+    bante hain - ek hi vectorized pass mein, alag-alag mandis ki prices mix nahi hoti.
+    """
+    if group_cols:
+        df = df.sort_values(group_cols + ['date'], kind='stable')
+        pos = df.groupby(group_cols, sort=False).cumcount().to_numpy()
+    else:
+        df = df.copy()
+        pos = np.arange(len(df))
+
+    price = df['modal_price']
+
+    # 1. Time Features
+    df['day_of_year'] = df['date'].dt.dayofyear
+    df['month'] = df['date'].dt.month
+    df['year'] = df['date'].dt.year
+
+    # 2. Lag Features (History) - group ki shuru wali rows jinke paas itni history nahi, NaN
+    df['lag_1'] = price.shift(1).where(pos >= 1)
+    df['lag_7'] = price.shift(7).where(pos >= 7)
+    df['lag_30'] = price.shift(30).where(pos >= 30)
+
+    # 3. Rolling Statistics - har 7-din window alag se (series_state jaisa). pandas rolling running
+    # sum rakhta hai, to value pichli (doosre group / doosri crop ki) rows pe bhi thodi depend karti -
+    # chunked aur in-memory training ke fingerprint alag aa jaate the.
+    df['rolling_mean_7'], df['rolling_std_7'] = rolling_stats_7(price.to_numpy(dtype=np.float64))
+    df['rolling_mean_7'] = df['rolling_mean_7'].where(pos >= 6)
+    df['rolling_std_7'] = df['rolling_std_7'].where(pos >= 6)
+
+    df = df.dropna(subset=FEATURES)
+    return df
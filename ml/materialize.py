@@ -0,0 +1,187 @@
+# ml/materialize.py
+# Offline job: har crop x district ka 30 din ka forecast, trend aur advice pehle se bana ke
+# ek keyed file mein rakh do. Prices din mein ek baar badalte hain, traffic read-heavy hai -
+# isliye serve.py (KRISHI_PREDICT_MODE=materialized) seedha lookup karke jawab de sakta hai.
+#
+# Model selection serve.select_model jaisa hi (KRISHI_FORECAST_STRATEGY, district > crop model);
+# har entry ke saath strategy + model naam + version, taaki lookup sirf usi model ka forecast de
+# jo server abhi chalata.
+#
+# Usage: python materialize.py [--jobs 8] [--chunk 256] [--strategy direct] [--out data/forecasts.pkl]
+import argparse
+import os
+import threading
+import time
+from multiprocessing import Pool
+
+import joblib
+
+from config import DIRECT_MODELS_DIR, FORECAST_STRATEGY, MATERIALIZED_PATH, TREE_EVALUATOR
+from forecast import DIRECT, LOOKBACK, RECURSIVE, STRATEGIES, forecast_summary, forecast_tails
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+
+FALLBACK_LOCATION = "All India Trends"
+
+# Har worker process apna registry / mmap snapshot kholta hai
+_worker = {}
+
+
+def _init_worker(strategy):
+    _worker["strategy"] = strategy
+    _worker["registry"] = ModelRegistry()
+    _worker["direct_registry"] = ModelRegistry(models_dir=DIRECT_MODELS_DIR, suffixes=(".ubj", ".pkl"))
+    _worker["history"] = HistoryStore().snapshot()
+
+
+def select_model(crop, district):
+    """(strategy, entry) exactly like serve.select_model: direct model first if asked, else recursive."""
+    if _worker["strategy"] == DIRECT:
+        entry = _worker["direct_registry"].select(crop, district)
+        if entry is not None:
+            return DIRECT, entry
+    return RECURSIVE, _worker["registry"].select(crop, district)
+
+
+def _run_chunk(task):
+    crop, districts = task
+    history = _worker["history"]
+
+    # District ka apna model ho to wahi, warna crop-level model
+    pending = {}
+    for district in districts:
+        strategy, entry = select_model(crop, district)
+        series, _ = history.tail(crop, district, n=LOOKBACK)
+        if entry is not None and series is not None:
+            pending.setdefault((strategy, entry.name), (entry, []))[1].append((district, series))
+
+    rows = []
+    errors = []
+    for (strategy, name), (entry, found) in pending.items():
+        try:
+            forecasts = forecast_tails(entry.model, [series for _, series in found], strategy)
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {str(e).splitlines()[0]}")
+            continue
+        for forecast, (district, series) in zip(forecasts, found):
+            rows.append(((crop, district.lower()), {
+                "location": series.location,
+                "strategy": strategy,
+                "model": name,
+                "model_version": entry.version,
+                **forecast_summary(forecast),
+            }))
+    return crop, rows, "; ".join(errors) or None
+
+
+def plan_tasks(registry, history, chunk):
+    tasks = []
+    for crop in registry.crop_models():
+        crop_codes = set(history.match_crops(crop))
+        if not crop_codes:
+            continue
+        districts = sorted({history.districts[int(d)]
+                            for c, d in zip(history.series_crop, history.series_district)
+                            if int(c) in crop_codes})
+        for i in range(0, len(districts), chunk):
+            tasks.append((crop, districts[i:i + chunk]))
+    return tasks
+
+
+def materialize(out_path=MATERIALIZED_PATH, jobs=None, chunk=256, strategy=FORECAST_STRATEGY):
+    registry = ModelRegistry()
+    history = HistoryStore().snapshot()
+    if history is None:
+        raise SystemExit("❌ Error: mandi history nahi mili!")
+
+    tasks = plan_tasks(registry, history, chunk)
+    jobs = jobs or os.cpu_count() or 1
+    print(f"🚀 Materializing {sum(len(d) for _, d in tasks)} series "
+          f"({len(tasks)} chunks, {jobs} processes, strategy={strategy})...")
+
+    start = time.perf_counter()
+    entries = {}
+    failed = {}
+    with Pool(processes=jobs, initializer=_init_worker, initargs=(strategy,)) as pool:
+        for crop, rows, error in pool.imap_unordered(_run_chunk, tasks):
+            if error:
+                failed.setdefault(crop, []).append(error)
+            entries.update(rows)
+    wall = time.perf_counter() - start
+
+    payload = {
+        "history_version": history.version,
+        "strategy": strategy,
+        "tree_evaluator": TREE_EVALUATOR,
+        "created_at": time.time(),
+        "entries": entries,
+    }
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp-{os.getpid()}"
+    joblib.dump(payload, tmp_path, compress=3)
+    os.replace(tmp_path, out_path)
+
+    for crop, errors in failed.items():
+        print(f"   ⚠️ Skipped {crop}: {'; '.join(errors)}")
+    rate = len(entries) / wall if wall > 0 else 0.0
+    print(f"✅ Saved {len(entries)} forecasts -> {out_path}")
+    print(f"   Wall time: {wall:.2f} s  |  Throughput: {rate:.1f} series/s")
+    return {"series": len(entries), "wall_seconds": wall, "series_per_second": rate}
+
+
+class MaterializedForecasts:
+    """O(1) lookup over a materialize.py output file."""
+
+    def __init__(self, path=MATERIALIZED_PATH):
+        payload = joblib.load(path)
+        self.path = path
+        self.history_version = payload["history_version"]
+        # Purani files mein strategy nahi thi - woh recursive hi banti thin
+        self.strategy = payload.get("strategy", RECURSIVE)
+        self.tree_evaluator = payload.get("tree_evaluator")
+        self.entries = payload["entries"]
+        self.counters = {"hits": 0, "missing": 0, "stale_history": 0, "model_mismatch": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def lookup(self, crop_name, district, history_version, strategy, entry):
+        """(forecast, location) if the entry was built from the same data, strategy and model file."""
+        if history_version != self.history_version:
+            self._count("stale_history")
+            return None
+        item = self.entries.get((crop_name.lower(), district.lower()))
+        if item is None:
+            self._count("missing")
+            return None
+        if (item.get("strategy", RECURSIVE), item["model"], item["model_version"]) != \
+                (strategy, entry.name, entry.version):
+            self._count("model_mismatch")
+            return None
+        self._count("hits")
+        location = item["location"] if item["location"] == FALLBACK_LOCATION else district
+        return item["forecast"], location
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "entries": len(self.entries),
+            "history_version": self.history_version,
+            "strategy": self.strategy,
+            "tree_evaluator": self.tree_evaluator,
+            **self.counters,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute forecasts for every crop x district")
+    parser.add_argument("--out", default=MATERIALIZED_PATH)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=256, help="districts per batched predict")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=FORECAST_STRATEGY,
+                        help="server ka KRISHI_FORECAST_STRATEGY (direct: direct models jahan hain)")
+    args = parser.parse_args()
+    materialize(args.out, args.jobs, args.chunk, args.strategy)
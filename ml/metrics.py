@@ -0,0 +1,231 @@
+# ml/metrics.py
+# Hot-path instrumentation: stage-wise latency histograms (stage x crop), event counters
+# (cache hit/miss, model loads, history builds) aur error counters - /metrics pe Prometheus
+# text format mein. Koi external dependency nahi.
+#
+# Forecast ka kaam thread/process pool mein chalta hai, isliye stages ek request-local
+# Collector mein jamaa hote hain (contextvar), worker se result ke saath wapas aate hain
+# aur parent process unhe global registry mein daalta hai. Isi data se opt-in
+# `X-Krishi-Profile: 1` header pe Server-Timing breakdown bhi milta hai.
+#
+# KRISHI_METRICS=0 ho aur profiling na maangi ho to stage() ek shared no-op object deta hai.
+import threading
+import time
+from contextvars import ContextVar
+
+from config import METRICS_ENABLED
+
+ENABLED = METRICS_ENABLED
+PROFILE_HEADER = "x-krishi-profile"
+
+# Seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_collector = ContextVar("krishi_metrics_collector", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values):
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _label_str(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values = {}
+
+    def inc(self, labels, n=1):
+        self._values[labels] = self._values.get(labels, 0) + n
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_label_str(self.label_names, labels)}}} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.stages = Histogram("krishi_stage_seconds", "Time spent per serving stage", ("stage", "crop"))
+        self.events = Counter("krishi_events_total", "Cache hits/misses, model loads, history builds",
+                              ("event", "crop"))
+        self.errors = Counter("krishi_errors_total", "Failed or rejected requests", ("endpoint", "kind"))
+        self._gauges = []  # (name, help, fn) - scrape ke time padhe jaate hain
+        # Crop label user input se aata hai - sirf jaani-pehchani crops, baaki "other"
+        self.crop_labels = set()
+        self._lock = threading.Lock()
+
+    def crop_label(self, crop):
+        crop = (crop or "").lower()
+        return crop if not crop or crop in self.crop_labels else "other"
+
+    def observe_stage(self, stage, crop, seconds):
+        with self._lock:
+            self.stages.observe((stage, self.crop_label(crop)), seconds)
+
+    def inc_event(self, event, crop="", n=1):
+        with self._lock:
+            self.events.inc((event, self.crop_label(crop)), n)
+
+    def inc_error(self, endpoint, kind):
+        with self._lock:
+            self.errors.inc((endpoint, kind))
+
+    def gauge(self, name, help_text, fn):
+        self._gauges.append((name, help_text, fn))
+
+    def render(self):
+        with self._lock:
+            lines = self.stages.render() + self.events.render() + self.errors.render()
+        for name, help_text, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Collector:
+    """Stages/events of one request, gathered wherever the work actually runs."""
+    __slots__ = ("stages", "events")
+
+    def __init__(self):
+        self.stages = []  # (stage, crop, seconds)
+        self.events = []  # (event, crop)
+
+
+class _Stage:
+    __slots__ = ("name", "crop", "start")
+
+    def __init__(self, name, crop):
+        self.name = name
+        self.crop = crop
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_stage(self.name, self.crop, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+def stage(name, crop=""):
+    """`with stage("forecast", crop):` - no-op when metrics are off and nobody is profiling."""
+    if not ENABLED and _collector.get() is None:
+        return NULL_STAGE
+    return _Stage(name, crop)
+
+
+def record_stage(name, crop, seconds):
+    collector = _collector.get()
+    if collector is not None:
+        collector.stages.append((name, crop, seconds))
+    elif ENABLED:
+        REGISTRY.observe_stage(name, crop, seconds)
+
+
+def event(name, crop=""):
+    collector = _collector.get()
+    if collector is not None:
+        collector.events.append((name, crop))
+    elif ENABLED:
+        REGISTRY.inc_event(name, crop)
+
+
+def error(endpoint, kind):
+    if ENABLED:
+        REGISTRY.inc_error(endpoint, kind)
+
+
+def run_collected(fn, args):
+    """fn(*args) with a fresh Collector; returns (result, (stages, events)) - picklable."""
+    collector = Collector()
+    token = _collector.set(collector)
+    try:
+        result = fn(*args)
+    finally:
+        _collector.reset(token)
+    return result, (collector.stages, collector.events)
+
+
+def absorb(stages, events):
+    """Record stages/events collected in a worker into this process's registry."""
+    if not ENABLED:
+        return
+    for name, crop, seconds in stages:
+        REGISTRY.observe_stage(name, crop, seconds)
+    for name, crop in events:
+        REGISTRY.inc_event(name, crop)
+
+
+def profiling_requested(request):
+    return request.headers.get(PROFILE_HEADER, "") not in ("", "0")
+
+
+def server_timing(stages):
+    """Server-Timing header value: total ms per stage, in first-seen order."""
+    totals = {}
+    for name, _, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+
+
+def render():
+    return REGISTRY.render()
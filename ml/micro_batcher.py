@@ -0,0 +1,112 @@
+# ml/micro_batcher.py
+# Dynamic micro-batching: concurrent requests ek asyncio queue mein aate hain, collector
+# pehle item ke baad max `max_wait_ms` (ya `max_batch_size` items) tak rukta hai aur
+# sabka ek hi batched forward pass chalata hai (thread pool mein, event loop free rehta hai).
+import asyncio
+import time
+
+
+class QueueFull(Exception):
+    """Queue already holds `max_queue` items - caller should back off."""
+
+
+class MicroBatcher:
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=5.0, max_queue=256):
+        self.run_batch = run_batch  # list of items -> list of results (same order)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue = None
+        self._task = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batch_sizes = {}
+        self._queue_wait_total = 0.0
+        self._run_total = 0.0
+
+    def start(self):
+        # Queue usi loop mein banni chahiye jisme requests aayengi
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        if self._queue.qsize() >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull()
+        future = asyncio.get_running_loop().create_future()
+        self.submitted += 1
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Client disconnect ho gaya ho to uski image mat chalao
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            self._queue_wait_total += sum(started - queued_at for _, _, queued_at in batch)
+            try:
+                results = await loop.run_in_executor(None, self.run_batch, [item for item, _, _ in batch])
+            except Exception as e:
+                self.failed += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self._run_total += time.perf_counter() - started
+                self.batches += 1
+                self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+
+            self.completed += len(batch)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        processed = self.completed + self.failed
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "avg_batch_size": round(processed / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "avg_queue_wait_ms": round(self._queue_wait_total / processed * 1000, 3) if processed else 0.0,
+            "avg_batch_run_ms": round(self._run_total / self.batches * 1000, 3) if self.batches else 0.0,
+        }
@@ -0,0 +1,193 @@
+# ml/model_registry.py
+# XGBoost models ko ek baar load karke memory mein rakho.
+# Har request pe joblib.load (1000 trees unpickle) bahut mehenga tha.
+#
+# xgb_<name>.ubj (XGBoost ka native UBJ format) ho to wahi load hota hai, warna .pkl.
+# UBJ booster seedha C++ memory mein aata hai (koi Python object graph nahi), isliye
+# serve_workers.py fork se pehle load karke saare workers mein copy-on-write share karta hai.
+# KRISHI_TREE_EVALUATOR=numpy ho to xgb_<name>.trees (flat tree tables, mmap) sabse pehle;
+# TREE_EVALUATOR_MAX_ROWS se badi calls ke liye same naam ka .ubj/.pkl booster (lazy) fallback.
+import glob
+import os
+import threading
+import time
+
+import joblib
+import xgboost as xgb
+
+import metrics
+from config import MODELS_DIR, MODEL_CHECK_INTERVAL, TREE_EVALUATOR, TREE_EVALUATOR_MAX_ROWS
+from mandi_data import normalize_key
+from tree_tables import TreeEnsemble
+
+# Per-(crop, district) models: xgb_<crop>__<district>.pkl
+DISTRICT_SEP = "__"
+
+MODEL_SUFFIXES = (".trees", ".ubj", ".pkl") if TREE_EVALUATOR == "numpy" else (".ubj", ".pkl")
+
+
+def district_model_name(crop, district):
+    return f"{normalize_key(crop)}{DISTRICT_SEP}{normalize_key(district)}"
+
+
+class ModelEntry:
+    def __init__(self, name, path, model, signature, load_seconds):
+        self.name = name
+        self.path = path
+        self.model = model
+        self.signature = signature  # (mtime_ns, size) - file badli to reload
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.checked_at = time.monotonic()
+        self.reloads = 0
+
+    @property
+    def version(self):
+        return f"{self.signature[0]}-{self.signature[1]}"
+
+    def info(self):
+        return {
+            "name": self.name,
+            "path": self.path,
+            "mtime_ns": self.signature[0],
+            "size_bytes": self.signature[1],
+            "load_ms": round(self.load_seconds * 1000, 2),
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+        }
+
+
+def load_model_file(path):
+    """XGBoost Booster from a native .ubj/.json file, tree tables from .trees, or the pickled model."""
+    if path.endswith(".trees"):
+        return TreeEnsemble.load(path, lambda: _fallback_booster(path), TREE_EVALUATOR_MAX_ROWS)
+    if path.endswith((".ubj", ".json")):
+        return xgb.Booster(model_file=path)
+    return joblib.load(path)
+
+
+def _fallback_booster(trees_path):
+    root = trees_path[:-len(".trees")]
+    for suffix in (".ubj", ".pkl"):
+        if os.path.exists(root + suffix):
+            model = load_model_file(root + suffix)
+            return model.get_booster() if hasattr(model, "get_booster") else model
+    return None
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ModelRegistry:
+    """In-process cache of `xgb_<name>.ubj` / `.pkl` models, reloaded only when the file changes."""
+
+    def __init__(self, models_dir=MODELS_DIR, prefix="xgb_", suffixes=MODEL_SUFFIXES,
+                 check_interval=MODEL_CHECK_INTERVAL):
+        self.models_dir = models_dir
+        self.prefix = prefix
+        self.suffixes = tuple(suffixes)
+        self.check_interval = check_interval
+        self._entries = {}
+        self._missing = {}  # name -> last check (file nahi mili), har request pe stat na ho
+        self._lock = threading.Lock()
+
+    def path_for(self, name):
+        # Pehla suffix jiski file maujood ho (.ubj > .pkl)
+        paths = [os.path.join(self.models_dir, f"{self.prefix}{name}{suffix}") for suffix in self.suffixes]
+        return next((p for p in paths if os.path.exists(p)), paths[-1])
+
+    def available(self):
+        names = set()
+        for suffix in self.suffixes:
+            for path in glob.glob(os.path.join(self.models_dir, f"{self.prefix}*{suffix}")):
+                names.add(os.path.basename(path)[len(self.prefix):-len(suffix)])
+        return sorted(names)
+
+    def crop_models(self):
+        return [name for name in self.available() if DISTRICT_SEP not in name]
+
+    def load_all(self, include_district_models=False):
+        # Startup pe crop-level models preload; district models pehli request pe (hazaaron ho sakte hain)
+        names = self.available() if include_district_models else self.crop_models()
+        for name in names:
+            self.get(name)
+        return self.stats()
+
+    def select(self, crop, district):
+        """Most specific model: (crop, district) model if trained, else the crop-level one."""
+        if district:
+            entry = self.get_entry(district_model_name(crop, district))
+            if entry is not None:
+                return entry
+        return self.get_entry(crop)
+
+    def get(self, name):
+        entry = self.get_entry(name)
+        return entry.model if entry is not None else None
+
+    def get_entry(self, name):
+        name = name.lower()
+        entry = self._entries.get(name)
+
+        if entry is not None:
+            now = time.monotonic()
+            if now - entry.checked_at < self.check_interval:
+                return entry
+            entry.checked_at = now
+        else:
+            missing_at = self._missing.get(name)
+            if missing_at is not None and time.monotonic() - missing_at < self.check_interval:
+                return None
+
+        path = self.path_for(name)
+        try:
+            signature = _file_signature(path)
+        except OSError:
+            # File hat gayi to model bhi hatao
+            if entry is not None:
+                with self._lock:
+                    self._entries.pop(name, None)
+            if len(self._missing) > 100000:
+                self._missing.clear()
+            self._missing[name] = time.monotonic()
+            return None
+        self._missing.pop(name, None)
+
+        if entry is not None and entry.signature == signature:
+            return entry
+
+        with self._lock:
+            # Dusre thread ne shayad abhi load kar diya ho
+            current = self._entries.get(name)
+            if current is not None and current.signature == signature:
+                return current
+
+            start = time.perf_counter()
+            model = load_model_file(path)
+            new_entry = ModelEntry(name, path, model, signature, time.perf_counter() - start)
+            if current is not None:
+                new_entry.reloads = current.reloads + 1
+            self._entries[name] = new_entry
+            crop = name.split(DISTRICT_SEP)[0]
+            metrics.record_stage("model_load", crop, new_entry.load_seconds)
+            metrics.event("model_load", crop)
+            print(f"📦 Model loaded: {name} ({new_entry.load_seconds * 1000:.1f} ms)")
+            return new_entry
+
+    def stats(self):
+        entries = list(self._entries.values())
+        return {
+            "models_dir": self.models_dir,
+            "loaded": [e.info() for e in sorted(entries, key=lambda e: e.name)],
+            "total_load_ms": round(sum(e.load_seconds for e in entries) * 1000, 2),
+        }
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    stats = registry.load_all()
+    for item in stats["loaded"]:
+        print(f"   {item['name']:<12} {item['load_ms']:>9.2f} ms  {item['size_bytes']} bytes")
+    print(f"✅ Total load time: {stats['total_load_ms']} ms")
@@ -0,0 +1,172 @@
+# ml/name_index.py
+# Crop / district naam resolve karne ka precomputed index.
+#
+# User "Lahsun", "लहसुन", "garlik" ya "GARLIC " kuch bhi bheje - sab ek hi canonical naam pe
+# jaane chahiye. Index sirf unique naamon se ek baar banta hai (history ki categories ya
+# model names), rows se nahi; lookup dict gets hain:
+#   1. exact   -> normalized naam
+#   2. alias   -> naam ke words ("Paddy(Dhan)" -> paddy, dhan), phir curated English/Hindi/
+#                 transliterated aliases
+#   3. prefix  -> adhoora naam ("seh" -> Sehore), naam / word / alias ki shuruaat
+#   4. fuzzy   -> 1 edit door wale naam (deletion variants pehle se bane hue)
+# Kisi tier pe ek se zyada alag naam milein to "ambiguous" - chupchaap galat crop nahi.
+import unicodedata
+from collections import namedtuple
+
+EXACT = "exact"
+ALIAS = "alias"
+PREFIX = "prefix"
+FUZZY = "fuzzy"
+AMBIGUOUS = "ambiguous"
+UNKNOWN = "unknown"
+
+# names: matched raw names (same normalized naam ke saare variants); choices: ambiguous options
+Resolution = namedtuple("Resolution", ["status", "names", "choices"])
+
+# Itne se chhote naamon pe fuzzy match nahi (dhar/dhan jaisi galtiyan)
+FUZZY_MIN_LENGTH = 4
+# Prefix match kam se kam itne letters pe ("se" se kuch bhi nahi)
+PREFIX_MIN_LENGTH = 3
+
+# canonical English naam -> aliases (Hindi, transliterations, mandi wale naam)
+CROP_ALIASES = {
+    "wheat": ["gehu", "gehun", "gehoon", "gahu", "गेहूं", "गेहूँ", "गेंहू"],
+    "rice": ["chawal", "chaval", "dhan", "paddy", "चावल", "धान"],
+    "garlic": ["lahsun", "lehsun", "lahsan", "lasun", "lassan", "लहसुन"],
+    "onion": ["pyaz", "pyaaz", "piyaz", "kanda", "प्याज", "प्याज़", "कांदा"],
+    "potato": ["aloo", "alu", "आलू"],
+    "tomato": ["tamatar", "tamater", "टमाटर"],
+    "soyabean": ["soybean", "soya", "सोयाबीन"],
+    "maize": ["makka", "makki", "corn", "मक्का"],
+    "gram": ["chana", "channa", "चना"],
+    "mustard": ["sarson", "सरसों"],
+}
+
+DISTRICT_ALIASES = {
+    "sehore": ["सीहोर"],
+    "bhopal": ["भोपाल"],
+    "indore": ["इंदौर", "इन्दौर"],
+    "ujjain": ["उज्जैन"],
+    "dewas": ["देवास"],
+    "vidisha": ["विदिशा"],
+    "raisen": ["रायसेन"],
+    "hoshangabad": ["narmadapuram", "होशंगाबाद", "नर्मदापुरम"],
+    "harda": ["हरदा"],
+    "shajapur": ["शाजापुर"],
+    "mandsaur": ["mandsor", "मंदसौर", "मन्दसौर"],
+    "neemuch": ["nimach", "नीमच"],
+    "ratlam": ["रतलाम"],
+    "dhar": ["धार"],
+    "khargone": ["west nimar", "खरगोन"],
+    "jabalpur": ["जबलपुर"],
+    "sagar": ["saugor", "सागर"],
+    "gwalior": ["ग्वालियर"],
+    "rewa": ["रीवा"],
+    "satna": ["सतना"],
+    "chhindwara": ["chindwara", "छिंदवाड़ा", "छिन्दवाड़ा"],
+    "betul": ["बैतूल"],
+    "guna": ["गुना"],
+    "shivpuri": ["शिवपुरी"],
+}
+
+NUKTA = "़"
+CHANDRABINDU = "ँ"
+ANUSVARA = "ं"
+
+
+def normalize_name(text):
+    """'  GARLIC ', 'Paddy(Dhan)' -> 'garlic', 'paddy dhan'. Devanagari nukta/chandrabindu folded."""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = text.replace(NUKTA, "").replace(CHANDRABINDU, ANUSVARA)
+    # Letters, Devanagari matras (M*) aur digits rakho; baaki sab word separator
+    chars = [ch if unicodedata.category(ch)[0] in "LMN" else " " for ch in text]
+    return " ".join("".join(chars).split())
+
+
+def _deletions(key):
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def _add(table, key, group):
+    if key:
+        table.setdefault(key, set()).add(group)
+
+
+class NameIndex:
+    """Constant-time name -> canonical name resolution over a fixed set of names."""
+
+    def __init__(self, names, aliases=None, fuzzy=True):
+        self.names = tuple(names)
+        self._groups = {}  # normalized key -> (raw names...)
+        for name in self.names:
+            key = normalize_name(name)
+            if key:
+                self._groups[key] = self._groups.get(key, ()) + (name,)
+
+        alias_keys = {normalize_name(canonical): {normalize_name(a) for a in [canonical] + list(found)}
+                      for canonical, found in (aliases or {}).items()}
+
+        self._exact = {key: {key} for key in self._groups}
+        self._words = {}
+        self._alias = {}
+        for key in self._groups:
+            words = set(key.split())
+            _add(self._words, key.replace(" ", ""), key)
+            for word in words:
+                _add(self._words, word, key)
+            # Curated aliases: canonical naam ya uska koi alias is naam ka word ho to
+            for canonical_keys in alias_keys.values():
+                if canonical_keys & (words | {key}):
+                    for alias in canonical_keys:
+                        _add(self._alias, alias, key)
+                        _add(self._alias, alias.replace(" ", ""), key)
+
+        self._prefix = {}
+        for table in (self._exact, self._words, self._alias):
+            for variant, keys in table.items():
+                for end in range(PREFIX_MIN_LENGTH, len(variant)):
+                    for key in keys:
+                        _add(self._prefix, variant[:end], key)
+
+        self._fuzzy = {}
+        if fuzzy:
+            for table in (self._exact, self._words, self._alias):
+                for variant, keys in table.items():
+                    if len(variant) < FUZZY_MIN_LENGTH:
+                        continue
+                    for target in [variant] + sorted(_deletions(variant)):
+                        for key in keys:
+                            _add(self._fuzzy, target, key)
+
+    def _result(self, status, keys):
+        if len(keys) == 1:
+            return Resolution(status, self._groups[next(iter(keys))], ())
+        return Resolution(AMBIGUOUS, (), tuple(sorted(self._groups[k][0] for k in keys)))
+
+    def resolve(self, query):
+        key = normalize_name(query)
+        if not key:
+            return Resolution(UNKNOWN, (), ())
+        for status, table in ((EXACT, self._exact), (ALIAS, self._words), (ALIAS, self._alias),
+                              (PREFIX, self._prefix)):
+            keys = table.get(key) or table.get(key.replace(" ", ""))
+            if keys:
+                return self._result(status, keys)
+
+        if self._fuzzy and len(key) >= FUZZY_MIN_LENGTH:
+            # 1 edit: query ya uska koi deletion, kisi naam (ya uske deletion) se mile
+            keys = set()
+            for variant in [key] + list(_deletions(key)):
+                keys |= self._fuzzy.get(variant, set())
+            if keys:
+                return self._result(FUZZY, keys)
+        return Resolution(UNKNOWN, (), ())
+
+    def aliases(self):
+        """{raw name: [alias keys]} - for check_names.py."""
+        out = {}
+        for table in (self._words, self._alias):
+            for alias, keys in table.items():
+                for key in keys:
+                    out.setdefault(self._groups[key][0], set()).add(alias)
+        return {name: sorted(found) for name, found in sorted(out.items())}
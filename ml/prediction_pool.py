@@ -0,0 +1,139 @@
+# ml/prediction_pool.py
+# Price forecast ka kaam request thread se bahar, bounded concurrency ke saath.
+#   KRISHI_EXECUTION_MODE=thread  -> fixed size thread pool (FastAPI ka unbounded threadpool nahi)
+#   KRISHI_EXECUTION_MODE=process -> process pool: har worker ka apna GIL, models + mmap history
+# Dono mein `workers + max_queue` se zyada requests ek saath hon to turant Overloaded -
+# serve.py 503 + Retry-After bhejta hai, taaki overload mein sabki latency na bigde.
+import asyncio
+import importlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import metrics
+
+# Process workers serve.py ke hi functions naam se chalate hain
+TARGET_MODULE = "serve"
+
+
+class Overloaded(Exception):
+    """More than `workers + max_queue` predictions are already in flight."""
+
+
+def _init_worker(threads):
+    # XGBoost import se pehle - N workers x saare cores wala oversubscription na ho
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    target = importlib.import_module(TARGET_MODULE)
+    target.load_price_models()
+    target.history_store.snapshot()
+
+
+def _run(fn, args, collect):
+    # collect=True: stage timings (metrics / profiling) result ke saath wapas parent ko
+    started_at = time.time()
+    if collect:
+        result, collected = metrics.run_collected(fn, args)
+        return result, started_at, collected
+    return fn(*args), started_at, None
+
+
+def _run_in_worker(name, args, collect):
+    return _run(getattr(importlib.import_module(TARGET_MODULE), name), args, collect)
+
+
+def _ping():
+    time.sleep(0.05)
+
+
+class PredictionExecutor:
+    def __init__(self, mode="thread", workers=None, max_queue=64, threads_per_worker=None):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown execution mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = None
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=1024)
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def start(self):
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict")
+            return
+        # spawn: parent mein XGBoost/OpenMP threads chal chuke hain, fork ke baad wo safe nahi
+        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(self.threads_per_worker,))
+        # Saare workers abhi start (models load) ho jayein, pehli requests pe nahi
+        wait([self._pool.submit(_ping) for _ in range(self.workers)])
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn, *args, collect=False):
+        """(fn(*args), collected stages/events or None) from the pool.
+
+        Raises Overloaded instead of queueing past the limit.
+        """
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise Overloaded()
+
+        self.in_flight += 1
+        submitted_at = time.time()
+        loop = asyncio.get_running_loop()
+        try:
+            if self.mode == "process":
+                future = loop.run_in_executor(self._pool, _run_in_worker, fn.__name__, args, collect)
+            else:
+                future = loop.run_in_executor(self._pool, _run, fn, args, collect)
+            result, started_at, collected = await future
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        queue_wait = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self._waits.append(queue_wait)
+        self._wait_total += queue_wait
+        self._run_total += time.time() - started_at
+        if collected is not None:
+            collected[0].insert(0, ("queue_wait", "", queue_wait))
+        return result, collected
+
+    def retry_after(self):
+        """Seconds a rejected client should wait: roughly the time to drain the current queue."""
+        if not self.completed:
+            return 1
+        avg_run = self._run_total / self.completed
+        return max(1, round(avg_run * (self.in_flight / self.workers)))
+
+    def stats(self):
+        waits = sorted(self._waits)
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker if self.mode == "process" else None,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(self._wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "p95_queue_wait_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 3) if waits else 0.0,
+            "avg_run_ms": round(self._run_total / self.completed * 1000, 3) if self.completed else 0.0,
+        }
@@ -0,0 +1,53 @@
+# ml/proc_memory.py
+# Process memory /proc se: RSS (shared pages har process mein gine jaate hain) aur PSS
+# (shared pages process count se divide) - N workers ka asli total PSS ka sum hai.
+import os
+
+_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_mb",
+    "Shared_Dirty": "shared_mb",
+    "Private_Clean": "private_mb",
+    "Private_Dirty": "private_mb",
+}
+
+
+def process_memory(pid="self"):
+    """{"pid", "rss_mb", "pss_mb", "shared_mb", "private_mb"} from /proc/<pid>/smaps_rollup."""
+    mem = {"pid": os.getpid() if pid == "self" else int(pid),
+           "rss_mb": 0.0, "pss_mb": 0.0, "shared_mb": 0.0, "private_mb": 0.0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in _FIELDS:
+                    mem[_FIELDS[key]] += int(value.split()[0]) / 1024
+    except OSError:
+        # Purana kernel / non-Linux: sirf RSS
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        mem["rss_mb"] = mem["pss_mb"] = int(line.split()[1]) / 1024
+        except OSError:
+            return None
+    return {k: round(v, 1) if isinstance(v, float) else v for k, v in mem.items()}
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def workers_memory(pids):
+    """Per-worker memory plus totals (total PSS = real footprint of all workers together)."""
+    workers = [m for m in (process_memory(pid) for pid in pids) if m is not None]
+    return {
+        "workers": workers,
+        "total_rss_mb": round(sum(w["rss_mb"] for w in workers), 1),
+        "total_pss_mb": round(sum(w["pss_mb"] for w in workers), 1),
+    }
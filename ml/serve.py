@@ -1,111 +1,340 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-import pandas as pd
-import numpy as np
-import joblib
-import os
-from datetime import timedelta
-
-# Image utils (future use)
-from PIL import Image
-import io
-import base64
+import time
 
-app = FastAPI()
+_import_started = time.perf_counter()
 
-print("📂 Current working dir:", os.getcwd())
-print("📂 Models folder exists:", os.path.exists("models"))
-print("📂 Wheat model exists:", os.path.exists("models/xgb_wheat.pkl"))
-print("📂 Files in models:", os.listdir("models") if os.path.exists("models") else "NO MODELS DIR")
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from typing import List
+import json
+import os
 
-print("\n🚜 KrishiPredict ML Server Starting...")
+from config import (DIRECT_MODELS_DIR, DISEASE_BATCH_SIZE, DISEASE_MAX_WAIT_MS, DISEASE_QUEUE_DEPTH,
+                    EXECUTION_MODE, FORECAST_STRATEGY, MATERIALIZED_PATH, MAX_BATCH_ITEMS, PREDICT_MAX_QUEUE, PREDICT_WORKERS,
+                    PRELOAD_DISTRICT_MODELS, PREDICT_MODE, TREE_EVALUATOR, WARMUP)
+from disease_model import DiseaseModel, disease_result
+from feature_store import FeatureStore
+from forecast import DIRECT, LOOKBACK, RECURSIVE, STRATEGIES, forecast_summary, forecast_tails
+from forecast_cache import ForecastCache, cache_key
+import metrics
+from history_store import HistoryStore
+from image_preprocess import ImagePreprocessor, ImageTooLarge, InvalidImage
+from micro_batcher import MicroBatcher, QueueFull
+from model_registry import ModelRegistry, district_model_name
+from name_index import AMBIGUOUS, CROP_ALIASES, NameIndex
+from prediction_pool import Overloaded, PredictionExecutor
+from proc_memory import child_pids, process_memory, workers_memory
+
+# Models ek baar load honge, har request pe nahi
+registry = ModelRegistry()
+# KRISHI_FORECAST_STRATEGY=direct: multi-horizon models (train.py --strategy direct), ek predict mein 30 din.
+# Jis crop/district ka direct model nahi, woh recursive registry se hi chalega.
+if FORECAST_STRATEGY not in STRATEGIES:
+    raise ValueError(f"Unknown KRISHI_FORECAST_STRATEGY: {FORECAST_STRATEGY}")
+direct_registry = ModelRegistry(models_dir=DIRECT_MODELS_DIR, suffixes=(".ubj", ".pkl"))
+# Mandi history bhi ek baar preprocess hoke mmap se padhi jayegi
+history_store = HistoryStore()
+# User ke crop naam (Lahsun, लहसुन, garlik) -> model ka crop key; startup pe models se banta hai
+# aur naya crop model deploy hote hi (registry check interval ke andar) dobara
+crop_names = None
+_indexed_crops = None
+_crop_names_checked = None
+# Naye daily prices (/v1/prices) ka ring-buffer state - history ke upar incremental
+feature_store = FeatureStore()
+# Same (crop, district, data version, model version) ka forecast dobara nahi banega
+forecast_cache = ForecastCache()
+# KRISHI_PREDICT_MODE=materialized: pehle se bane forecasts (materialize.py) se seedha lookup
+materialized = None
+# Forecasts request thread pe nahi, bounded pool mein (KRISHI_EXECUTION_MODE=thread/process)
+predict_executor = PredictionExecutor(EXECUTION_MODE, PREDICT_WORKERS, PREDICT_MAX_QUEUE)
+metrics.REGISTRY.gauge("krishi_ready", "1 once startup warm-up has finished",
+                       lambda: int(startup["ready"]))
+metrics.REGISTRY.gauge("krishi_models_loaded", "Price models currently in memory",
+                       lambda: len(registry.stats()["loaded"]))
+metrics.REGISTRY.gauge("krishi_forecast_cache_entries", "Entries in the in-process forecast cache",
+                       lambda: forecast_cache.stats()["entries"])
+metrics.REGISTRY.gauge("krishi_predict_in_flight", "Predictions queued or running",
+                       lambda: predict_executor.in_flight)
+metrics.REGISTRY.gauge("krishi_predict_queue_depth", "Predictions waiting for a pool worker",
+                       lambda: predict_executor.stats()["queue_depth"])
+metrics.REGISTRY.gauge("krishi_disease_queue_depth", "Images waiting for a batched forward pass",
+                       lambda: disease_batcher.stats()["queue_depth"] if disease_batcher is not None else 0)
+# Disease CNN + micro-batcher + decode pool (TensorFlow / model file na ho to None)
+disease_model = None
+disease_batcher = None
+image_preprocessor = None
+
+
+def load_materialized():
+    global materialized
+    if PREDICT_MODE != "materialized":
+        return
+    if not os.path.exists(MATERIALIZED_PATH):
+        print(f"⚠️ {MATERIALIZED_PATH} nahi mili - live inference chalega")
+        return
+    # Sirf materialized mode mein chahiye, isliye import bhi yahin
+    from materialize import MaterializedForecasts
+    materialized = MaterializedForecasts(MATERIALIZED_PATH)
+    print(f"✅ Materialized forecasts loaded: {len(materialized.entries)} series")
+    # Alag strategy / evaluator se bani file ke lookups model check pe miss honge - chupchaap nahi
+    if (materialized.strategy, materialized.tree_evaluator) != (FORECAST_STRATEGY, TREE_EVALUATOR):
+        print(f"⚠️ {MATERIALIZED_PATH} strategy={materialized.strategy}, evaluator={materialized.tree_evaluator} "
+              f"se bani hai, server strategy={FORECAST_STRATEGY}, evaluator={TREE_EVALUATOR} - "
+              f"materialize.py dobara chalao")
+
+
+def load_disease_model():
+    global disease_model, disease_batcher, image_preprocessor
+    disease_model = DiseaseModel.load_or_none()
+    if disease_model is None:
+        return
+    image_preprocessor = ImagePreprocessor()
+    if WARMUP:
+        disease_model.warm_up()
+    disease_batcher = MicroBatcher(disease_model.predict_batch, DISEASE_BATCH_SIZE,
+                                   DISEASE_MAX_WAIT_MS, DISEASE_QUEUE_DEPTH)
+    disease_batcher.start()
+    print(f"✅ Disease model loaded: {len(disease_model.class_names)} classes")
+
+
+# /ready ke liye: warm-up hua ya nahi, aur har phase kitna time laga
+startup = {"ready": False, "phases_ms": {}, "warmup_errors": {}}
+
+
+def load_crop_names(crops=None):
+    global crop_names, _indexed_crops, _crop_names_checked
+    crops = tuple(registry.crop_models() if crops is None else crops)
+    crop_names = NameIndex(crops, CROP_ALIASES)
+    metrics.REGISTRY.crop_labels = set(crops)
+    _indexed_crops = crops
+    _crop_names_checked = time.monotonic()
+    return crop_names
+
+
+def current_crop_names():
+    """Crop name index, rebuilt (at most once per check interval) when crop models are added or removed."""
+    global _crop_names_checked
+    if crop_names is None:
+        return load_crop_names()
+    now = time.monotonic()
+    if now - _crop_names_checked >= registry.check_interval:
+        _crop_names_checked = now
+        crops = tuple(registry.crop_models())
+        if crops != _indexed_crops:
+            print(f"🔄 Crop models changed: {len(_indexed_crops)} -> {len(crops)}, rebuilding name index")
+            load_crop_names(crops)
+    return crop_names
+
+
+def sync_features(history):
+    """Feature state keyed by the same model crop keys resolve_names returns."""
+    return feature_store.sync(history, current_crop_names().names)
+
+
+def load_price_models():
+    registry.load_all(include_district_models=PRELOAD_DISTRICT_MODELS)
+    if FORECAST_STRATEGY == DIRECT:
+        direct_registry.load_all(include_district_models=PRELOAD_DISTRICT_MODELS)
+
+
+def select_model(crop_name, district):
+    """(strategy, model entry) - direct model when KRISHI_FORECAST_STRATEGY=direct and one is trained."""
+    if FORECAST_STRATEGY == DIRECT:
+        entry = direct_registry.select(crop_name, district)
+        if entry is not None:
+            return DIRECT, entry
+        metrics.event("direct_fallback", crop_name)
+    return RECURSIVE, registry.select(crop_name, district)
+
+
+def _phase(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    startup["phases_ms"][name] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def warm_up(history):
+    """One forecast per crop model, so the first real request doesn't pay for lazy init."""
+    if history is None:
+        return
+    for crop in registry.crop_models():
+        codes = set(history.match_crops(crop))
+        district = next((history.districts[int(d)]
+                         for c, d in zip(history.series_crop, history.series_district)
+                         if int(c) in codes), None)
+        if district is None:
+            continue
+        try:
+            _forecast_crop(crop, [district], history)
+        except Exception as e:
+            startup["warmup_errors"][crop] = f"{type(e).__name__}: {str(e).splitlines()[0]}"
+            print(f"⚠️ Warm-up failed for {crop}: {startup['warmup_errors'][crop]}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    started = time.perf_counter()
+    startup["phases_ms"]["imports"] = round((started - _import_started) * 1000, 2)
+    # Crop labels (metrics) model load events se pehle
+    _phase("names", load_crop_names)
+    _phase("models", load_price_models)
+    history = _phase("history", history_store.snapshot)
+    _phase("features", lambda: sync_features(history))
+    _phase("materialized", load_materialized)
+    _phase("disease_model", load_disease_model)
+    if WARMUP:
+        _phase("warmup", lambda: warm_up(history))
+    _phase("executor", predict_executor.start)
+    startup["phases_ms"]["total"] = round((time.perf_counter() - _import_started) * 1000, 2)
+    startup["ready"] = True
+    print(f"✅ Ready in {startup['phases_ms']['total']:.0f} ms")
+    yield
+    predict_executor.shutdown()
+    feature_store.save_snapshot()
+    if disease_batcher is not None:
+        await disease_batcher.stop()
+        image_preprocessor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+print("🚜 KrishiPredict ML Server Starting...")
 
 # =========================================================
 # XGBOOST PRICE PREDICTION
 # =========================================================
 
-def predict_future_prices_xgboost(crop_name, district):
-    model_path = f"models/xgb_{crop_name.lower()}.pkl"
-    if not os.path.exists(model_path):
-        return None, "Model not found"
-
-    model = joblib.load(model_path)
-
-    csv_path = "data/mandi_history.csv"
-    if not os.path.exists(csv_path):
-        return None, "CSV Data missing"
-
-    df = pd.read_csv(csv_path)
-    df.columns = df.columns.str.strip()
+def resolve_names(crop_name, districts, history):
+    """Canonical crop key and {district: (canonical district, error)} via the alias indexes.
+
+    Returns (crop key, districts, None) or (None, None, error). Unknown districts are kept
+    as given (history falls back to All India); ambiguous ones get an error.
+    """
+    with metrics.stage("resolve_names", crop_name):
+        crop = current_crop_names().resolve(crop_name)
+        if crop.status == AMBIGUOUS:
+            return None, None, f"Ambiguous crop: {', '.join(crop.choices)}"
+        if not crop.names:
+            return None, None, "Model not found"
+
+        resolved = {}
+        for district in districts:
+            place = history.resolve_district(district) if history is not None else None
+            if place is not None and place.status == AMBIGUOUS:
+                resolved[district] = (None, f"Ambiguous district: {', '.join(place.choices)}")
+            else:
+                resolved[district] = (place.names[0] if place is not None and place.names else district, None)
+    return crop.names[0], resolved, None
+
+
+def _forecast_crop(crop_name, districts, history):
+    """Forecast many districts of one crop with a single matrix predict per model and horizon step.
+
+    Names are resolved to canonical keys first, so aliases share models, state and cache.
+    Each district uses its own (crop, district) model when one is trained, else the crop model;
+    with KRISHI_FORECAST_STRATEGY=direct a direct model (all 30 days in one predict) is preferred.
+    Returns {district: (forecast, location) or (None, error)}; model errors are raised.
+    """
+    stage = metrics.stage
+    crop_name, canonical, error = resolve_names(crop_name, districts, history)
+    if error is not None:
+        return {district: (None, error) for district in districts}
+
+    features = sync_features(history)
+    results = {}
+    pending = {}  # (strategy, model name) -> (entry, [(district, series, cache key)])
+    for query in districts:
+        district, error = canonical[query]
+        if error is not None:
+            results[query] = (None, error)
+            continue
+        with stage("model_select", crop_name):
+            strategy, entry = select_model(crop_name, district)
+        if entry is None:
+            results[query] = (None, "Model not found")
+            continue
+
+        if history is None:
+            results[query] = (None, "CSV Data missing")
+            continue
+
+        # Ingested prices data version ka hissa hain: naya price aate hi cache/materialized miss
+        with stage("features", crop_name):
+            series, seq = features.tail(crop_name, district)
+        data_version = f"{history.version}+{seq}" if seq else history.version
+        # Direct aur recursive forecasts cache / materialized mein kabhi mix na hon
+        model_version = entry.version if strategy == RECURSIVE else f"{strategy}-{entry.version}"
+
+        if materialized is not None:
+            with stage("materialized_lookup", crop_name):
+                hit = materialized.lookup(crop_name, district, data_version, strategy, entry)
+            if hit is not None:
+                metrics.event("materialized_hit", crop_name)
+                results[query] = hit
+                continue
+
+        key = cache_key(crop_name, district, data_version, model_version)
+        with stage("cache_lookup", crop_name):
+            cached = forecast_cache.get(key)
+        if cached is not None:
+            metrics.event("cache_hit", crop_name)
+            results[query] = cached
+            continue
+        metrics.event("cache_miss", crop_name)
+
+        error = None
+        if series is None:
+            # (crop, district) ka state nahi - history ka alias match / All India fallback
+            with stage("history_tail", crop_name):
+                series, error = history.tail(crop_name, district, n=LOOKBACK)
+        if series is None:
+            results[query] = (None, error)
+        else:
+            pending.setdefault((strategy, entry.name), (entry, []))[1].append((query, series, key))
+
+    for (strategy, _), (entry, found) in pending.items():
+        with stage("forecast", crop_name):
+            forecasts = forecast_tails(entry.model, [series for _, series, _ in found], strategy)
+        for forecast, (query, series, key) in zip(forecasts, found):
+            results[query] = (forecast, series.location)
+            forecast_cache.set(key, results[query])
+
+    return results
 
-    df = df.rename(columns={
-        "Price Date": "date",
-        "Modal_Price": "modal_price",
-        "Commodity": "crop",
-        "District Name": "district_name"
-    })
 
-    df["modal_price"] = pd.to_numeric(df["modal_price"], errors="coerce")
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    df = df.dropna(subset=["date", "modal_price"]).sort_values("date")
-
-    crop_df = df[df["crop"].str.contains(crop_name, case=False, na=False)]
-    if crop_df.empty:
-        return None, "No Data for Crop"
-
-    local_df = crop_df[crop_df["district_name"].str.contains(district, case=False, na=False)]
-
-    if local_df.empty:
-        working_df = crop_df
-        location_label = "All India Trends"
-    else:
-        working_df = local_df
-        location_label = district
-
-    last_row = working_df.iloc[-1]
-    current_date = last_row["date"]
-
-    inputs = {
-        "lag_1": last_row["modal_price"],
-        "lag_7": working_df["modal_price"].iloc[-7] if len(working_df) > 7 else last_row["modal_price"],
-        "lag_30": working_df["modal_price"].iloc[-30] if len(working_df) > 30 else last_row["modal_price"],
-        "rolling_mean_7": working_df["modal_price"].tail(7).mean(),
-        "rolling_std_7": working_df["modal_price"].tail(7).std() if len(working_df) > 7 else 0,
-    }
+def predict_future_prices_xgboost(crop_name, district):
+    return _forecast_crop(crop_name, [district], history_store.snapshot())[district]
 
-    future_predictions = []
 
-    for i in range(1, 31):
-        next_date = current_date + timedelta(days=i)
+def predict_future_prices_batch(pairs):
+    """Forecast a list of (crop, district) pairs, grouped by crop. Results keep input order.
 
-        features = pd.DataFrame([{
-            "day_of_year": next_date.dayofyear,
-            "month": next_date.month,
-            "year": next_date.year,
-            "lag_1": inputs["lag_1"],
-            "lag_7": inputs["lag_7"],
-            "lag_30": inputs["lag_30"],
-            "rolling_mean_7": inputs["rolling_mean_7"],
-            "rolling_std_7": inputs["rolling_std_7"]
-        }])
+    Crops are grouped by their resolved model key, so "Lahsun" and "Garlic" share one pass.
+    """
+    history = history_store.snapshot()
 
-        # 🔥 FINAL FIX — DO NOT TOUCH
-        pred_price = model.predict(
-            features,
-            validate_features=False
-        )[0]
+    # Unresolved naam (unknown / ambiguous) apne group mein - _forecast_crop unka error dega
+    crop_keys = {}
+    for crop_name, _ in pairs:
+        if crop_name not in crop_keys:
+            crop = current_crop_names().resolve(crop_name)
+            crop_keys[crop_name] = crop.names[0] if crop.names else crop_name.lower()
 
-        future_predictions.append({
-            "date": next_date.strftime("%Y-%m-%d"),
-            "price": round(float(pred_price), 2)
-        })
+    groups = {}
+    for crop_name, district in pairs:
+        groups.setdefault(crop_keys[crop_name], {})[district] = None
 
-        inputs["lag_7"] = inputs["lag_1"]
-        inputs["lag_1"] = pred_price
-        inputs["rolling_mean_7"] = (inputs["rolling_mean_7"] * 6 + pred_price) / 7
+    by_crop = {}
+    for crop_key, districts in groups.items():
+        try:
+            by_crop[crop_key] = _forecast_crop(crop_key, list(districts), history)
+        except Exception as e:
+            print(f"❌ Batch forecast failed for {crop_key}: {e}")
+            by_crop[crop_key] = {d: (None, "Prediction failed") for d in districts}
 
-    return future_predictions, location_label
+    return [by_crop[crop_keys[crop_name]][district] for crop_name, district in pairs]
 
 
 # =========================================================
@@ -119,6 +348,21 @@ class CropInput(BaseModel):
     area_acres: float
 
 
+class BatchCropInput(BaseModel):
+    items: List[CropInput] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+
+class PriceInput(BaseModel):
+    crop: str
+    district: str
+    date: str  # YYYY-MM-DD
+    price: float
+
+
+class BulkPriceInput(BaseModel):
+    items: List[PriceInput] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+
 # =========================================================
 # ROUTES
 # =========================================================
@@ -128,49 +372,283 @@ def read_root():
     return {"status": "ML Server Running (XGBoost) 🚀"}
 
 
+@app.get("/ready")
+def ready():
+    history = history_store.snapshot() if startup["ready"] else None
+    body = {
+        **startup,
+        "models_loaded": len(registry.stats()["loaded"]),
+        "history_version": history.version if history is not None else None,
+    }
+    return JSONResponse(body, status_code=200 if startup["ready"] else 503)
+
+
+@app.get("/v1/models")
+def list_models():
+    return {**registry.stats(), "strategy": FORECAST_STRATEGY, "direct": direct_registry.stats()}
+
+
+@app.get("/v1/memory")
+def memory():
+    # serve_workers.py ke under: is worker ke saath saare sibling workers aur total PSS
+    worker_id = os.getenv("KRISHI_WORKER_ID")
+    pids = child_pids(os.getppid()) if worker_id is not None else [os.getpid()]
+    return {"worker_id": worker_id, "this_worker": process_memory(), **workers_memory(pids)}
+
+
+@app.get("/v1/cache/stats")
+def cache_stats():
+    return {
+        **forecast_cache.stats(),
+        "predict_mode": PREDICT_MODE,
+        "materialized": materialized.stats() if materialized is not None else None,
+    }
+
+
+def busy_response(endpoint):
+    # Queue bhari hai - turant mana karo, client Retry-After ke baad dobara aaye
+    metrics.error(endpoint, "overloaded")
+    return JSONResponse({"error": "Server busy, please retry shortly"}, status_code=503,
+                        headers={"Retry-After": str(predict_executor.retry_after())})
+
+
+async def _run_instrumented(endpoint, crop, request, response, fn, *args):
+    """Run fn in the prediction pool; record its stages and, if asked, return a Server-Timing breakdown."""
+    profile = metrics.profiling_requested(request)
+    start = time.perf_counter()
+    try:
+        result, collected = await predict_executor.run(fn, *args, collect=metrics.ENABLED or profile)
+    except Overloaded:
+        raise
+    except Exception as e:
+        metrics.error(endpoint, type(e).__name__)
+        raise
+    if collected is not None:
+        stages, events = collected
+        stages.append(("total", crop, time.perf_counter() - start))
+        metrics.absorb(stages, events)
+        if profile:
+            response.headers["Server-Timing"] = metrics.server_timing(stages)
+    return result
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/v1/names/resolve")
+def resolve_name(crop: str = None, district: str = None):
+    """How a crop / district name resolves (exact, alias, prefix, fuzzy, ambiguous, unknown)."""
+    history = history_store.snapshot()
+    body = {}
+    if crop is not None:
+        body["crop"] = current_crop_names().resolve(crop)._asdict()
+    if district is not None and history is not None:
+        body["district"] = history.resolve_district(district)._asdict()
+    return body
+
+
+@app.get("/v1/executor/stats")
+def executor_stats():
+    return predict_executor.stats()
+
+
 @app.post("/v1/predict")
-def predict_price(data: CropInput):
-    forecast, source_loc = predict_future_prices_xgboost(data.crop, data.district)
+async def predict_price(data: CropInput, request: Request, response: Response):
+    try:
+        forecast, source_loc = await _run_instrumented("predict", data.crop, request, response,
+                                                       predict_future_prices_xgboost, data.crop, data.district)
+    except Overloaded:
+        return busy_response("predict")
 
     if not forecast:
+        metrics.error("predict", "no_data")
         return {"error": f"No prediction data available for {data.crop}"}
 
-    current_price = forecast[0]["price"]
-    future_price = forecast[-1]["price"]
+    return {"crop": data.crop, "location": source_loc, **forecast_summary(forecast)}
+
+
+@app.post("/v1/predict/batch")
+async def predict_price_batch(data: BatchCropInput, request: Request, response: Response):
+    try:
+        outcomes = await _run_instrumented("predict_batch", "", request, response, predict_future_prices_batch,
+                                           [(item.crop, item.district) for item in data.items])
+    except Overloaded:
+        return busy_response("predict_batch")
 
-    change_pct = ((future_price - current_price) / current_price) * 100
+    results = []
+    for item, (forecast, source_loc) in zip(data.items, outcomes):
+        if not forecast:
+            metrics.error("predict_batch", "no_data")
+            results.append({
+                "crop": item.crop,
+                "district": item.district,
+                "error": f"No prediction data available for {item.crop}",
+                "reason": source_loc,
+            })
+        else:
+            results.append({"crop": item.crop, "location": source_loc, **forecast_summary(forecast)})
 
-    if change_pct > 5:
-        advice = f"AI: अगले 30 दिनों में भाव {int(change_pct)}% बढ़ने की उम्मीद है। होल्ड करें (Hold)।"
-        color = "green"
-        trend = "increasing"
-    elif change_pct < -5:
-        advice = f"AI: भाव {int(abs(change_pct))}% गिर सकता है। बेचें (Sell)।"
-        color = "red"
-        trend = "decreasing"
-    else:
-        advice = "AI: बाजार स्थिर रहेगा। आप अपनी सुविधानुसार निर्णय लें।"
-        color = "yellow"
-        trend = "stable"
+    return {"count": len(results), "results": results}
+
+
+# =========================================================
+# PRICE INGESTION (online feature state)
+# =========================================================
 
+def _features():
+    return sync_features(history_store.snapshot())
+
+
+def _has_district_model(crop_name, district):
+    return registry.get_entry(district_model_name(crop_name, district)) is not None
+
+
+def _resolve_price(item, history):
+    """Price record keyed by the canonical crop / district (same as forecasts), or (None, error)."""
+    crop, districts, error = resolve_names(item.crop, [item.district], history)
+    if error is None:
+        district, error = districts[item.district]
+    if error is not None:
+        return None, error
+    return {**item.model_dump(), "crop": crop, "district": district}, None
+
+
+def _ingest(endpoint, items):
+    """[(accepted, reason)] per item, or a JSONResponse error (no history / ambiguous names)."""
+    history = history_store.snapshot()
+    features = sync_features(history)
+    if features is None:
+        metrics.error(endpoint, "no_history")
+        return JSONResponse({"error": "CSV Data missing"}, status_code=503)
+
+    # Aliases (Lahsun, लहसुन) usi state mein jaayein jisse forecast padhta hai
+    records, ambiguous = [], []
+    for i, item in enumerate(items):
+        record, error = _resolve_price(item, history)
+        if error is not None and error.startswith("Ambiguous"):
+            ambiguous.append({"index": i, "error": error})
+        records.append(record)
+    if ambiguous:
+        metrics.error(endpoint, "ambiguous_name")
+        return JSONResponse({"error": ambiguous[0]["error"], "ambiguous": ambiguous}, status_code=400)
+
+    # History mein series nahi to sirf tab naya state banao jab us (crop, district) ka apna model ho
+    found = features.ingest([r for r in records if r is not None], allow_new_series=_has_district_model)
+    found = iter(found)
+    results = [next(found) if r is not None else (False, "unknown_series") for r in records]
+    for ok, reason in results:
+        if not ok:
+            metrics.error(endpoint, reason)
+    return results
+
+
+@app.post("/v1/prices")
+def ingest_price(data: PriceInput):
+    results = _ingest("prices", [data])
+    if isinstance(results, JSONResponse):
+        return results
+    accepted, reason = results[0]
+    return {"accepted": accepted, "reason": reason}
+
+
+@app.post("/v1/prices/bulk")
+def ingest_prices_bulk(data: BulkPriceInput):
+    results = _ingest("prices_bulk", data.items)
+    if isinstance(results, JSONResponse):
+        return results
     return {
-        "crop": data.crop,
-        "location": source_loc,
-        "current_price": current_price,
-        "forecast": forecast,
-        "advice": advice,
-        "risk_color": color,
-        "confidence": 0.94,
-        "trend": trend
+        "accepted": sum(ok for ok, _ in results),
+        "rejected": [{"index": i, "reason": reason} for i, (ok, reason) in enumerate(results) if not ok],
     }
 
 
-@app.post("/v1/detect-disease")
-async def detect_disease(data: dict):
+@app.get("/v1/prices/state")
+def price_state(crop: str = None, district: str = None):
+    features = _features()
+    if features is None:
+        return JSONResponse({"error": "CSV Data missing"}, status_code=503)
+    if crop is None or district is None:
+        return features.stats()
+    history = history_store.snapshot()
+    crop_key, districts, error = resolve_names(crop, [district], history)
+    if error is None:
+        canonical, error = districts[district]
+    if error is not None and error.startswith("Ambiguous"):
+        return JSONResponse({"error": error}, status_code=400)
+    state = features.describe(crop_key, canonical) if error is None else None
+    if state is None:
+        return JSONResponse({"error": f"No state for {crop} / {district}"}, status_code=404)
+    return state
+
+
+@app.get("/v1/disease/stats")
+def disease_stats():
+    if disease_batcher is None:
+        return {"enabled": False}
     return {
-        "disease_name": "Feature Coming Soon",
-        "status": "Info",
-        "solution": "Disease detection will be enabled in a future update.",
-        "confidence": 0.0,
-        "risk_color": "blue"
+        "enabled": True,
+        "model": disease_model.model_path,
+        "classes": len(disease_model.class_names),
+        "preprocess": image_preprocessor.stats(),
+        "batcher": disease_batcher.stats(),
     }
+
+
+# Backend "System Busy" ko report save kiye bina user tak bhej deta hai
+DISEASE_BUSY = {
+    "disease_name": "Server Busy",
+    "status": "System Busy",
+    "solution": "Bahut saari photos ek saath aa rahi hain, thodi der baad dobara try karein.",
+    "confidence": 0.0,
+    "risk_color": "blue"
+}
+
+
+@app.post("/v1/detect-disease")
+async def detect_disease(request: Request):
+    if disease_batcher is None:
+        return {
+            "disease_name": "Feature Coming Soon",
+            "status": "Info",
+            "solution": "Disease detection will be enabled in a future update.",
+            "confidence": 0.0,
+            "risk_color": "blue"
+        }
+
+    # Payload limit JSON parse se pehle (base64 ~4/3 guna + thoda JSON)
+    max_body = image_preprocessor.max_bytes * 4 // 3 + 64 * 1024
+    try:
+        if int(request.headers.get("content-length") or 0) > max_body:
+            raise ImageTooLarge()
+        body = await request.body()
+        if len(body) > max_body:
+            raise ImageTooLarge()
+        data = json.loads(body)
+        if not isinstance(data, dict) or not isinstance(data.get("image"), str) or not data["image"]:
+            metrics.error("detect_disease", "missing_image")
+            return {"error": "Image missing"}
+        with metrics.stage("disease_preprocess"):
+            image = await image_preprocessor.preprocess(data["image"])
+    except ImageTooLarge:
+        metrics.error("detect_disease", "too_large")
+        return {"error": f"Image too large (max {image_preprocessor.max_bytes // (1024 * 1024)} MB)"}
+    except (InvalidImage, ValueError):
+        metrics.error("detect_disease", "invalid_image")
+        return {"error": "Invalid image"}
+    except QueueFull:
+        metrics.error("detect_disease", "busy")
+        return DISEASE_BUSY
+
+    # Yahan ke errors (model / shape) server ki galti hain - "Invalid image" nahi, 500 jaaye
+    try:
+        with metrics.stage("disease_inference"):
+            class_name, confidence = await disease_batcher.submit(image)
+    except QueueFull:
+        metrics.error("detect_disease", "busy")
+        return DISEASE_BUSY
+    except Exception:
+        metrics.error("detect_disease", "inference_failed")
+        raise
+    return disease_result(class_name, confidence)
@@ -0,0 +1,142 @@
+# ml/serve_workers.py
+# Multi-worker (pre-fork) serving: models aur history parent process mein ek baar load,
+# phir N uvicorn workers fork hote hain jo same listening socket share karte hain.
+#   - models: .ubj boosters C++ heap mein - fork ke baad copy-on-write, koi worker likhta nahi
+#   - history: history_store ke .npy arrays read-only mmap - ek hi page cache copy
+# gc.freeze() taaki Python GC parent ke objects ko touch karke CoW pages copy na karwaye.
+#
+# Usage: python serve_workers.py --workers 4 [--threads-per-worker 1] [--port 8000]
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+WORKER_ENV = "KRISHI_WORKER_ID"
+
+
+def print_memory_table(pids):
+    from proc_memory import process_memory, workers_memory
+
+    parent = process_memory()
+    report = workers_memory(pids)
+    print(f"\n🧠 Memory (parent {parent['pid']}: RSS {parent['rss_mb']} MB, PSS {parent['pss_mb']} MB)")
+    print(f"   {'Worker PID':<12} {'RSS MB':>9} {'PSS MB':>9} {'Shared MB':>10} {'Private MB':>11}")
+    for w in report["workers"]:
+        print(f"   {w['pid']:<12} {w['rss_mb']:>9} {w['pss_mb']:>9} {w['shared_mb']:>10} {w['private_mb']:>11}")
+    print(f"   Total workers: RSS {report['total_rss_mb']} MB | PSS {report['total_pss_mb']} MB "
+          f"(+ parent PSS {parent['pss_mb']} MB)\n")
+    return report
+
+
+def run_worker(worker_id, sock, ready_fd, args):
+    import uvicorn
+    import serve
+
+    os.environ[WORKER_ENV] = str(worker_id)
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            # super().startup() lifespan (warm-up) bhi chalata hai - uske baad parent ko batao
+            await super().startup(sockets=sockets)
+            if ready_fd is not None:
+                os.write(ready_fd, b"1")
+
+    config = uvicorn.Config(serve.app, log_level=args.log_level, access_log=False)
+    Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker ML server (shared models + history)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("KRISHI_WORKERS", "0")) or os.cpu_count())
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="XGBoost/OpenMP threads per worker (default: cores / workers)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    # XGBoost import se pehle - workers aapas mein cores na cheenen
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Fork se pehle: models + history ek baar (workers ki lifespan inhe dobara load nahi karti,
+    # sirf signature check hota hai). Warm-up predict workers mein - OpenMP fork-safe nahi.
+    start = time.perf_counter()
+    import serve
+    from config import PRELOAD_DISTRICT_MODELS
+    serve.registry.load_all(include_district_models=PRELOAD_DISTRICT_MODELS)
+    serve.history_store.snapshot()
+    gc.collect()
+    gc.freeze()
+    print(f"✅ Preloaded in {(time.perf_counter() - start) * 1000:.0f} ms - forking {args.workers} workers "
+          f"({threads} threads each) on {args.host}:{args.port}")
+
+    ready_r, ready_w = os.pipe()
+    workers = {}
+
+    def spawn(worker_id, ready_fd=None):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            try:
+                run_worker(worker_id, sock, ready_fd, args)
+            finally:
+                os._exit(0)
+        workers[pid] = worker_id
+
+    for worker_id in range(args.workers):
+        spawn(worker_id, ready_w)
+    os.close(ready_w)
+
+    # Sab workers ka warm-up ho jaye, phir memory report
+    ready = 0
+    while ready < args.workers:
+        chunk = os.read(ready_r, args.workers - ready)
+        if not chunk:
+            break
+        ready += len(chunk)
+    print(f"🚀 {ready}/{args.workers} workers ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print_memory_table(list(workers))
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # kill -USR1 <parent> -> memory table dobara
+    signal.signal(signal.SIGUSR1, lambda *_: print_memory_table(list(workers)))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except InterruptedError:
+            continue
+        except ChildProcessError:
+            break
+        worker_id = workers.pop(pid, None)
+        if not stopping and worker_id is not None:
+            print(f"⚠️ Worker {worker_id} (pid {pid}) exited with status {status} - restarting")
+            spawn(worker_id)
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# ml/tests/conftest.py
+# Chhota synthetic dataset + fast models ek temp folder mein. config.py env vars import pe padhta
+# hai, isliye paths kisi bhi ml module ke import se pehle set hote hain.
+#
+# Usage (ml/ se): python -m pytest -q tests
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix="krishi-tests-")
+os.environ.update({
+    "KRISHI_HISTORY_CSV": os.path.join(WORK_DIR, "mandi_history.csv"),
+    "KRISHI_HISTORY_STORE_DIR": os.path.join(WORK_DIR, "history_store"),
+    "KRISHI_MODELS_DIR": os.path.join(WORK_DIR, "models"),
+    "KRISHI_FEATURE_STATE_DIR": os.path.join(WORK_DIR, "feature_state"),
+    "KRISHI_PARTITIONS_DIR": os.path.join(WORK_DIR, "partitions"),
+    "KRISHI_MATERIALIZED_PATH": os.path.join(WORK_DIR, "forecasts.pkl"),
+    "KRISHI_WARMUP": "0",
+})
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+CROPS = ["Garlic", "Wheat"]
+DISTRICTS = ["Sehore", "Bhopal"]
+
+
+def train_args(**overrides):
+    """train.py CLI defaults (fast mode, crop-level models only)."""
+    from train import MIN_GROUP_ROWS, RECURSIVE
+    args = {"mode": "fast", "search": False, "strategy": RECURSIVE, "force": False,
+            "no_district_models": True, "min_group_rows": MIN_GROUP_ROWS}
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+@pytest.fixture(scope="session")
+def history_csv():
+    from generate_dataset import generate
+    path = os.environ["KRISHI_HISTORY_CSV"]
+    generate(path, crops=CROPS, districts=DISTRICTS, start="2024-01-01", end="2024-10-01", seed=3)
+    return path
+
+
+@pytest.fixture(scope="session")
+def trained_models(history_csv):
+    """Crop-level fast models for CROPS in KRISHI_MODELS_DIR; returns the keyed history rows."""
+    import train
+    from mandi_data import load_history
+    os.makedirs(os.environ["KRISHI_MODELS_DIR"], exist_ok=True)
+    keyed = train.assign_group_keys(load_history(history_csv), CROPS)
+    tasks, _ = train.plan_tasks(keyed, train_args())
+    for task in tasks:
+        train.train_model(*task, 1)
+    return keyed
+
+
+@pytest.fixture(scope="module")
+def client(trained_models):
+    """TestClient with serve.py's lifespan (models, history, feature state) started."""
+    from fastapi.testclient import TestClient
+    import serve
+    with TestClient(serve.app) as c:
+        yield c
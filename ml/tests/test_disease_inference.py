@@ -0,0 +1,128 @@
+# Disease inference: `import serve` TensorFlow nahi uthata, micro-batcher batches banata hai,
+# aur model ki galti 500 hai ("Invalid image" nahi).
+import asyncio
+import base64
+import io
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from conftest import ML_DIR
+from micro_batcher import MicroBatcher, QueueFull
+
+# Koi bhi "tensorflow" import ki koshish (installed ho ya nahi) yeh finder note kar leta hai
+NO_TENSORFLOW = """
+import sys
+attempts = []
+class Guard:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] == "tensorflow":
+            attempts.append(name)
+sys.meta_path.insert(0, Guard())
+import serve
+assert not attempts and "tensorflow" not in sys.modules, attempts
+print("ok")
+"""
+
+
+def test_import_serve_does_not_import_tensorflow():
+    out = subprocess.run([sys.executable, "-c", NO_TENSORFLOW], cwd=ML_DIR,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().endswith("ok")
+
+
+class FakeModel:
+    class_names = ["Tomato___Late_blight", "Tomato___healthy"]
+    model_path = "fake.h5"
+
+    def __init__(self):
+        self.batches = []
+        self.broken = False
+
+    def predict_batch(self, images):
+        if self.broken:
+            raise RuntimeError("bad input shape")
+        self.batches.append(len(images))
+        return [("Tomato___Late_blight", 0.9)] * len(images)
+
+    def warm_up(self):
+        pass
+
+
+def test_concurrent_submits_share_one_batch():
+    async def run():
+        model = FakeModel()
+        batcher = MicroBatcher(model.predict_batch, max_batch_size=8, max_wait_ms=50, max_queue=100)
+        batcher.start()
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(5)])
+        await batcher.stop()
+        return model.batches, results, batcher.stats()
+
+    batches, results, stats = asyncio.run(run())
+    assert batches == [5]
+    assert results == [("Tomato___Late_blight", 0.9)] * 5
+    assert stats["completed"] == 5 and stats["batch_size_histogram"] == {5: 1}
+
+
+def test_full_queue_and_batch_errors():
+    async def run():
+        model = FakeModel()
+        batcher = MicroBatcher(model.predict_batch, max_batch_size=4, max_wait_ms=1, max_queue=2)
+        batcher._queue = asyncio.Queue()  # collector band: queue bharti rahegi
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await batcher.submit(3)
+        for future in pending:
+            future.cancel()
+
+        model.broken = True
+        batcher = MicroBatcher(model.predict_batch, max_batch_size=4, max_wait_ms=1)
+        batcher.start()
+        outcomes = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.stop()
+        return outcomes, batcher.stats()
+
+    outcomes, stats = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) for e in outcomes)
+    assert stats["failed"] == 2
+
+
+def png_b64(size=(64, 48)):
+    buf = io.BytesIO()
+    Image.fromarray(np.full(size[::-1] + (3,), 120, dtype=np.uint8)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+@pytest.fixture
+def disease_client(trained_models, monkeypatch):
+    import serve
+    model = FakeModel()
+    monkeypatch.setattr(serve.DiseaseModel, "load_or_none", classmethod(lambda cls: model))
+    with TestClient(serve.app, raise_server_exceptions=False) as c:
+        yield c, model
+    serve.disease_model = serve.disease_batcher = serve.image_preprocessor = None
+
+
+def test_detect_disease_runs_the_batched_model(disease_client):
+    client, model = disease_client
+    body = client.post("/v1/detect-disease", json={"image": "data:image/png;base64," + png_b64()}).json()
+    assert body["disease_name"] == "Tomato - Late blight"
+    assert body["status"] == "Disease Detected" and body["confidence"] == 0.9
+    assert model.batches == [1]
+
+    assert client.post("/v1/detect-disease", json={"image": "bm90IGFuIGltYWdl"}).json() == {"error": "Invalid image"}
+    assert client.post("/v1/detect-disease", json={}).json() == {"error": "Image missing"}
+
+
+def test_model_errors_are_server_errors(disease_client):
+    client, model = disease_client
+    model.broken = True
+    r = client.post("/v1/detect-disease", json={"image": png_b64()})
+    assert r.status_code == 500
+    assert 'kind="inference_failed"' in client.get("/metrics").text
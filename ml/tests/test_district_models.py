@@ -0,0 +1,37 @@
+# Per-(crop, district) models: ek groupby pass, lags sirf apne district ke andar, chhote groups skip.
+import numpy as np
+
+import train
+from conftest import DISTRICTS
+from forecast import FEATURES
+
+
+def test_plan_has_crop_and_district_models(trained_models):
+    plans = dict(train.plan_models(trained_models, min_group_rows=100))
+    expected = {"garlic", "wheat"} | {f"{crop}__{d.lower()}" for crop in ("garlic", "wheat") for d in DISTRICTS}
+    assert set(plans) == expected
+    # Crop model = saare districts ki rows, date order mein
+    crop_rows = plans["wheat"]
+    assert len(crop_rows) == sum(len(plans[f"wheat__{d.lower()}"]) for d in DISTRICTS)
+    assert crop_rows["date"].is_monotonic_increasing
+
+
+def test_lags_stay_inside_one_district(trained_models):
+    plans = dict(train.plan_models(trained_models, min_group_rows=100))
+    for district in DISTRICTS:
+        rows = plans[f"garlic__{district.lower()}"]
+        assert set(rows["district_name"]) == {district}
+        prices = trained_models[(trained_models["crop_key"] == "garlic")
+                                & (trained_models["district_name"] == district)]["modal_price"].to_numpy()
+        # Pehli 30 rows (lag_30 nahi) drop; baaki ka lag_1 usi district ki pichli price
+        np.testing.assert_array_equal(rows["lag_1"].to_numpy(), prices[29:-1])
+        np.testing.assert_array_equal(rows["lag_30"].to_numpy(), prices[:-30])
+        assert not rows[FEATURES].isna().any().any()
+
+
+def test_small_groups_fall_back_to_crop_model(trained_models):
+    n_rows = len(dict(train.plan_models(trained_models))["garlic"]) // len(DISTRICTS)
+    names = [name for name, _ in train.plan_models(trained_models, min_group_rows=n_rows + 1)]
+    assert sorted(names) == ["garlic", "wheat"]
+    names = [name for name, _ in train.plan_models(trained_models, district_models=False, min_group_rows=1)]
+    assert sorted(names) == ["garlic", "wheat"]
@@ -0,0 +1,64 @@
+# Feature state model crop key pe: history ka "Paddy(Dhan)(Common)" aur "rice" ka ingest ek hi series.
+import numpy as np
+import pandas as pd
+
+from feature_store import FeatureStore
+from history_store import HistoryStore
+
+
+def build_history(tmp_path):
+    days = pd.date_range("2024-01-01", periods=40, freq="D").strftime("%Y-%m-%d")
+    rows = []
+    for i, day in enumerate(days):
+        # Ek hi crop ke do spelling variants, alag-alag din
+        rows.append((day, "Paddy(Dhan)(Common)" if i % 2 else "PADDY (Dhan) Common", "Sehore", 2000 + i))
+        rows.append((day, "Wheat", "Sehore", 1500 + i))
+    csv_path = str(tmp_path / "history.csv")
+    pd.DataFrame(rows, columns=["Price Date", "Commodity", "District Name", "Modal_Price"]).to_csv(
+        csv_path, index=False)
+    return HistoryStore(csv_path, str(tmp_path / "store"), check_interval=0).snapshot()
+
+
+def test_aliased_commodity_is_keyed_by_the_model_crop(tmp_path):
+    history = build_history(tmp_path)
+    store = FeatureStore(str(tmp_path / "state"), check_interval=0, lookback=30)
+    store.sync(history, ["rice", "wheat"])
+
+    # Dono variants ek series mein, row order se - history.tail jaisa hi
+    series, seq = store.tail("rice", "Sehore")
+    expected, _ = history.tail("rice", "Sehore", n=30)
+    assert seq == 0 and series.total == 40
+    np.testing.assert_array_equal(series.prices, expected.prices)
+    state = store.describe("Paddy(Dhan)(Common)", "Sehore")
+    assert state["count"] == 40 and state["last_date"] == "2024-02-09"
+    assert state["mean"] == np.mean(np.arange(2000, 2040))
+
+    results = store.ingest([{"crop": "rice", "district": "Sehore", "date": "2024-02-10", "price": 2500},
+                            {"crop": "rice", "district": "Sehore", "date": "2024-02-01", "price": 1}])
+    assert results == [(True, None), (False, "stale_date")]
+    series, seq = store.tail("rice", "Sehore")
+    assert seq == 1 and series.prices[-1] == 2500 and series.total == 41
+    assert store.stats()["series"] == 2
+
+
+def test_snapshot_and_log_follow_the_crop_set(tmp_path):
+    history = build_history(tmp_path)
+    state_dir = str(tmp_path / "state")
+    store = FeatureStore(state_dir, check_interval=0, lookback=30)
+    store.sync(history, ["rice", "wheat"])
+    store.ingest([{"crop": "rice", "district": "Sehore", "date": "2024-02-10", "price": 2500}])
+    store.save_snapshot()
+
+    restarted = FeatureStore(state_dir, check_interval=0, lookback=30).sync(history, ["rice", "wheat"])
+    assert restarted.tail("rice", "Sehore")[0].prices[-1] == 2500
+
+    # Rice model nahi: snapshot purani crop set ka hai, isliye history se rebuild; history naam
+    # apni series hai aur log wala rice price alag
+    other = FeatureStore(state_dir, check_interval=0, lookback=30).sync(history, ["wheat"])
+    assert other.tail("Paddy(Dhan)(Common)", "Sehore")[0].total == 40
+    assert other.tail("rice", "Sehore")[0].total == 1
+
+    # Model aa gaya: sync pe state phir se rice key pe, log replay ke saath
+    other.sync(history, ["rice", "wheat"])
+    series, seq = other.tail("rice", "Sehore")
+    assert seq == 1 and series.prices[-1] == 2500
@@ -0,0 +1,61 @@
+# Recursive forecast == purana per-step DataFrame loop; direct / backtest inputs == serving inputs.
+import numpy as np
+import pytest
+
+from backtest import origin_states, plan_origins
+from bench_forecast import legacy_forecast
+from conftest import CROPS, DISTRICTS
+from forecast import (FEATURES, HORIZON, LOOKBACK, direct_forecast, forecast_tails, recursive_forecast,
+                      series_state)
+from history_store import HistoryStore
+from model_registry import ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def history(trained_models):
+    return HistoryStore().snapshot()
+
+
+@pytest.mark.parametrize("suffixes", [(".ubj",), (".pkl",)])
+def test_recursive_forecast_matches_legacy_loop(history, suffixes):
+    registry = ModelRegistry(suffixes=suffixes)
+    for crop in CROPS:
+        model = registry.get(crop.lower())
+        for district in DISTRICTS:
+            series, error = history.tail(crop, district, n=LOOKBACK)
+            assert error is None
+            expected = legacy_forecast(model, series.dates, series.prices, series.total)
+            assert forecast_tails(model, [series])[0] == expected
+
+
+def test_batched_forecast_matches_single_series(history):
+    model = ModelRegistry().get("wheat")
+    tails = [history.tail("Wheat", district, n=LOOKBACK)[0] for district in DISTRICTS]
+    assert forecast_tails(model, tails) == [forecast_tails(model, [t])[0] for t in tails]
+
+
+def test_direct_forecast_predicts_from_first_recursive_row(history):
+    series, _ = history.tail("Wheat", "Sehore", n=LOOKBACK)
+    state = series_state(series.prices, series.total)[None, :]
+    seen = {}
+
+    def record(name, width):
+        def predict(X):
+            seen.setdefault(name, X.copy())
+            return np.tile(np.arange(width, dtype=np.float32), (len(X), 1)).squeeze(axis=1 if width == 1 else ())
+        return predict
+
+    recursive_forecast(record("recursive", 1), state, series.dates[-1:])
+    prices, dates = direct_forecast(record("direct", HORIZON), state, series.dates[-1:])
+    np.testing.assert_array_equal(seen["direct"], seen["recursive"])
+    assert seen["direct"].shape == (1, len(FEATURES))
+    assert prices.shape == dates.shape == (1, HORIZON)
+    np.testing.assert_array_equal(prices[0], np.arange(HORIZON))
+
+
+def test_backtest_origin_states_match_series_state(history):
+    series, _ = history.tail("Garlic", "Bhopal", n=len(history.series_date))
+    origins = plan_origins(series.dates)
+    assert len(origins) > 100
+    expected = np.stack([series_state(series.prices[:i + 1][-LOOKBACK:], i + 1) for i in origins])
+    np.testing.assert_array_equal(origin_states(series.prices, origins), expected)
@@ -0,0 +1,105 @@
+# Forecast cache: TTL, LRU eviction, Redis layer (aur Redis down ho to sirf local), counters.
+import threading
+
+import forecast_cache
+from forecast_cache import ForecastCache, cache_key
+
+VALUE = ([{"date": "2024-10-02", "price": 100.0}], "Sehore")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self, down=False):
+        self.data = {}
+        self.down = down
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.down:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(forecast_cache, "time", clock)
+    cache = ForecastCache(max_entries=10, ttl=60, redis_url="")
+    cache.set("k", VALUE)
+    clock.now += 59
+    assert cache.get("k") == VALUE
+    clock.now += 2
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["entries"]) == (1, 1, 1, 0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ForecastCache(max_entries=2, ttl=60, redis_url="")
+    cache.set("a", VALUE)
+    cache.set("b", VALUE)
+    cache.get("a")
+    cache.set("c", VALUE)
+    assert cache.get("b") is None
+    assert cache.get("a") == VALUE and cache.get("c") == VALUE
+    assert cache.stats()["evictions"] == 1
+
+
+def test_keys_change_with_data_and_model_version():
+    assert cache_key("Garlic", "Sehore", "v1", "m1") == cache_key("garlic", "Sehore", "v1", "m1")
+    assert cache_key("garlic", "Sehore", "v1", "m1") != cache_key("garlic", "Sehore", "v1+1", "m1")
+    assert cache_key("garlic", "Sehore", "v1", "m1") != cache_key("garlic", "Sehore", "v1", "m2")
+
+
+def test_redis_hits_fill_the_local_cache():
+    shared = FakeRedis()
+    writer = ForecastCache(max_entries=10, ttl=60, redis_url="")
+    reader = ForecastCache(max_entries=10, ttl=60, redis_url="")
+    writer._redis = reader._redis = shared
+
+    writer.set("k", VALUE)
+    assert reader.get("k") == (VALUE[0], VALUE[1])
+    shared.data.clear()
+    assert reader.get("k") == VALUE
+    stats = reader.stats()
+    assert (stats["hits"], stats["redis_hits"], stats["misses"]) == (2, 1, 0)
+
+
+def test_redis_errors_fall_back_to_local_cache():
+    cache = ForecastCache(max_entries=10, ttl=60, redis_url="")
+    cache._redis = FakeRedis(down=True)
+    cache.set("k", VALUE)
+    assert cache.get("k") == VALUE
+    assert cache.get("other") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["redis_errors"]) == (1, 1, 2)
+
+
+def test_counters_add_up_under_concurrent_lookups():
+    cache = ForecastCache(max_entries=10, ttl=60, redis_url="")
+    cache._redis = FakeRedis(down=True)
+    cache.set("hit", VALUE)
+
+    def lookups():
+        for i in range(2000):
+            cache.get("hit" if i % 2 else "miss")
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = cache.stats()
+    assert stats["hits"] == stats["misses"] == 8000
+    assert stats["redis_errors"] == 8000 + 1
+    assert stats["hit_ratio"] == 0.5
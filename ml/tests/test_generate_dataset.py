@@ -0,0 +1,36 @@
+# Synthetic data generator: seed se byte-identical (chunk size kuch bhi), khaali range pe header,
+# seasonal presets (seed_data.py) purane price level pe.
+import pandas as pd
+import pytest
+
+from generate_dataset import COLUMNS, SEASONAL, generate
+
+
+def test_same_seed_same_bytes_for_any_chunk_size(tmp_path):
+    paths = []
+    for chunk_days in (64, 256, 1024):
+        path = tmp_path / f"out_{chunk_days}.csv"
+        generate(str(path), crops=3, districts=4, start="2024-01-01", end="2024-08-01",
+                 seed=7, chunk_days=chunk_days, coverage=0.8)
+        paths.append(path)
+    assert paths[0].read_bytes() == paths[1].read_bytes() == paths[2].read_bytes()
+
+
+def test_empty_range_still_writes_the_header(tmp_path):
+    path = tmp_path / "empty.csv"
+    assert generate(str(path), start="2024-01-01", end="2024-01-01")["rows"] == 0
+    assert list(pd.read_csv(path).columns) == COLUMNS
+
+
+def test_seasonal_presets_keep_their_price_level(tmp_path):
+    path = tmp_path / "seed.csv"
+    presets = {"Wheat": (2200, 50, 200, 0.0, 1100), "Garlic": (12000, 500, 4000, 0.0, 6000)}
+    generate(str(path), districts=["Sehore"], start="2022-01-01", end="2024-01-01", seed=0,
+             price_model=SEASONAL, presets=presets)
+    prices = pd.read_csv(path).groupby("Commodity")["Modal_Price"]
+    assert prices.mean()["Wheat"] == pytest.approx(2200, rel=0.02)
+    assert prices.mean()["Garlic"] == pytest.approx(12000, rel=0.02)
+    assert prices.min()["Garlic"] >= 6000
+
+    with pytest.raises(ValueError):
+        generate(str(path), crops=["Onion"], price_model=SEASONAL, presets=presets)
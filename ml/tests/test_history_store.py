@@ -0,0 +1,58 @@
+# History store: mmap tail == CSV ki aakhri rows, All India fallback, CSV badle to naya version.
+import os
+
+import numpy as np
+import pandas as pd
+
+from history_store import HistoryStore, current_version
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=["Price Date", "Commodity", "District Name", "Modal_Price"]).to_csv(path, index=False)
+
+
+def daily_rows(crop, district, start, prices):
+    days = pd.date_range(start, periods=len(prices), freq="D").strftime("%Y-%m-%d")
+    return [(day, crop, district, price) for day, price in zip(days, prices)]
+
+
+def test_tail_matches_csv_and_falls_back_to_all_india(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    rows = (daily_rows("Garlic", "Sehore", "2024-01-01", range(100, 150))
+            + daily_rows("Garlic", "Bhopal", "2024-01-01", range(200, 240))
+            + daily_rows("Onion", "Sehore", "2024-01-01", range(10, 20)))
+    write_csv(csv_path, rows)
+    history = HistoryStore(csv_path, str(tmp_path / "store"), check_interval=0).snapshot()
+
+    series, error = history.tail("Garlic", "Sehore", n=30)
+    assert error is None and series.location == "Sehore"
+    assert series.total == 50
+    np.testing.assert_array_equal(series.prices, np.arange(120, 150))
+    assert str(series.dates[-1])[:10] == "2024-02-19"
+
+    # District nahi mila: saare districts ki rows, date order mein
+    series, error = history.tail("garlic", "Indore", n=4)
+    assert series.location == "All India Trends" and series.total == 90
+    df = pd.read_csv(csv_path)
+    garlic = df[df["Commodity"] == "Garlic"].sort_values("Price Date", kind="stable")
+    np.testing.assert_array_equal(series.prices, garlic["Modal_Price"].to_numpy()[-4:])
+
+    assert history.tail("Banana", "Sehore") == (None, "No Data for Crop")
+
+
+def test_store_is_rebuilt_when_the_csv_changes(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    store_dir = str(tmp_path / "store")
+    write_csv(csv_path, daily_rows("Wheat", "Sehore", "2024-01-01", range(10)))
+    store = HistoryStore(csv_path, store_dir, check_interval=0)
+    first = store.snapshot()
+    assert store.snapshot() is first
+
+    write_csv(csv_path, daily_rows("Wheat", "Sehore", "2024-01-01", range(11)))
+    os.utime(csv_path, ns=(os.stat(csv_path).st_mtime_ns + 10**9,) * 2)
+    second = store.snapshot()
+    assert second.version != first.version
+    assert current_version(store_dir) == second.version
+    assert second.tail("Wheat", "Sehore")[0].total == 11
+    # Purana version prune ho gaya
+    assert sorted(os.listdir(store_dir)) == ["CURRENT", second.version]
@@ -0,0 +1,63 @@
+# Disease upload decode: 150x150 float tensor, data URL, bahut badi dimensions / bytes client ki galti.
+import asyncio
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_preprocess import ImagePreprocessor, ImageTooLarge, InvalidImage, decode_image
+from micro_batcher import QueueFull
+
+
+def encoded(size, fmt="JPEG"):
+    buf = io.BytesIO()
+    rng = np.random.default_rng(0)
+    Image.fromarray(rng.integers(0, 255, size[::-1] + (3,), dtype=np.uint8)).save(buf, format=fmt)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def test_decode_resizes_to_model_input():
+    timings = {}
+    tensor = decode_image("data:image/jpeg;base64," + encoded((1200, 900)), 150, timings)
+    assert tensor.shape == (150, 150, 3) and tensor.dtype == np.float32
+    assert 0.0 <= tensor.min() and tensor.max() <= 1.0
+    assert set(timings) == {"base64", "decode", "resize", "to_array"}
+    # PNG pe draft() no-op hai, phir bhi same shape
+    assert decode_image(encoded((40, 30), "PNG"), 150).shape == (150, 150, 3)
+
+
+def test_decompression_bombs_are_invalid_images(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(InvalidImage):
+        decode_image(encoded((200, 200), "PNG"), 150)
+
+
+@pytest.mark.parametrize("payload", ["not base64 at all!!", base64.b64encode(b"hello").decode(), ""])
+def test_garbage_is_an_invalid_image(payload):
+    with pytest.raises(InvalidImage):
+        decode_image(payload, 150)
+
+
+def test_size_limit_and_backpressure():
+    async def run():
+        pre = ImagePreprocessor(workers=1, max_pending=1, max_bytes=10_000)
+        try:
+            with pytest.raises(ImageTooLarge):
+                await pre.preprocess(encoded((300, 300), "PNG"))
+            pre.pending = 1  # ek decode pehle se chal raha hai
+            with pytest.raises(QueueFull):
+                await pre.preprocess(encoded((20, 20)))
+            pre.pending = 0
+            tensor = await pre.preprocess(encoded((20, 20)))
+            with pytest.raises(InvalidImage):
+                await pre.preprocess(base64.b64encode(b"hello").decode())
+            return tensor, pre.stats()
+        finally:
+            pre.shutdown()
+
+    tensor, stats = asyncio.run(run())
+    assert tensor.shape == (150, 150, 3)
+    assert (stats["too_large"], stats["rejected"], stats["invalid"]) == (1, 1, 1)
+    assert stats["stages"]["decode"]["count"] == 1
@@ -0,0 +1,57 @@
+# Materialized lookup == live forecast; doosri strategy / model version ka forecast kabhi nahi.
+import pytest
+
+from forecast import DIRECT, RECURSIVE
+from materialize import MaterializedForecasts, materialize
+from model_registry import ModelRegistry
+
+# test_serve_ingest in series mein prices ingest karta hai - yeh do untouched rehti hain
+PAIRS = [("Garlic", "Bhopal"), ("Wheat", "Sehore")]
+
+
+def predict(client, crop, district):
+    return client.post("/v1/predict", json={"crop": crop, "district": district, "state": "MP",
+                                            "area_acres": 1}).json()
+
+
+@pytest.fixture(scope="module")
+def forecasts_path(trained_models, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("materialized") / "forecasts.pkl")
+    materialize(path, jobs=1, strategy=RECURSIVE)
+    return path
+
+
+def test_materialized_lookup_matches_live_forecast(client, forecasts_path, monkeypatch):
+    import serve
+    live = {pair: predict(client, *pair) for pair in PAIRS}
+
+    materialized = MaterializedForecasts(forecasts_path)
+    monkeypatch.setattr(serve, "materialized", materialized)
+    serve.forecast_cache.clear()
+    for pair in PAIRS:
+        assert predict(client, *pair) == live[pair]
+    assert materialized.stats()["hits"] == len(PAIRS)
+    assert materialized.stats()["strategy"] == RECURSIVE
+
+
+def test_lookup_checks_strategy_and_model(forecasts_path, trained_models):
+    from history_store import HistoryStore
+    materialized = MaterializedForecasts(forecasts_path)
+    version = HistoryStore().snapshot().version
+    entry = ModelRegistry().select("garlic", "Bhopal")
+
+    assert materialized.lookup("garlic", "Bhopal", version, RECURSIVE, entry) is not None
+    assert materialized.lookup("garlic", "Bhopal", version, DIRECT, entry) is None
+    assert materialized.lookup("garlic", "Bhopal", version, RECURSIVE, ModelRegistry().get_entry("wheat")) is None
+    assert materialized.lookup("garlic", "Bhopal", version + "+1", RECURSIVE, entry) is None
+    stats = materialized.stats()
+    assert (stats["hits"], stats["model_mismatch"], stats["stale_history"]) == (1, 2, 1)
+
+
+def test_direct_job_falls_back_to_recursive_models_like_serve(trained_models, tmp_path):
+    # Direct models train nahi hue - serve (strategy=direct) bhi recursive model hi chalata
+    path = str(tmp_path / "forecasts.pkl")
+    materialize(path, jobs=1, strategy=DIRECT)
+    materialized = MaterializedForecasts(path)
+    assert materialized.strategy == DIRECT
+    assert {item["strategy"] for item in materialized.entries.values()} == {RECURSIVE}
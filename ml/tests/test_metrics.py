@@ -0,0 +1,77 @@
+# Metrics: stage histograms, event/error counters, crop label cardinality, Server-Timing header.
+import metrics
+from metrics import MetricsRegistry
+
+
+def test_registry_renders_cumulative_buckets_and_bounded_crop_labels(monkeypatch):
+    registry = MetricsRegistry()
+    registry.crop_labels = {"garlic"}
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    monkeypatch.setattr(metrics, "ENABLED", True)
+
+    metrics.record_stage("forecast", "Garlic", 0.003)
+    metrics.record_stage("forecast", "garlic", 0.2)
+    metrics.event("cache_miss", "Garlic")
+    metrics.event("cache_miss", "Lahsun; DROP TABLE")
+    metrics.error("predict", "overloaded")
+    registry.gauge("krishi_test_gauge", "Test", lambda: 7)
+    registry.gauge("krishi_broken_gauge", "Skipped", lambda: 1 / 0)
+
+    text = metrics.render()
+    assert 'krishi_stage_seconds_bucket{stage="forecast",crop="garlic",le="0.0025"} 0' in text
+    assert 'krishi_stage_seconds_bucket{stage="forecast",crop="garlic",le="0.005"} 1' in text
+    assert 'krishi_stage_seconds_bucket{stage="forecast",crop="garlic",le="0.25"} 2' in text
+    assert 'krishi_stage_seconds_bucket{stage="forecast",crop="garlic",le="+Inf"} 2' in text
+    assert 'krishi_stage_seconds_sum{stage="forecast",crop="garlic"} 0.203000' in text
+    # Anjaani crop user input hai - label "other" mein jaata hai
+    assert 'krishi_events_total{event="cache_miss",crop="garlic"} 1' in text
+    assert 'krishi_events_total{event="cache_miss",crop="other"} 1' in text
+    assert 'krishi_errors_total{endpoint="predict",kind="overloaded"} 1' in text
+    assert "krishi_test_gauge 7" in text and "krishi_broken_gauge" not in text
+
+
+def test_collected_stages_stay_out_of_the_registry_until_absorbed(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    monkeypatch.setattr(metrics, "ENABLED", True)
+
+    def work(x):
+        with metrics.stage("forecast", "wheat"):
+            metrics.event("cache_hit", "wheat")
+        metrics.record_stage("forecast", "wheat", 0.002)
+        return x * 2
+
+    result, (stages, events) = metrics.run_collected(work, (21,))
+    assert result == 42 and len(stages) == 2 and events == [("cache_hit", "wheat")]
+    assert "krishi_stage_seconds_count" not in registry.render()
+
+    metrics.absorb(stages, events)
+    assert metrics.server_timing([("a", "", 0.001), ("b", "", 0.002), ("a", "", 0.0005)]) == \
+        "a;dur=1.500, b;dur=2.000"
+    text = registry.render()
+    assert 'krishi_stage_seconds_count{stage="forecast",crop="other"} 2' in text
+
+
+def test_stage_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    assert metrics.stage("forecast") is metrics.NULL_STAGE
+    # Profiling request (collector set) pe stages phir bhi record hote hain
+    stage, _ = metrics.run_collected(metrics.stage, ("forecast",))
+    assert isinstance(stage, metrics._Stage)
+
+
+def test_profile_header_returns_server_timing(client):
+    body = {"crop": "Garlic", "district": "Sehore", "state": "MP", "area_acres": 1}
+    plain = client.post("/v1/predict", json=body)
+    assert plain.status_code == 200 and "Server-Timing" not in plain.headers
+
+    profiled = client.post("/v1/predict", json=body, headers={"X-Krishi-Profile": "1"})
+    assert profiled.json() == plain.json()
+    stages = dict(part.split(";dur=") for part in profiled.headers["Server-Timing"].split(", "))
+    assert {"resolve_names", "model_select"} <= set(stages)
+    assert all(float(ms) >= 0 for ms in stages.values())
+
+    text = client.get("/metrics").text
+    assert 'krishi_stage_seconds_count{stage="resolve_names",crop="garlic"}' in text
+    assert 'krishi_events_total{event="cache_hit",crop="garlic"}' in text
+    assert "krishi_ready 1" in text
@@ -0,0 +1,56 @@
+# Registry: model ek baar load, file badle to hot reload, file hate to model bhi hata.
+import os
+
+import numpy as np
+import xgboost as xgb
+
+from model_registry import ModelRegistry
+
+
+def save_model(path, bias):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    model = xgb.XGBRegressor(n_estimators=5, max_depth=2, base_score=bias)
+    model.fit(X, X[:, 0] + bias)
+    model.save_model(path)
+
+
+def test_models_are_cached_and_reloaded_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "xgb_onion.ubj")
+    save_model(path, 10.0)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+
+    entry = registry.get_entry("Onion")
+    assert entry is not None and entry.reloads == 0
+    assert registry.get_entry("onion") is entry
+    assert registry.crop_models() == ["onion"]
+
+    save_model(path, 500.0)
+    os.utime(path, ns=(entry.signature[0] + 10**9,) * 2)
+    reloaded = registry.get_entry("onion")
+    assert reloaded is not entry and reloaded.reloads == 1
+    assert reloaded.version != entry.version
+    X = np.zeros((1, 3), dtype=np.float32)
+    assert reloaded.model.inplace_predict(X)[0] > entry.model.inplace_predict(X)[0] + 100
+
+    os.remove(path)
+    assert registry.get_entry("onion") is None
+    assert registry.stats()["loaded"] == []
+
+
+def test_district_model_preferred_over_crop_model(tmp_path):
+    save_model(str(tmp_path / "xgb_onion.ubj"), 10.0)
+    save_model(str(tmp_path / "xgb_onion__sehore.ubj"), 20.0)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+
+    assert registry.select("onion", "Sehore").name == "onion__sehore"
+    assert registry.select("onion", "Bhopal").name == "onion"
+    assert registry.crop_models() == ["onion"]
+
+
+def test_missing_models_are_not_stat_on_every_call(tmp_path):
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=60)
+    assert registry.get_entry("onion") is None
+    save_model(str(tmp_path / "xgb_onion.ubj"), 10.0)
+    # Check interval ke andar "missing" hi yaad rehta hai
+    assert registry.get_entry("onion") is None
@@ -0,0 +1,27 @@
+# Name index tiers: exact > alias > prefix > fuzzy; ek se zyada naam mile to ambiguous.
+from name_index import (ALIAS, AMBIGUOUS, CROP_ALIASES, DISTRICT_ALIASES, EXACT, FUZZY, PREFIX,
+                        UNKNOWN, NameIndex)
+
+DISTRICTS = NameIndex(["Sehore", "Bhopal", "Shajapur", "Shahdol", "Dhar", "West Nimar"], DISTRICT_ALIASES)
+CROPS = NameIndex(["garlic", "wheat", "Paddy(Dhan)(Common)"], CROP_ALIASES)
+
+
+def test_tiers_in_order():
+    assert DISTRICTS.resolve(" SEHORE ") == (EXACT, ("Sehore",), ())
+    assert DISTRICTS.resolve("सीहोर") == (ALIAS, ("Sehore",), ())
+    assert DISTRICTS.resolve("nimar") == (ALIAS, ("West Nimar",), ())
+    assert CROPS.resolve("lahsun") == (ALIAS, ("garlic",), ())
+    assert CROPS.resolve("rice") == (ALIAS, ("Paddy(Dhan)(Common)",), ())
+    assert DISTRICTS.resolve("sehre") == (FUZZY, ("Sehore",), ())
+
+
+def test_prefix_queries_resolve_to_a_unique_name():
+    assert DISTRICTS.resolve("seh") == (PREFIX, ("Sehore",), ())
+    assert DISTRICTS.resolve("bhop") == (PREFIX, ("Bhopal",), ())
+    assert DISTRICTS.resolve("nim") == (PREFIX, ("West Nimar",), ())
+    assert CROPS.resolve("lahs") == (PREFIX, ("garlic",), ())
+    assert DISTRICTS.resolve("sha") == (AMBIGUOUS, (), ("Shahdol", "Shajapur"))
+    # Bahut chhota prefix kuch match nahi karta
+    assert DISTRICTS.resolve("se") == (UNKNOWN, (), ())
+    # Poora naam prefix se pehle: "dhar" exact hai
+    assert DISTRICTS.resolve("dhar").status == EXACT
@@ -0,0 +1,75 @@
+# Bounded prediction pool: workers + queue bhare hon to turant Overloaded -> 503 + Retry-After.
+import asyncio
+import threading
+
+import pytest
+
+from prediction_pool import Overloaded, PredictionExecutor
+
+
+def test_requests_past_the_limit_are_rejected():
+    release = threading.Event()
+
+    async def run():
+        executor = PredictionExecutor("thread", workers=1, max_queue=1)
+        executor.start()
+        try:
+            running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert executor.stats()["queue_depth"] == 1
+            with pytest.raises(Overloaded):
+                await executor.run(release.wait, 5)
+            release.set()
+            results = [result for result, _ in await asyncio.gather(*running)]
+            # Queue khali hone ke baad phir se accept
+            after, _ = await executor.run(sum, [1, 2])
+            return results, after, executor.stats()
+        finally:
+            release.set()
+            executor.shutdown()
+
+    results, after, stats = asyncio.run(run())
+    assert results == [True, True] and after == 3
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (3, 1, 0)
+
+
+def test_retry_after_grows_with_the_backlog():
+    executor = PredictionExecutor("thread", workers=2, max_queue=10)
+    assert executor.retry_after() == 1
+    executor.completed, executor._run_total = 10, 20.0  # 2 s per prediction
+    executor.in_flight = 12
+    assert executor.retry_after() == 12
+
+
+def test_overloaded_predict_returns_503_with_retry_after(client):
+    import serve
+    executor = serve.predict_executor
+    full = executor.workers + executor.max_queue
+    executor.in_flight += full
+    try:
+        body = {"crop": "Wheat", "district": "Sehore", "state": "MP", "area_acres": 1}
+        r = client.post("/v1/predict", json=body)
+        assert r.status_code == 503
+        assert int(r.headers["Retry-After"]) >= 1
+        r = client.post("/v1/predict/batch", json={"items": [body]})
+        assert r.status_code == 503
+    finally:
+        executor.in_flight -= full
+    assert client.post("/v1/predict", json=body).status_code == 200
+    assert 'krishi_errors_total{endpoint="predict",kind="overloaded"}' in client.get("/metrics").text
+
+
+def test_process_mode_matches_thread_mode(trained_models):
+    import serve
+    expected = serve.predict_future_prices_xgboost("Garlic", "Bhopal")
+
+    async def run():
+        executor = PredictionExecutor("process", workers=1, max_queue=1)
+        executor.start()
+        try:
+            return await executor.run(serve.predict_future_prices_xgboost, "Garlic", "Bhopal")
+        finally:
+            executor.shutdown()
+
+    result, _ = asyncio.run(run())
+    assert result == expected
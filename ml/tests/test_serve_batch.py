@@ -0,0 +1,60 @@
+# /v1/predict/batch == har pair ka alag /v1/predict; aliases ek hi crop group (ek pass) mein.
+def predict(client, crop, district):
+    return client.post("/v1/predict", json={"crop": crop, "district": district, "state": "MP",
+                                            "area_acres": 1}).json()
+
+
+def test_batch_matches_single_predictions_in_input_order(client):
+    pairs = [("Wheat", "Bhopal"), ("Garlic", "Sehore"), ("Banana", "Sehore"), ("wheat", "Sehore")]
+    r = client.post("/v1/predict/batch", json={"items": [
+        {"crop": crop, "district": district, "state": "MP", "area_acres": 1} for crop, district in pairs]})
+    body = r.json()
+    assert body["count"] == len(pairs)
+    for (crop, district), result in zip(pairs, body["results"]):
+        if crop == "Banana":
+            assert result == {"crop": crop, "district": district, "reason": "Model not found",
+                              "error": "No prediction data available for Banana"}
+        else:
+            assert result == predict(client, crop, district)
+
+
+def test_aliases_share_one_crop_group(client, monkeypatch):
+    import serve
+    calls = []
+    forecast_crop = serve._forecast_crop
+
+    def counting(crop_name, districts, history):
+        calls.append((crop_name, sorted(districts)))
+        return forecast_crop(crop_name, districts, history)
+
+    monkeypatch.setattr(serve, "_forecast_crop", counting)
+    results = serve.predict_future_prices_batch([("Lahsun", "Sehore"), ("Garlic", "Bhopal"),
+                                                 ("लहसुन", "Bhopal"), ("Wheat", "Sehore")])
+    assert calls == [("garlic", ["Bhopal", "Sehore"]), ("wheat", ["Sehore"])]
+    assert results[1] == results[2]
+    assert all(forecast is not None for forecast, _ in results)
+
+
+def test_new_crop_model_resolves_without_restart(client, monkeypatch):
+    import os
+    import shutil
+    import serve
+    monkeypatch.setattr(serve.registry, "check_interval", 0)
+    assert client.get("/v1/names/resolve", params={"crop": "pyaz"}).json()["crop"]["status"] == "unknown"
+    assert predict(client, "Onion", "Sehore")["error"] == "No prediction data available for Onion"
+
+    garlic = serve.registry.path_for("garlic")
+    onion = garlic.replace("xgb_garlic", "xgb_onion")
+    shutil.copy(garlic, onion)
+    try:
+        assert client.get("/v1/names/resolve", params={"crop": "pyaz"}).json()["crop"] == \
+            {"status": "alias", "names": ["onion"], "choices": []}
+        # Model mil gaya; history mein onion nahi hai
+        r = client.post("/v1/predict/batch", json={"items": [
+            {"crop": "Pyaz", "district": "Sehore", "state": "MP", "area_acres": 1}]})
+        assert r.json()["results"][0]["reason"] == "No Data for Crop"
+    finally:
+        serve.registry._entries.pop("onion", None)
+        os.remove(onion)
+        serve.current_crop_names()
+    assert client.get("/v1/names/resolve", params={"crop": "pyaz"}).json()["crop"]["status"] == "unknown"
@@ -0,0 +1,49 @@
+# /v1/prices -> forecast: ingested price (alias naam se bhi) usi series ke forecast mein dikhna chahiye.
+from name_index import NameIndex
+
+
+def first_day(client, crop, district):
+    body = client.post("/v1/predict", json={"crop": crop, "district": district, "state": "MP",
+                                             "area_acres": 1}).json()
+    return body["forecast"][0]
+
+
+def test_alias_ingest_updates_canonical_forecast(client):
+    before = first_day(client, "Garlic", "Sehore")
+    r = client.post("/v1/prices", json={"crop": "Lahsun", "district": "सीहोर",
+                                        "date": "2024-10-05", "price": 25000})
+    assert r.json() == {"accepted": True, "reason": None}
+
+    after = first_day(client, "Garlic", "Sehore")
+    assert after["date"] == "2024-10-06"
+    assert after != before
+    # Alias aur canonical naam dono ek hi state / cache padhte hain
+    assert first_day(client, "lahsun", "Sehore") == after
+    state = client.get("/v1/prices/state", params={"crop": "Garlic", "district": "Sehore"}).json()
+    assert state["recent_prices"][-1] == 25000
+
+    # Usi din ka dobara price: stale
+    r = client.post("/v1/prices", json={"crop": "Garlic", "district": "Sehore",
+                                        "date": "2024-10-05", "price": 100})
+    assert r.json() == {"accepted": False, "reason": "stale_date"}
+
+
+def test_unknown_series_are_rejected(client):
+    series_before = client.get("/v1/prices/state").json()["series"]
+    r = client.post("/v1/prices/bulk", json={"items": [
+        {"crop": "Banana", "district": "Nowhere", "date": "2024-10-05", "price": 10},
+        {"crop": "Garlic", "district": "Nowhere", "date": "2024-10-05", "price": 10},
+        {"crop": "Wheat", "district": "Bhopal", "date": "2024-10-05", "price": 2000},
+    ]})
+    assert r.json() == {"accepted": 1, "rejected": [{"index": 0, "reason": "unknown_series"},
+                                                    {"index": 1, "reason": "unknown_series"}]}
+    assert client.get("/v1/prices/state").json()["series"] == series_before
+
+
+def test_ambiguous_names_are_a_client_error(client, monkeypatch):
+    import serve
+    monkeypatch.setattr(serve, "crop_names", NameIndex(["wheat", "wheat2"]))
+    r = client.post("/v1/prices", json={"crop": "wheatt", "district": "Sehore",
+                                        "date": "2024-10-07", "price": 2000})
+    assert r.status_code == 400
+    assert "Ambiguous crop" in r.json()["error"]
@@ -0,0 +1,44 @@
+# Fingerprint: unchanged models skip, badle hue retrain; chunked aur in-memory same fingerprint.
+import os
+
+import train
+from conftest import CROPS, train_args
+from crop_partitions import load_partition, partition_by_crop
+
+
+def fingerprints(keyed):
+    params = train.training_params("fast")
+    return {name: train.model_fingerprint(rows, params=params) for name, rows in train.plan_models(keyed, False)}
+
+
+def test_unchanged_models_are_skipped(trained_models):
+    tasks, skipped = train.plan_tasks(trained_models, train_args())
+    assert tasks == []
+    assert sorted(skipped) == sorted(c.lower() for c in CROPS)
+
+
+def test_changed_rows_retrain_only_that_model(trained_models):
+    keyed = trained_models.copy()
+    row = keyed.index[keyed["crop_key"] == "wheat"][-1]
+    keyed.loc[row, "modal_price"] += 1
+    tasks, skipped = train.plan_tasks(keyed, train_args())
+    assert [task[0] for task in tasks] == ["wheat"]
+    assert skipped == ["garlic"]
+
+    tasks, skipped = train.plan_tasks(trained_models, train_args(force=True))
+    assert len(tasks) == len(CROPS) and skipped == []
+
+
+def test_chunked_and_in_memory_fingerprints_match(trained_models, history_csv, tmp_path):
+    path = partition_by_crop(history_csv, CROPS, out_dir=str(tmp_path), chunk_rows=97)
+    chunked = {}
+    for crop in CROPS:
+        chunked.update(fingerprints(train.assign_group_keys(load_partition(path, crop.lower()), CROPS)))
+    assert chunked == fingerprints(trained_models)
+
+
+def test_missing_tables_are_reexported_on_skip(trained_models):
+    os.remove(train.tables_path("garlic"))
+    tasks, skipped = train.plan_tasks(trained_models, train_args())
+    assert tasks == [] and "garlic" in skipped
+    assert os.path.exists(train.tables_path("garlic"))
@@ -0,0 +1,55 @@
+# Training pool: cores ka bantwara, ek model fail ho to baaki chalte hain, aur train.py non-zero exit.
+import sys
+
+import pytest
+
+import train
+from training_pool import core_budget, failures, run_training_jobs
+
+
+def fake_train(name, n_threads):
+    if name.startswith("bad"):
+        raise ValueError(f"no rows for {name}")
+    return {"crop": name, "rows": 10, "mae": 1.0, "trees": 5, "predict_ms": 0.1}
+
+
+def test_core_budget_never_oversubscribes():
+    assert core_budget(6, total_cores=8) == (6, 1)
+    assert core_budget(2, total_cores=8) == (2, 4)
+    assert core_budget(10, threads_per_job=4, total_cores=8) == (2, 4)
+    assert core_budget(3, jobs=8, total_cores=8) == (3, 2)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failed_tasks_are_reported_not_swallowed(jobs, capsys):
+    results, _ = run_training_jobs(fake_train, [("wheat",), ("bad_onion",), ("garlic",)], jobs=jobs)
+    assert [r["status"] for r in results] == ["ok", "failed", "ok"]
+    assert failures(results) == [results[1]]
+    assert results[1]["error"] == "ValueError: no rows for bad_onion"
+    out = capsys.readouterr().out
+    assert "2 ok, 1 failed" in out
+    assert "❌ bad_onion: ValueError: no rows for bad_onion" in out
+
+
+def test_timing_table_is_capped(capsys):
+    tasks = [(f"wheat__district_{i}",) for i in range(300)]
+    run_training_jobs(fake_train, tasks, jobs=1)
+    out = capsys.readouterr().out
+    assert sum("wheat__district_" in line for line in out.splitlines()) == 25
+    assert "275 aur models" in out
+    assert "300 ok, 0 failed" in out
+
+
+def test_train_exits_non_zero_when_a_model_fails(history_csv, monkeypatch, capsys):
+    def broken(name, *args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(train, "train_model", broken)
+    monkeypatch.setattr(sys, "argv", ["train.py", "--csv", history_csv, "--mode", "fast", "--force",
+                                      "--no-district-models", "--jobs", "1"])
+    with pytest.raises(SystemExit) as exit_info:
+        train.main()
+    assert exit_info.value.code == 1
+    out = capsys.readouterr().out
+    assert "Trained Successfully" not in out
+    assert "❌ garlic: RuntimeError: disk full" in out
@@ -0,0 +1,59 @@
+# NumPy tree evaluator == XGBoost inplace_predict (NaN / +-inf inputs bhi), aur bade batch pe fallback.
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from tree_tables import TreeEnsemble, booster_tables, write_tables
+
+
+@pytest.fixture(scope="module")
+def booster():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 8)).astype(np.float32)
+    X[rng.uniform(size=X.shape) < 0.05] = np.nan
+    y = 3 * np.nan_to_num(X[:, 0]) + np.sin(np.nan_to_num(X[:, 1])) + rng.normal(0, 0.1, len(X))
+    model = xgb.XGBRegressor(n_estimators=60, max_depth=5, tree_method="hist")
+    model.fit(X, y)
+    return model.get_booster()
+
+
+def rows(n, seed=1):
+    X = np.random.default_rng(seed).normal(size=(n, 8)).astype(np.float32)
+    X[::4, 0] = np.inf
+    X[1::4, 1] = -np.inf
+    X[2::4, 2] = np.nan
+    return X
+
+
+def test_predict_matches_booster(booster, tmp_path):
+    tables = TreeEnsemble.load(write_tables(booster, str(tmp_path / "xgb_test.trees")))
+    for n in (1, 7, 200):
+        X = rows(n)
+        np.testing.assert_allclose(tables.predict(X), booster.inplace_predict(X), rtol=0, atol=1e-3)
+
+
+def test_large_batches_use_fallback_booster(booster, tmp_path):
+    path = write_tables(booster, str(tmp_path / "xgb_test.trees"))
+    loads = []
+
+    def load_fallback():
+        loads.append(1)
+        return booster
+
+    tables = TreeEnsemble.load(path, load_fallback, max_rows=16)
+    small = tables.predict(rows(16))
+    assert not loads
+    big = rows(64)
+    np.testing.assert_array_equal(tables.predict(big), booster.inplace_predict(big))
+    tables.predict(big)
+    assert len(loads) == 1
+    np.testing.assert_allclose(small, booster.inplace_predict(rows(16)), atol=1e-3)
+
+
+def test_multi_output_boosters_are_rejected():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(200, 8))
+    model = xgb.XGBRegressor(n_estimators=5, tree_method="hist", multi_strategy="multi_output_tree")
+    model.fit(X, np.column_stack([X[:, 0], X[:, 1]]))
+    with pytest.raises(ValueError):
+        booster_tables(model.get_booster())
@@ -1,119 +1,460 @@
-import pandas as pd
+# ml/train.py
+# XGBoost price models ki single training pipeline.
+#
+# Data ek hi groupby pass mein (crop, district) groups mein bantta hai aur lag/rolling
+# features har group ke andar bante hain. Phir:
+#   models/xgb_<crop>.pkl             -> crop-level model (saare districts, fallback)
+#   models/xgb_<crop>__<district>.pkl -> jin districts ke paas kaafi data hai
+# Har .pkl ke saath same booster XGBoost ke native .ubj format mein bhi (serve isi ko prefer karta hai),
+# aur .trees flat tables (KRISHI_TREE_EVALUATOR=numpy ke liye, tree_tables.py).
+# --strategy direct: wahi features, par target agle 30 din ki prices (ek multi-output model) ->
+#   models/direct/xgb_<name>.* - serve KRISHI_FORECAST_STRATEGY=direct pe ek predict mein 30 din.
+# Har model ke saath .meta.json mein fingerprint (rows + feature list + params) hota hai;
+# fingerprint same ho to woh model skip - nightly refresh sirf badle hue models train karega.
+#
+# Usage: python train.py [--jobs 3] [--threads-per-job 4] [--force] [--min-group-rows 200]
+#                        [--no-district-models] [--csv data/mandi_history.csv]
+#                        [--chunked] [--chunk-rows 500000]   # multi-GB CSV: crop-wise partitions
+#                        [--mode fast] [--search]            # hist + early stopping, CV grid search
+#                        [--strategy direct]                 # multi-horizon model (fast mode)
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
 import numpy as np
 import xgboost as xgb
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
-import joblib
-import os
 
-# Folder check
-if not os.path.exists("models"):
-    os.makedirs("models")
-
-print("🔄 Loading Real Mandi Data (Kaggle CSV)...")
-
-try:
-    # 1. Load CSV
-    df = pd.read_csv("data/mandi_history.csv")
-    
-    # Column ke naam saaf karo (Extra spaces hatao)
-    df.columns = df.columns.str.strip()
-    
-    print("📊 Columns found in CSV:", list(df.columns))
-
-    # 2. Smart Rename (Kaggle Column names handle karne ke liye)
-    rename_map = {
-        'Price Date': 'date',       # Kaggle name -> Our name
-        'Modal_Price': 'modal_price',
-        'Commodity': 'crop',
-        'District Name': 'district_name',
-        'Market Name': 'market_name',
-        # Fallbacks (Agar purani file ho)
-        'arrival_date': 'date',
-        'modal_price': 'modal_price',
-        'crop': 'crop'
-    }
-    
-    df = df.rename(columns=rename_map)
-    
-    # Check agar 'date' column ban gaya ya nahi
-    if 'date' not in df.columns:
-        print("❌ Error: 'Price Date' column nahi mila!")
-        print("CSV mein ye columns hain:", list(df.columns))
-        exit()
-
-    # 3. Date Conversion
-    # 'errors=coerce' ka matlab agar koi date kharab hai to use NaT bana do (error mat do)
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df = df.dropna(subset=['date']) # Kharab dates hatao
-    df = df.sort_values('date')
-    
-    print(f"✅ Data Loaded Successfully! Total Rows: {len(df)}")
-    
-except Exception as e:
-    print(f"❌ Critical Error loading CSV: {e}")
-    exit()
-
-def create_features(df):
-    df = df.copy()
-    
-    # 1. Time Features
-    df['day_of_year'] = df['date'].dt.dayofyear
-    df['month'] = df['date'].dt.month
-    df['year'] = df['date'].dt.year
-    
-    # 2. Lag Features (History)
-    df['lag_1'] = df['modal_price'].shift(1)
-    df['lag_7'] = df['modal_price'].shift(7)
-    df['lag_30'] = df['modal_price'].shift(30)
-    
-    # 3. Rolling Statistics
-    df['rolling_mean_7'] = df['modal_price'].rolling(window=7).mean()
-    df['rolling_std_7'] = df['modal_price'].rolling(window=7).std()
-    
-    df = df.dropna()
-    return df
+from config import CSV_CHUNK_ROWS, DIRECT_MODELS_DIR, HISTORY_CSV, MODELS_DIR
+from crop_partitions import load_partition, partition_by_crop, peak_rss_mb, read_manifest
+from forecast import DIRECT, FEATURES, HORIZON, RECURSIVE, STRATEGIES, booster_predictor
+from mandi_data import create_features, crop_key_map, load_history, normalize_key
+from model_registry import DISTRICT_SEP
+from training_pool import failures, print_failures, run_training_jobs
+from tree_tables import write_tables
 
 # Target Crops
 target_crops = ['Wheat', 'Rice', 'Garlic', 'Onion', 'Potato', 'Tomato']
 
-print("🚀 Training XGBoost Models...")
-
-for crop in target_crops:
-    # Filter Crop (Case insensitive)
-    crop_data = df[df['crop'].str.contains(crop, case=False, na=False)]
-    
-    if len(crop_data) < 50:
-        print(f"⚠️ Skipping {crop}: Not enough data ({len(crop_data)} rows)")
-        continue
-
-    print(f"\n🌱 Training for: {crop} ({len(crop_data)} rows)...")
-    
-    processed_data = create_features(crop_data)
-    
-    if processed_data.empty:
-        print("   ❌ Data too short for features.")
-        continue
-
-    features = ['day_of_year', 'month', 'year', 'lag_1', 'lag_7', 'lag_30', 'rolling_mean_7', 'rolling_std_7']
-    X = processed_data[features]
-    y = processed_data['modal_price']
-    
-    # Split Data
-    split_idx = int(len(X) * 0.90)
-    X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
-    y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
-    
-    # Train XGBoost
-    model = xgb.XGBRegressor(n_estimators=1000, learning_rate=0.01, max_depth=5, n_jobs=-1)
-    
-    model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
-    
-    # Evaluate
+MODEL_PARAMS = {"n_estimators": 1000, "learning_rate": 0.01, "max_depth": 5}
+
+# --mode fast: histogram trees + early stopping on a time-ordered validation slice.
+# n_estimators sirf upper limit hai - validation MAE EARLY_STOPPING_ROUNDS tak na sudhre to ruk jao.
+FAST_PARAMS = {"n_estimators": 2000, "learning_rate": 0.05, "max_depth": 5, "tree_method": "hist"}
+EARLY_STOPPING_ROUNDS = 50
+# Split (time order): train | validation (early stopping) | test (MAE)
+VALIDATION_FRACTION = 0.10
+TEST_FRACTION = 0.10
+
+# --search: yeh chhota grid rolling-origin folds pe (fold i: pehle i hisse train, agla hissa validate)
+SEARCH_GRID = [{"learning_rate": lr, "max_depth": depth} for lr in (0.05, 0.1) for depth in (4, 6)]
+SEARCH_FOLDS = 3
+
+# Itni (feature wali) rows se kam ho to district ka alag model nahi, crop-level model hi chalega
+MIN_GROUP_ROWS = 200
+
+# Training logic badle (split, features ka code) to ise badha do - saare fingerprints badal jayenge
+PIPELINE_VERSION = 3
+
+GROUP_COLS = ['crop_key', 'district_key']
+
+# --strategy direct: price_h<k> = feature row ke din se k-1 din aage ki price (h1 = wahi din,
+# jo recursive ka pehla step predict karta hai). Ek multi_output_tree model saare horizons ke liye -
+# per-horizon 30 alag models se ~20x sasta predict aur lambe horizons pe kam MAE.
+DIRECT_TARGETS = [f"price_h{h}" for h in range(1, HORIZON + 1)]
+DIRECT_PARAMS = {"multi_strategy": "multi_output_tree"}
+
+MODELS_DIRS = {RECURSIVE: MODELS_DIR, DIRECT: DIRECT_MODELS_DIR}
+
+
+def model_path(name, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"xgb_{name.lower()}.pkl")
+
+
+def native_path(name, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"xgb_{name.lower()}.ubj")
+
+
+def tables_path(name, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"xgb_{name.lower()}.trees")
+
+
+def meta_path(name, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"xgb_{name.lower()}.meta.json")
+
+
+def assign_group_keys(df, crops=target_crops):
+    """Normalized crop_key / district_key columns (matching done on unique names, not rows)."""
+    crop_map = crop_key_map(df['crop'].dropna().unique(), crops)
+
+    # astype(object): chunked mode ke categorical columns se bhi plain string keys (same sort order)
+    df = df.assign(crop_key=df['crop'].map(crop_map).astype(object))
+    df = df[df['crop_key'].notna()]
+
+    if 'district_name' in df.columns:
+        district_map = {raw: normalize_key(raw) for raw in df['district_name'].dropna().unique()}
+        df = df.assign(district_key=df['district_name'].map(district_map).astype(object).fillna(""))
+    else:
+        df = df.assign(district_key="")
+    return df
+
+
+def add_direct_targets(featured):
+    """DIRECT_TARGETS columns (same group, next rows); rows without the full horizon dropped."""
+    price = featured.groupby(GROUP_COLS, sort=False)['modal_price']
+    targets = {col: price.shift(-h) for h, col in enumerate(DIRECT_TARGETS)}
+    return featured.assign(**targets).dropna(subset=DIRECT_TARGETS)
+
+
+def plan_models(df, district_models=True, min_group_rows=MIN_GROUP_ROWS, strategy=RECURSIVE):
+    """[(model name, featured rows)] - crop-level models plus per-district models."""
+    featured = create_features(df, GROUP_COLS)
+    if strategy == DIRECT:
+        featured = add_direct_targets(featured)
+
+    plans = []
+    for crop_key, crop_rows in featured.groupby('crop_key', sort=False):
+        # Crop-level: saare districts ki rows, date order mein (time split ke liye)
+        plans.append((crop_key, crop_rows.sort_values('date', kind='stable')))
+
+        if not district_models:
+            continue
+        for district_key, rows in crop_rows.groupby('district_key', sort=False):
+            if district_key and len(rows) >= min_group_rows:
+                plans.append((f"{crop_key}{DISTRICT_SEP}{district_key}", rows))
+    return plans
+
+
+def training_params(mode="classic", search=False, strategy=RECURSIVE):
+    """Everything that decides how a model is fit - goes into the fingerprint and .meta.json."""
+    if mode == "classic":
+        return MODEL_PARAMS
+    params = {**FAST_PARAMS, "mode": mode, "early_stopping_rounds": EARLY_STOPPING_ROUNDS,
+              "validation_fraction": VALIDATION_FRACTION, "search": SEARCH_GRID if search else None}
+    if strategy == DIRECT:
+        params.update(DIRECT_PARAMS, strategy=DIRECT, targets=DIRECT_TARGETS)
+    return params
+
+
+def model_fingerprint(data, features=FEATURES, params=MODEL_PARAMS):
+    h = hashlib.sha256()
+    h.update(json.dumps({"pipeline": PIPELINE_VERSION, "features": features, "params": params},
+                        sort_keys=True).encode())
+    h.update(data["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64).tobytes())
+    h.update(data[FEATURES + ["modal_price"]].to_numpy(dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def read_meta(name, models_dir=MODELS_DIR):
+    try:
+        with open(meta_path(name, models_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_up_to_date(name, fingerprint, models_dir=MODELS_DIR):
+    meta = read_meta(name, models_dir)
+    return (meta is not None and meta.get("fingerprint") == fingerprint
+            and os.path.exists(model_path(name, models_dir)) and os.path.exists(native_path(name, models_dir)))
+
+
+def ensure_tables(name, models_dir=MODELS_DIR):
+    """Re-export .trees from the .ubj if it is missing or older (model skip hua to bhi). True if written."""
+    native, tables = native_path(name, models_dir), tables_path(name, models_dir)
+    if os.path.exists(tables) and os.path.getmtime(tables) >= os.path.getmtime(native):
+        return False
+    write_tables(xgb.Booster(model_file=native), tables)
+    return True
+
+
+def _atomic_write(path, write_fn):
+    # Serve chal raha ho to aadhi likhi file load na ho.
+    # Extension aakhir mein rakho - XGBoost save_model format usi se decide karta hai.
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp-{os.getpid()}{ext}"
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def single_row_latency_ms(model, row, repeat=200):
+    """Median time of one 1-row predict (serving ka har horizon step yahi karta hai)."""
+    predict = booster_predictor(model)
+    X = np.ascontiguousarray(row, dtype=np.float32).reshape(1, -1)
+    predict(X)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def tree_count(model):
+    """Trees actually used at inference (early stopping ke baad best iteration tak)."""
+    booster = model.get_booster()
+    try:
+        return booster.best_iteration + 1
+    except AttributeError:
+        return booster.num_boosted_rounds()
+
+
+def _fit_fast(params, X_train, y_train, X_val, y_val, n_threads):
+    model = xgb.XGBRegressor(**params, early_stopping_rounds=EARLY_STOPPING_ROUNDS, n_jobs=n_threads)
+    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    return model
+
+
+def _fold_mae(params, X, y, train_end, val_end):
+    model = _fit_fast(params, X.iloc[:train_end], y.iloc[:train_end],
+                      X.iloc[train_end:val_end], y.iloc[train_end:val_end], 1)
+    return mean_absolute_error(y.iloc[train_end:val_end], model.predict(X.iloc[train_end:val_end]))
+
+
+def search_params(X, y, n_threads, base=FAST_PARAMS, grid=SEARCH_GRID, folds=SEARCH_FOLDS):
+    """Pick grid params by mean MAE over rolling-origin folds; (grid x folds) fits run in parallel.
+
+    Har fit 1 XGBoost thread pe - job ke n_threads cores mein hi saare folds chalte hain.
+    """
+    step = len(X) // (folds + 1)
+    jobs = [(i, {**base, **params}, fold * step, (fold + 1) * step)
+            for i, params in enumerate(grid) for fold in range(1, folds + 1)]
+    with ThreadPoolExecutor(max_workers=max(1, n_threads)) as pool:
+        maes = list(pool.map(lambda job: _fold_mae(job[1], X, y, job[2], job[3]), jobs))
+
+    scores = [float(np.mean([mae for (i, _, _, _), mae in zip(jobs, maes) if i == g])) for g in range(len(grid))]
+    best = int(np.argmin(scores))
+    return {**base, **grid[best]}, [{**params, "cv_mae": round(score, 4)} for params, score in zip(grid, scores)]
+
+
+def train_model(name, processed_data, fingerprint, settings, n_threads):
+    direct = settings["strategy"] == DIRECT
+    models_dir = MODELS_DIRS[settings["strategy"]]
+    X = processed_data[FEATURES]
+    y = processed_data[DIRECT_TARGETS] if direct else processed_data['modal_price']
+    start = time.perf_counter()
+    search = None
+
+    if settings["mode"] == "classic":
+        # Split Data (time order - aakhri 10% test)
+        split_idx = int(len(X) * 0.90)
+        X_train, X_test = X.iloc[:split_idx], X.iloc[split_idx:]
+        y_train, y_test = y.iloc[:split_idx], y.iloc[split_idx:]
+        params = MODEL_PARAMS
+
+        # Train XGBoost (sirf apne hisse ke threads)
+        model = xgb.XGBRegressor(**MODEL_PARAMS, n_jobs=n_threads)
+        model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
+    else:
+        # Time order: train | validation (early stopping) | test (MAE) - test kabhi fit mein nahi
+        val_idx = int(len(X) * (1 - VALIDATION_FRACTION - TEST_FRACTION))
+        test_idx = int(len(X) * (1 - TEST_FRACTION))
+        X_test, y_test = X.iloc[test_idx:], y.iloc[test_idx:]
+        params = {**FAST_PARAMS, **DIRECT_PARAMS} if direct else FAST_PARAMS
+        if settings["search"]:
+            params, search = search_params(X.iloc[:test_idx], y.iloc[:test_idx], n_threads, base=params)
+        model = _fit_fast(params, X.iloc[:val_idx], y.iloc[:val_idx],
+                          X.iloc[val_idx:test_idx], y.iloc[val_idx:test_idx], n_threads)
+    train_seconds = time.perf_counter() - start
+
+    # Evaluate (direct: har horizon ka alag MAE, "mae" unka average)
     preds = model.predict(X_test)
     mae = mean_absolute_error(y_test, preds)
-    
-    print(f"   ✅ Saved! Avg Error: ₹{mae:.2f}")
-    joblib.dump(model, f"models/xgb_{crop.lower()}.pkl")
+    mae_by_horizon = (mean_absolute_error(y_test, preds, multioutput="raw_values").round(4).tolist()
+                      if direct else None)
+    trees = tree_count(model)
+    latency_ms = single_row_latency_ms(model, X_test.iloc[:1].to_numpy())
+
+    meta = {
+        "name": name,
+        "fingerprint": fingerprint,
+        "rows": len(processed_data),
+        "features": FEATURES,
+        "mode": settings["mode"],
+        "strategy": settings["strategy"],
+        "params": params,
+        "mae": float(mae),
+        "mae_by_horizon": mae_by_horizon,
+        "trees": trees,
+        "train_seconds": round(train_seconds, 3),
+        "predict_1row_ms": round(latency_ms, 4),
+        "search": search,
+        "trained_at": time.time(),
+    }
+    _atomic_write(model_path(name, models_dir), lambda p: joblib.dump(model, p))
+    _atomic_write(native_path(name, models_dir), model.save_model)
+    if not direct:
+        # Multi-output trees (vector leaves) NumPy tables mein nahi - direct pe ek hi predict hai waise bhi
+        write_tables(model.get_booster(), tables_path(name, models_dir))
+    _atomic_write(meta_path(name, models_dir), lambda p: _write_json(p, meta))
+
+    return {"crop": name, "rows": len(processed_data), "mae": mae, "trees": trees, "predict_ms": latency_ms}
+
+
+def plan_tasks(keyed, args):
+    """(tasks to train, unchanged model names) for already keyed rows."""
+    tasks = []
+    skipped = []
+    settings = {"mode": args.mode, "search": args.search, "strategy": args.strategy}
+    params = training_params(args.mode, args.search, args.strategy)
+    columns = FEATURES + ['date', 'modal_price'] + (DIRECT_TARGETS if args.strategy == DIRECT else [])
+    models_dir = MODELS_DIRS[args.strategy]
+    for name, rows in plan_models(keyed, not args.no_district_models, args.min_group_rows, args.strategy):
+        fingerprint = model_fingerprint(rows, params=params)
+        if not args.force and is_up_to_date(name, fingerprint, models_dir):
+            # Serve (KRISHI_TREE_EVALUATOR=numpy) .trees padhta hai - woh bhi current hona chahiye
+            if args.strategy == RECURSIVE and ensure_tables(name, models_dir):
+                print(f"   🌲 {name}: .trees missing/stale tha - .ubj se dobara export kiya")
+            skipped.append(name)
+            continue
+        tasks.append((name, rows[columns], fingerprint, settings))
+    return tasks, skipped
+
+
+def report_plan(tasks, skipped):
+    n_district = sum(1 for task in tasks if DISTRICT_SEP in task[0])
+    print(f"🧮 {len(tasks)} models to train ({len(tasks) - n_district} crop-level, "
+          f"{n_district} district-level), {len(skipped)} unchanged")
+
+
+def report_failures(failed):
+    """Non-zero exit when any model failed - nightly job / CI ko pata chale."""
+    print(f"\n❌ {len(failed)} models train nahi hue:")
+    print_failures(failed)
+    report_peak_memory()
+    sys.exit(1)
+
+
+def report_peak_memory():
+    own, children = peak_rss_mb()
+    print(f"📈 Peak RSS: {own:.0f} MB (this process), {children:.0f} MB (largest child process)")
+
+
+def train_chunked(args):
+    """Crop by crop from on-disk partitions - memory bounded by the largest crop, not the file."""
+    print(f"🔄 Partitioning {args.csv} by crop ({args.chunk_rows} rows per chunk)...")
+    try:
+        path = partition_by_crop(args.csv, target_crops, chunk_rows=args.chunk_rows)
+    except Exception as e:
+        print(f"❌ Critical Error loading CSV: {e}")
+        return
+    manifest = read_manifest(path)
+    print(f"✅ Data Partitioned! Total Rows: {manifest['rows']} "
+          f"(peak RSS while partitioning {manifest['peak_rss_mb']:.0f} MB)")
+
+    trained = 0
+    failed = []
+    for crop in target_crops:
+        n_rows = int(manifest["crops"].get(crop.lower(), 0))
+        if n_rows < 50:
+            print(f"⚠️ Skipping {crop}: Not enough data ({n_rows} rows)")
+            continue
+
+        keyed = assign_group_keys(load_partition(path, crop.lower()))
+        tasks, skipped = plan_tasks(keyed, args)
+        del keyed
+        print(f"\n🌾 {crop}: {n_rows} rows")
+        report_plan(tasks, skipped)
+        if tasks:
+            results, _ = run_training_jobs(train_model, tasks, args.jobs, args.threads_per_job)
+            failed += failures(results)
+            trained += len(tasks)
+        del tasks
+
+    if failed:
+        report_failures(failed)
+    if not trained:
+        print("\n✨ Sab models up to date hain - kuch train nahi karna.")
+    else:
+        print("\n✨ All Price Models Trained Successfully!")
+    report_peak_memory()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train XGBoost price models (only models whose inputs changed)")
+    parser.add_argument("--csv", default=HISTORY_CSV)
+    parser.add_argument("--jobs", type=int, default=None, help="parallel crop jobs (default: auto)")
+    parser.add_argument("--threads-per-job", type=int, default=None, help="XGBoost threads per job (default: cores / jobs)")
+    parser.add_argument("--force", action="store_true", help="fingerprint same ho tab bhi retrain karo")
+    parser.add_argument("--min-group-rows", type=int, default=MIN_GROUP_ROWS,
+                        help="district model ke liye minimum rows (kam ho to crop-level fallback)")
+    parser.add_argument("--no-district-models", action="store_true", help="sirf crop-level models")
+    parser.add_argument("--chunked", action="store_true",
+                        help="bade CSV ke liye: chunks mein padho, crop-wise disk partitions, ek crop at a time")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    parser.add_argument("--mode", choices=["classic", "fast"], default=None,
+                        help="fast: hist trees + early stopping (kam trees, sasta inference). "
+                             "Default: classic (recursive), fast (direct)")
+    parser.add_argument("--search", action="store_true",
+                        help="fast mode: chhota hyperparameter grid, parallel rolling-origin folds")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=RECURSIVE,
+                        help="direct: ek multi-output model agle 30 din ke liye (models/direct/)")
+    args = parser.parse_args()
+    if args.mode is None:
+        args.mode = "fast" if args.strategy == DIRECT else "classic"
+    if args.strategy == DIRECT and args.mode != "fast":
+        parser.error("--strategy direct sirf --mode fast ke saath (early stopping chahiye)")
+    if args.search and args.mode != "fast":
+        parser.error("--search sirf --mode fast ke saath")
+
+    # Folder check
+    os.makedirs(MODELS_DIRS[args.strategy], exist_ok=True)
+
+    print("🔄 Loading Real Mandi Data (Kaggle CSV)...")
+    if not os.path.exists(args.csv):
+        print(f"❌ Error: '{args.csv}' file nahi mili!")
+        return
+    if args.chunked:
+        train_chunked(args)
+        return
+    try:
+        df = load_history(args.csv)
+    except Exception as e:
+        print(f"❌ Critical Error loading CSV: {e}")
+        return
+    if 'crop' not in df.columns:
+        print("❌ Error: 'crop' column missing.")
+        return
+    print(f"✅ Data Loaded Successfully! Total Rows: {len(df)}")
+
+    # Ek hi pass: crop/district keys, phir group-wise features
+    keyed = assign_group_keys(df)
+    counts = keyed['crop_key'].value_counts()
+    too_small = []
+    for crop in target_crops:
+        n_rows = int(counts.get(crop.lower(), 0))
+        if n_rows < 50:
+            print(f"⚠️ Skipping {crop}: Not enough data ({n_rows} rows)")
+            too_small.append(crop.lower())
+    if too_small:
+        keyed = keyed[~keyed['crop_key'].isin(too_small)]
+
+    tasks, skipped = plan_tasks(keyed, args)
+    report_plan(tasks, skipped)
+
+    if not tasks:
+        print("\n✨ Sab models up to date hain - kuch train nahi karna.")
+        return
+
+    print("🚀 Training XGBoost Models...")
+    results, _ = run_training_jobs(train_model, tasks, args.jobs, args.threads_per_job)
+    failed = failures(results)
+    if failed:
+        report_failures(failed)
+
+    print("\n✨ All Price Models Trained Successfully!")
+    report_peak_memory()
+
 
-print("\n✨ All Price Models Trained Successfully!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
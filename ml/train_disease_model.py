@@ -1,118 +1,290 @@
+import argparse
+import json
+import os
+import time
+import zlib
+
 import tensorflow as tf
 from tensorflow.keras import layers, models
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
-import os
-import json
 
 # --- CONFIGURATION (Settings) ---
 # Aapke bataye hue folder structure ke hisaab se path:
-DATASET_DIR = "dataset/PlantVillage/color" 
+DATASET_DIR = "dataset/PlantVillage/color"
+# Decode + resize sirf ek baar: preprocessed 150x150 images sharded TFRecords mein yahan
+CACHE_DIR = "dataset/cache/plantvillage-150"
 MODEL_SAVE_PATH = "models/plant_disease_model.h5"
 CLASS_INDICES_PATH = "models/class_indices.json"
 
-# Check agar folder exist karta hai
-if not os.path.exists(DATASET_DIR):
-    print(f"❌ Error: Dataset folder nahi mila!")
-    print(f"Dhoondha gaya path: {os.path.abspath(DATASET_DIR)}")
-    print("Kripya check karein ki 'dataset/PlantVillage/color' folder sahi jagah par hai.")
-    exit()
-
-# 1. Image Preprocessing & Augmentation
-# (Images ko thoda ghuma-phira kar train karenge taaki model har angle se pehchan sake)
-train_datagen = ImageDataGenerator(
-    rescale=1./255,        # Pixel value 0-1 ke beech lao (Normalization)
-    rotation_range=20,     # Photo ko thoda ghuma kar dekho
-    width_shift_range=0.2, # Thoda side mein khiskao
-    height_shift_range=0.2,
-    horizontal_flip=True,  # Mirror image bhi seekho
-    fill_mode='nearest',
-    validation_split=0.2   # 20% data testing (validation) ke liye rakho
-)
-
-print(f"🔄 Images load ho rahi hain: {DATASET_DIR} se...")
-
-# Training Data Loader
-train_generator = train_datagen.flow_from_directory(
-    DATASET_DIR,
-    target_size=(150, 150), # Image size fix karo (Speed vs Quality balance)
-    batch_size=32,
-    class_mode='categorical',
-    subset='training'
-)
-
-# Validation Data Loader (Test)
-validation_generator = train_datagen.flow_from_directory(
-    DATASET_DIR,
-    target_size=(150, 150),
-    batch_size=32,
-    class_mode='categorical',
-    subset='validation'
-)
-
-# Check Classes
-class_names = list(train_generator.class_indices.keys())
-print(f"✅ Total {len(class_names)} Bimariyan (Classes) mili hain:")
-print(class_names[:5], "...") # Shuru ki 5 dikhao
-
-# 2. Build Advanced CNN Model (The Brain)
-model = models.Sequential([
-    # Layer 1: Aankhen (Features detect karega - Edges, Colors)
-    layers.Conv2D(32, (3, 3), activation='relu', input_shape=(150, 150, 3)),
-    layers.MaxPooling2D((2, 2)),
-    
-    # Layer 2: Aur gehrai se dekho (Shapes, Patterns)
-    layers.Conv2D(64, (3, 3), activation='relu'),
-    layers.MaxPooling2D((2, 2)),
-    
-    # Layer 3: Complex Features (Texture, Disease Spots)
-    layers.Conv2D(128, (3, 3), activation='relu'),
-    layers.MaxPooling2D((2, 2)),
-    
-    # Layer 4: High Level Features
-    layers.Conv2D(128, (3, 3), activation='relu'),
-    layers.MaxPooling2D((2, 2)),
-    
-    # Flatten: Image ko ek lambi list mein badlo
-    layers.Flatten(),
-    
-    # Dense Layer: Sochne wala hissa
-    layers.Dense(512, activation='relu'),
-    layers.Dropout(0.5), # 50% neurons band karo taaki ratta na maare (Overfitting)
-    
-    # Output Layer: Faisla lo
-    layers.Dense(len(class_names), activation='softmax')
+IMAGE_SIZE = 150
+VALIDATION_PERCENT = 20  # 20% data testing (validation) ke liye
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+AUTOTUNE = tf.data.AUTOTUNE
+CACHE_FORMAT_VERSION = 1
+
+
+# =========================================================
+# 1. FILE LIST + DETERMINISTIC SPLIT
+# =========================================================
+
+def list_images(dataset_dir):
+    """(relative paths, labels, class_indices) - class order flow_from_directory jaisa (sorted folders)."""
+    class_names = sorted(d for d in os.listdir(dataset_dir) if os.path.isdir(os.path.join(dataset_dir, d)))
+    paths, labels = [], []
+    for label, name in enumerate(class_names):
+        for fname in sorted(os.listdir(os.path.join(dataset_dir, name))):
+            if fname.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(f"{name}/{fname}")
+                labels.append(label)
+    return paths, labels, {name: i for i, name in enumerate(class_names)}
+
+
+def is_validation(rel_path):
+    # Path ka hash decide karta hai - nayi images aane par bhi purani images apne split mein rehti hain
+    return zlib.crc32(rel_path.encode("utf-8")) % 100 < VALIDATION_PERCENT
+
+
+# =========================================================
+# 2. ONE-TIME DECODE/RESIZE -> SHARDED TFRECORD CACHE
+# =========================================================
+
+def load_and_resize(path, label):
+    img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    # flow_from_directory (aur serve.py) bhi nearest interpolation use karte hain
+    img = tf.image.resize(img, (IMAGE_SIZE, IMAGE_SIZE), method="nearest")
+    return tf.cast(img, tf.uint8), label
+
+
+def serialize(img, label):
+    example = tf.train.Example(features=tf.train.Features(feature={
+        "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[img.tobytes()])),
+        "label": tf.train.Feature(int64_list=tf.train.Int64List(value=[int(label)])),
+    }))
+    return example.SerializeToString()
+
+
+def write_shards(split, paths, labels, dataset_dir, cache_dir, n_shards):
+    files = []
+    base = tf.data.Dataset.from_tensor_slices(([os.path.join(dataset_dir, p) for p in paths], labels))
+    n_shards = max(1, min(n_shards, len(paths)))
+    for i in range(n_shards):
+        out = os.path.join(cache_dir, f"{split}-{i:05d}-of-{n_shards:05d}.tfrecord")
+        # shard() map se pehle - har shard sirf apni images decode karta hai (parallel)
+        shard = base.shard(n_shards, i).map(load_and_resize, num_parallel_calls=AUTOTUNE)
+        with tf.io.TFRecordWriter(out + ".tmp") as writer:
+            for img, label in shard.as_numpy_iterator():
+                writer.write(serialize(img, label))
+        os.replace(out + ".tmp", out)
+        files.append(out)
+    return files
+
+
+def build_cache(dataset_dir, cache_dir, n_shards, rebuild=False):
+    paths, labels, class_indices = list_images(dataset_dir)
+    fingerprint = {
+        "version": CACHE_FORMAT_VERSION,
+        "image_size": IMAGE_SIZE,
+        "validation_percent": VALIDATION_PERCENT,
+        "classes": class_indices,
+        "files": zlib.crc32("\n".join(paths).encode("utf-8")),
+        "count": len(paths),
+    }
+
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    if not rebuild and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") == fingerprint and all(os.path.exists(p) for s in ("train", "val") for p in manifest[s]):
+            print(f"✅ Cache mila ({len(paths)} images): {cache_dir}")
+            return manifest
+
+    print(f"🔄 {len(paths)} images ek baar decode + resize ho rahi hain -> {cache_dir} ...")
+    os.makedirs(cache_dir, exist_ok=True)
+    start = time.perf_counter()
+    split = {"train": ([], []), "val": ([], [])}
+    for path, label in zip(paths, labels):
+        bucket = split["val" if is_validation(path) else "train"]
+        bucket[0].append(path)
+        bucket[1].append(label)
+
+    manifest = {"fingerprint": fingerprint}
+    for name, (split_paths, split_labels) in split.items():
+        manifest[name] = write_shards(name, split_paths, split_labels, dataset_dir, cache_dir, n_shards)
+        manifest[f"{name}_count"] = len(split_paths)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Cache ready in {elapsed:.0f} s ({len(paths) / elapsed:.0f} images/s)")
+    return manifest
+
+
+# =========================================================
+# 3. INPUT PIPELINE (cached records -> augment -> batch -> prefetch)
+# =========================================================
+
+FEATURE_SPEC = {
+    "image": tf.io.FixedLenFeature([], tf.string),
+    "label": tf.io.FixedLenFeature([], tf.int64),
+}
+
+
+def parse_batch(records, n_classes):
+    parsed = tf.io.parse_example(records, FEATURE_SPEC)
+    images = tf.io.decode_raw(parsed["image"], tf.uint8)
+    images = tf.reshape(images, (-1, IMAGE_SIZE, IMAGE_SIZE, 3))
+    # Pixel value 0-1 ke beech lao (Normalization)
+    images = tf.cast(images, tf.float32) / 255.0
+    return images, tf.one_hot(parsed["label"], n_classes)
+
+
+# Images ko thoda ghuma-phira kar train karenge taaki model har angle se pehchan sake
+# (pehle wale ImageDataGenerator jaisi settings)
+augmenter = tf.keras.Sequential([
+    layers.RandomRotation(20 / 360, fill_mode="nearest"),     # Photo ko thoda ghuma kar dekho
+    layers.RandomTranslation(0.2, 0.2, fill_mode="nearest"),  # Thoda side mein khiskao
+    layers.RandomFlip("horizontal"),                          # Mirror image bhi seekho
 ])
 
-# 3. Compile Model
-model.compile(
-    optimizer='adam',
-    loss='categorical_crossentropy',
-    metrics=['accuracy']
-)
-
-# 4. Start Training
-print("\n🚀 Training Shuru! (Isme 10-15 minute lagenge, chai pi lo ☕)")
-print("Model seekh raha hai...")
-
-history = model.fit(
-    train_generator,
-    steps_per_epoch=train_generator.samples // 32,
-    validation_data=validation_generator,
-    validation_steps=validation_generator.samples // 32,
-    epochs=10 # Real production ke liye 20-30 rakh sakte hain, abhi 10 kaafi hai
-)
-
-# 5. Save Model & Class Names
-if not os.path.exists("models"):
-    os.makedirs("models")
-
-# Model File (.h5)
-model.save(MODEL_SAVE_PATH)
-print(f"🎉 AI Model Saved: {MODEL_SAVE_PATH}")
-
-# Class Names (.json) - Ye serve.py mein kaam aayega naam batane ke liye
-with open(CLASS_INDICES_PATH, "w") as f:
-    json.dump(train_generator.class_indices, f)
-print(f"✅ Class Index Saved: {CLASS_INDICES_PATH}")
-
-print("\nMission Complete! Ab 'serve.py' is model ko use kar sakta hai.")
\ No newline at end of file
+
+def make_dataset(files, n_classes, batch_size, training, seed):
+    ds = tf.data.TFRecordDataset(files, num_parallel_reads=AUTOTUNE)
+    if training:
+        ds = ds.shuffle(4096, seed=seed, reshuffle_each_iteration=True)
+    # Pehle batch, phir parse + augment poore batch pe (per-image map se kaafi sasta)
+    ds = ds.batch(batch_size, drop_remainder=training)
+    ds = ds.map(lambda r: parse_batch(r, n_classes), num_parallel_calls=AUTOTUNE)
+    if training:
+        ds = ds.map(lambda x, y: (augmenter(x, training=True), y), num_parallel_calls=AUTOTUNE,
+                    deterministic=False)
+    return ds.prefetch(AUTOTUNE)
+
+
+class ThroughputLogger(tf.keras.callbacks.Callback):
+    """Images/second per epoch (train step + validation)."""
+
+    def __init__(self, n_images):
+        super().__init__()
+        self.n_images = n_images
+        self.history = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._start
+        rate = self.n_images / elapsed
+        self.history.append(rate)
+        print(f"   ⏱️ Epoch {epoch + 1}: {elapsed:.1f} s, {rate:.0f} images/s")
+
+
+def measure_input_pipeline(ds, n_images):
+    # Model ke bina sirf pipeline - agar ye training images/s se kaafi tez hai to training compute-bound hai
+    start = time.perf_counter()
+    for _ in ds:
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"📥 Input pipeline only: {n_images / elapsed:.0f} images/s")
+
+
+# =========================================================
+# 4. MODEL (The Brain)
+# =========================================================
+
+def build_model(n_classes):
+    return models.Sequential([
+        # Layer 1: Aankhen (Features detect karega - Edges, Colors)
+        layers.Conv2D(32, (3, 3), activation='relu', input_shape=(IMAGE_SIZE, IMAGE_SIZE, 3)),
+        layers.MaxPooling2D((2, 2)),
+
+        # Layer 2: Aur gehrai se dekho (Shapes, Patterns)
+        layers.Conv2D(64, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+
+        # Layer 3: Complex Features (Texture, Disease Spots)
+        layers.Conv2D(128, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+
+        # Layer 4: High Level Features
+        layers.Conv2D(128, (3, 3), activation='relu'),
+        layers.MaxPooling2D((2, 2)),
+
+        # Flatten: Image ko ek lambi list mein badlo
+        layers.Flatten(),
+
+        # Dense Layer: Sochne wala hissa
+        layers.Dense(512, activation='relu'),
+        layers.Dropout(0.5),  # 50% neurons band karo taaki ratta na maare (Overfitting)
+
+        # Output Layer: Faisla lo
+        layers.Dense(n_classes, activation='softmax')
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the plant disease CNN (cached tf.data pipeline)")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--epochs", type=int, default=10)  # Real production ke liye 20-30 rakh sakte hain
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--shards", type=int, default=16, help="TFRecord shards per split")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rebuild-cache", action="store_true", help="cache dobara banao")
+    parser.add_argument("--input-only", action="store_true", help="sirf input pipeline ki speed napo")
+    args = parser.parse_args()
+
+    # Check agar folder exist karta hai
+    if not os.path.exists(args.dataset):
+        print(f"❌ Error: Dataset folder nahi mila!")
+        print(f"Dhoondha gaya path: {os.path.abspath(args.dataset)}")
+        print("Kripya check karein ki 'dataset/PlantVillage/color' folder sahi jagah par hai.")
+        return
+
+    tf.keras.utils.set_random_seed(args.seed)
+    manifest = build_cache(args.dataset, args.cache_dir, args.shards, args.rebuild_cache)
+    class_indices = manifest["fingerprint"]["classes"]
+    n_classes = len(class_indices)
+
+    # Check Classes
+    class_names = list(class_indices.keys())
+    print(f"✅ Total {n_classes} Bimariyan (Classes) mili hain:")
+    print(class_names[:5], "...")  # Shuru ki 5 dikhao
+    print(f"   Train: {manifest['train_count']} | Validation: {manifest['val_count']}")
+
+    train_ds = make_dataset(manifest["train"], n_classes, args.batch_size, training=True, seed=args.seed)
+    val_ds = make_dataset(manifest["val"], n_classes, args.batch_size, training=False, seed=args.seed)
+
+    if args.input_only:
+        measure_input_pipeline(train_ds, manifest["train_count"])
+        return
+
+    model = build_model(n_classes)
+    model.compile(
+        optimizer='adam',
+        loss='categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+    # Start Training
+    print("\n🚀 Training Shuru! (chai pi lo ☕)")
+    print("Model seekh raha hai...")
+    throughput = ThroughputLogger(manifest["train_count"] + manifest["val_count"])
+    model.fit(train_ds, validation_data=val_ds, epochs=args.epochs, callbacks=[throughput])
+    print(f"📊 Avg throughput: {sum(throughput.history) / len(throughput.history):.0f} images/s")
+
+    # Save Model & Class Names
+    os.makedirs(os.path.dirname(MODEL_SAVE_PATH), exist_ok=True)
+
+    # Model File (.h5)
+    model.save(MODEL_SAVE_PATH)
+    print(f"🎉 AI Model Saved: {MODEL_SAVE_PATH}")
+
+    # Class Names (.json) - Ye serve.py mein kaam aayega naam batane ke liye
+    with open(CLASS_INDICES_PATH, "w") as f:
+        json.dump(class_indices, f)
+    print(f"✅ Class Index Saved: {CLASS_INDICES_PATH}")
+
+    print("\nMission Complete! Ab 'serve.py' is model ko use kar sakta hai.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# ml/training_pool.py
+# Kai crops ki training ek saath (process pool), cores ka explicit bantwara:
+#   jobs x threads_per_job <= total cores
+# Pehle har XGBRegressor(n_jobs=-1) saare cores le leta tha aur crops ek ke baad ek chalti thi.
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# District models (hazaaron) ke saath poori table bekaar - sirf itne sabse slow models, baaki summary
+TABLE_MAX_ROWS = 25
+
+
+def core_budget(n_tasks, jobs=None, threads_per_job=None, total_cores=None):
+    """Split cores between parallel crop jobs and XGBoost threads per job."""
+    total_cores = total_cores or os.cpu_count() or 1
+    n_tasks = max(1, n_tasks)
+
+    if jobs is None and threads_per_job is None:
+        jobs = min(n_tasks, total_cores)
+    elif jobs is None:
+        jobs = max(1, min(n_tasks, total_cores // threads_per_job))
+    jobs = max(1, min(jobs, n_tasks))
+
+    if threads_per_job is None:
+        threads_per_job = max(1, total_cores // jobs)
+    return jobs, threads_per_job
+
+
+def run_training_jobs(train_fn, tasks, jobs=None, threads_per_job=None):
+    """Run train_fn(*task, n_threads) for every task and print a per-crop timing table.
+
+    train_fn must be a module-level function returning a dict with at least 'crop'.
+    A task that raises doesn't stop the others: its result has status "failed" and the error,
+    and failures() lists them for the caller.
+    """
+    jobs, threads = core_budget(len(tasks), jobs, threads_per_job)
+    print(f"⚙️  {len(tasks)} crops | {jobs} parallel jobs x {threads} XGBoost threads "
+          f"(cores: {os.cpu_count()})")
+
+    start = time.perf_counter()
+    results = []
+    if jobs == 1:
+        for task in tasks:
+            results.append(_timed(train_fn, task, threads))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_timed, train_fn, task, threads) for task in tasks]
+            results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+
+    print_timing_table(results, wall)
+    print_failures(failures(results))
+    return results, wall
+
+
+def _timed(train_fn, task, threads):
+    start = time.perf_counter()
+    try:
+        result = {**train_fn(*task, threads), "status": "ok"}
+    except Exception as e:
+        result = {"crop": task[0], "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def failures(results):
+    return [r for r in results if r["status"] != "ok"]
+
+
+def print_timing_table(results, wall, max_rows=TABLE_MAX_ROWS):
+    shown = results if len(results) <= max_rows else \
+        sorted(results, key=lambda r: r["seconds"], reverse=True)[:max_rows]
+    print(f"\n{'Crop':<12} {'Rows':>9} {'MAE (₹)':>10} {'Trees':>6} {'1-row (ms)':>10} {'Time (s)':>9}  Status")
+    for r in shown:
+        mae = f"{r['mae']:.2f}" if r.get("mae") is not None else "-"
+        trees = r.get("trees", "-")
+        predict_ms = f"{r['predict_ms']:.3f}" if r.get("predict_ms") is not None else "-"
+        print(f"{r['crop']:<12} {r.get('rows', 0):>9} {mae:>10} {trees:>6} {predict_ms:>10} "
+              f"{r['seconds']:>9.2f}  {r['status']}")
+    if len(shown) < len(results):
+        print(f"   ... {len(results) - len(shown)} aur models (upar sirf {len(shown)} sabse slow)")
+    busy = sum(r["seconds"] for r in results)
+    n_failed = len(failures(results))
+    print(f"⏱️  Total wall time: {wall:.2f} s (sum of crop times {busy:.2f} s) | "
+          f"{len(results) - n_failed} ok, {n_failed} failed")
+
+
+def print_failures(failed, max_rows=TABLE_MAX_ROWS):
+    for r in failed[:max_rows]:
+        print(f"   ❌ {r['crop']}: {r['error']}")
+    if len(failed) > max_rows:
+        print(f"   ... {len(failed) - max_rows} aur failures")
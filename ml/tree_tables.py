@@ -0,0 +1,224 @@
+# ml/tree_tables.py
+# XGBoost booster -> flat tree tables (.trees file) + pure NumPy evaluator.
+#
+# Forecast loop mein har call sirf N x 8 features ki hoti hai; wahan XGBoost predict ka
+# fixed per-call overhead (DMatrix/proxy setup, thread dispatch) trees walk karne se zyada
+# mehenga hai. Yahan saare trees ke nodes ek saath arrays mein hain:
+#   feature, threshold, left, default_left, value   (ek row = ek node)
+# XGBoost children hamesha jode mein banata hai (right = left + 1), isliye ek step bas
+#   node = left[node] + (x >= threshold[node])
+# hai; leaf apne aap pe loop karti hai (threshold = NaN, to x >= NaN hamesha False - x = +inf pe
+# bhi leaf se bahar nahi jaata). Saari rows x saare trees ek saath, max depth jitne vectorized
+# steps mein leaf tak jaate hain.
+#
+# Yeh walk chhote batches (forecast ke N x 8) pe hi XGBoost se tez hai; rows x trees badhne pe
+# XGBoost ka multithreaded predict aage nikal jaata hai. Isliye max_rows se badi calls fallback
+# booster (same naam ki .ubj / .pkl, pehli zaroorat pe load) pe jaati hain.
+#
+# .trees file: [8 byte header length][JSON header][64-byte aligned raw arrays]
+# np.memmap se load hoti hai - startup pe koi parse nahi, aur fork/workers page cache share karte hain.
+import json
+import os
+
+import numpy as np
+
+MAGIC = "krishi-trees-v2"
+# v1: leaf threshold +inf tha (x = +inf pe leaf se aage chala jaata) - load pe NaN mein badla jaata hai
+OLD_MAGICS = ("krishi-trees-v1",)
+ALIGN = 64
+
+# (name, dtype) - file mein isi order mein
+ARRAYS = [
+    ("roots", np.int32),
+    ("feature", np.int32),
+    ("threshold", np.float32),
+    ("left", np.int32),
+    ("default_left", np.bool_),
+    ("value", np.float32),
+]
+
+
+def _parse_base_score(text):
+    # XGBoost 2.x: "2.17E3", 3.x: "[2.170724E3]"
+    return float(str(text).strip("[]").split(",")[0])
+
+
+def booster_tables(booster):
+    """Flat node arrays for the trees a booster uses at inference (up to best_iteration)."""
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "reg:squarederror":
+        raise ValueError(f"Sirf reg:squarederror supported hai, mila: {objective}")
+    num_target = int(learner["learner_model_param"].get("num_target", 1))
+    if num_target != 1:
+        raise ValueError(f"Sirf single-output models supported hain, mila: {num_target} targets")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Sirf gbtree supported hai, mila: {gbm['name']}")
+
+    trees = gbm["model"]["trees"]
+    best = learner.get("attributes", {}).get("best_iteration")
+    if best is not None:
+        trees = trees[:int(best) + 1]
+
+    roots, feature, threshold, left, default_left, value = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        lc = np.asarray(tree["left_children"], dtype=np.int64)
+        rc = np.asarray(tree["right_children"], dtype=np.int64)
+        n = len(lc)
+        leaf = lc == -1
+        if np.any(rc[~leaf] != lc[~leaf] + 1):
+            raise ValueError(f"Tree {tree['id']}: children jode mein nahi (right != left + 1)")
+        # Leaf apne aap pe loop karti hai - evaluator bina branch ke fixed steps chala sakta hai
+        left.append(np.where(leaf, np.arange(n), lc) + offset)
+        feature.append(np.where(leaf, 0, tree["split_indices"]))
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        threshold.append(np.where(leaf, np.nan, cond))
+        value.append(np.where(leaf, cond, 0))  # leaf ka split_condition = leaf value
+        default_left.append(leaf | np.asarray(tree["default_left"], dtype=bool))
+        roots.append(offset)
+        max_depth = max(max_depth, _depth(lc, rc))
+        offset += n
+
+    def cat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+    arrays = {
+        "roots": np.asarray(roots, dtype=np.int32),
+        "feature": cat(feature, np.int32),
+        "threshold": cat(threshold, np.float32),
+        "left": cat(left, np.int32),
+        "default_left": cat(default_left, np.bool_),
+        "value": cat(value, np.float32),
+    }
+    header = {
+        "magic": MAGIC,
+        "base_score": _parse_base_score(learner["learner_model_param"]["base_score"]),
+        "num_feature": int(learner["learner_model_param"]["num_feature"]),
+        "n_trees": len(trees),
+        "max_depth": max_depth,
+    }
+    return header, arrays
+
+
+def _depth(left, right):
+    depth = 0
+    frontier = [0]
+    while frontier:
+        frontier = [c for node in frontier for c in (left[node], right[node]) if c != -1]
+        if frontier:
+            depth += 1
+    return depth
+
+
+def write_tables(booster, path):
+    """Export a booster to a .trees file (atomic replace)."""
+    header, arrays = booster_tables(booster)
+    layout = {}
+    offset = 0
+    for name, dtype in ARRAYS:
+        offset = -(-offset // ALIGN) * ALIGN
+        layout[name] = [offset, len(arrays[name])]
+        offset += arrays[name].nbytes
+    header["arrays"] = layout
+    raw_header = json.dumps(header).encode("utf-8")
+    data_start = -(-(8 + len(raw_header)) // ALIGN) * ALIGN
+
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp-{os.getpid()}{ext}"
+    with open(tmp_path, "wb") as f:
+        f.write(len(raw_header).to_bytes(8, "little"))
+        f.write(raw_header)
+        for name, dtype in ARRAYS:
+            f.seek(data_start + layout[name][0])
+            f.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+class TreeEnsemble:
+    """NumPy evaluator over memory-mapped tree tables; predict(X) like booster.inplace_predict.
+
+    load_fallback: () -> XGBoost Booster for the same trees (or None), used for calls above max_rows.
+    """
+
+    def __init__(self, header, arrays, load_fallback=None, max_rows=None):
+        self.base_score = np.float32(header["base_score"])
+        self.num_feature = header["num_feature"]
+        self.n_trees = header["n_trees"]
+        self.max_depth = header["max_depth"]
+        for name, _ in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.max_rows = max_rows
+        self._load_fallback = load_fallback
+        self._fallback = None
+
+    @classmethod
+    def load(cls, path, load_fallback=None, max_rows=None):
+        with open(path, "rb") as f:
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+        if header.get("magic") not in (MAGIC,) + OLD_MAGICS:
+            raise ValueError(f"{path}: .trees file nahi hai")
+        data_start = -(-(8 + size) // ALIGN) * ALIGN
+        arrays = {}
+        for name, dtype in ARRAYS:
+            offset, count = header["arrays"][name]
+            # Plain ndarray view (memmap subclass ki har indexing pe overhead hai)
+            arrays[name] = (np.memmap(path, dtype=dtype, mode="r", offset=data_start + offset,
+                                      shape=(count,)).view(np.ndarray)
+                            if count else np.empty(0, dtype=dtype))
+        if header["magic"] in OLD_MAGICS:
+            leaf = arrays["left"] == np.arange(len(arrays["left"]))
+            arrays["threshold"] = np.where(leaf, np.float32(np.nan), arrays["threshold"])
+        return cls(header, arrays, load_fallback, max_rows)
+
+    @classmethod
+    def from_booster(cls, booster):
+        return cls(*booster_tables(booster))
+
+    def predict(self, X):
+        """(N, num_feature) float rows -> (N,) float32 predictions."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        n = X.shape[0]
+        if X.shape[1] != self.num_feature:
+            raise ValueError(f"Number of columns in data ({X.shape[1]}) must equal the model's "
+                             f"num_feature ({self.num_feature})")
+        if self.n_trees == 0:
+            return np.full(n, self.base_score, dtype=np.float32)
+        if self.max_rows is not None and n > self.max_rows and self._fallback_ready():
+            booster, iteration_range = self._fallback
+            return booster.inplace_predict(X, iteration_range=iteration_range, validate_features=False)
+
+        # (N, T) current node per row per tree; har step pe sab ek level neeche
+        flat = np.ascontiguousarray(X).ravel()
+        row_base = (np.arange(n, dtype=np.int32) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees))
+        has_missing = np.isnan(flat).any()
+        for _ in range(self.max_depth):
+            x = flat.take(row_base + self.feature.take(node))
+            go_right = x >= self.threshold.take(node)
+            if has_missing:
+                go_right |= np.isnan(x) & ~self.default_left.take(node)
+            node = self.left.take(node) + go_right
+        return self.value.take(node).sum(axis=1, dtype=np.float32) + self.base_score
+
+    def _fallback_ready(self):
+        if self._fallback is None and self._load_fallback is not None:
+            booster = self._load_fallback()
+            self._load_fallback = None  # ek hi baar koshish; booster na mile to NumPy walk hi
+            if booster is not None:
+                try:
+                    iteration_range = (0, booster.best_iteration + 1)
+                except AttributeError:
+                    iteration_range = (0, 0)
+                self._fallback = (booster, iteration_range)
+        return self._fallback is not None
+
+    def __call__(self, X):
+        return self.predict(X)